@@ -0,0 +1,229 @@
+from typing import Dict, List, Tuple, Iterable, Optional
+from datetime import datetime
+from collections import Counter
+import json
+from line_reader import iter_lines
+from emoji_regex import EmojiCache
+from projection import project_date, project_username, project_content, project_mentioned_usernames
+from window import check_n
+
+
+class DailyAggregator:
+    """
+    Agregador para q1: conteo de tweets por día y conteo de tweets por usuario dentro de cada día.
+
+    Todos los agregadores implementan update (tweet decodificado), update_line (bytes de la linea),
+    merge (combinar parciales), to_state/from_state (estado serializable en JSON) y result (top n).
+    """
+
+    name = "q1"
+
+    def __init__(self):
+        # Diccionario con conteo de tweets por cada día
+        self.date_counts = {}
+        # Diccionario con conteo de tweets por username, para cada día
+        self.user_counts = {}
+        # Cache de conversion de prefijo "YYYY-MM-DD" a datetime.date
+        self._dates = {}
+
+    def update(self, tweet: dict):
+        # Conversion de date del tweet de str a datetime.date
+        date = datetime.strptime(tweet["date"][:10], "%Y-%m-%d").date()
+        # Extraccion de username
+        username = tweet.get("user", {}).get("username", "")
+        self._count(date, username)
+
+    def update_line(self, line: bytes):
+        # Extracción de día y username directamente desde los bytes de la linea
+        prefix = project_date(line)
+        date = self._dates.get(prefix)
+        if date is None:
+            date = self._dates[prefix] = datetime.strptime(prefix, "%Y-%m-%d").date()
+        self._count(date, project_username(line))
+
+    def _count(self, date: datetime.date, username: str):
+        # Actualizacion de conteos del día y del username dentro del día
+        self.date_counts[date] = self.date_counts.get(date, 0) + 1
+        day_users = self.user_counts.setdefault(date, {})
+        day_users[username] = day_users.get(username, 0) + 1
+
+    def merge(self, other: "DailyAggregator"):
+        # Se recorren los conteos en orden de inserción para conservar el orden de primera aparición
+        for date, count in other.date_counts.items():
+            self.date_counts[date] = self.date_counts.get(date, 0) + count
+            day_users = self.user_counts.setdefault(date, {})
+            for username, user_count in other.user_counts[date].items():
+                day_users[username] = day_users.get(username, 0) + user_count
+
+    def to_state(self) -> dict:
+        # Estado serializable en JSON (fechas como "YYYY-MM-DD"), preservando el orden de inserción
+        return {
+            "date_counts": {day.isoformat(): count for day, count in self.date_counts.items()},
+            "user_counts": {day.isoformat(): users for day, users in self.user_counts.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "DailyAggregator":
+        aggregator = cls()
+        for key, count in state["date_counts"].items():
+            day = datetime.strptime(key, "%Y-%m-%d").date()
+            aggregator.date_counts[day] = count
+            aggregator.user_counts[day] = dict(state["user_counts"][key])
+        return aggregator
+
+    def result(self, n: int = 10) -> List[Tuple[datetime.date, str]]:
+        # Obtención de los n días con más tweets (si hay empate, el día más antiguo primero)
+        dates_max = sorted(self.date_counts, key=lambda date: (-self.date_counts[date], date))[:n]
+        # Username con más tweets en cada uno de esos días (si hay empate, el menor username en orden alfabético)
+        out = []
+        for date in dates_max:
+            day_users = self.user_counts[date]
+            out.append((date, min(day_users, key=lambda username: (-day_users[username], username))))
+        return out
+
+
+class EmojiAggregator:
+    """
+    Agregador para q2: conteo de emojis usados en el contenido de los tweets.
+    """
+
+    name = "q2"
+
+    def __init__(self):
+        # Contador para emojis
+        self.counter = Counter()
+        # Emojis de cada contenido, reutilizados para contenidos repetidos
+        self.emoji_cache = EmojiCache()
+
+    def update(self, tweet: dict):
+        # Obtención de emojis en el contenido, agregando solo "emoji" al contador
+        self.counter.update(self.emoji_cache(tweet.get("content")))
+
+    def update_line(self, line: bytes):
+        # Extracción de "content" directamente desde los bytes de la linea
+        self.counter.update(self.emoji_cache(project_content(line)))
+
+    def merge(self, other: "EmojiAggregator"):
+        self.counter.update(other.counter)
+
+    def to_state(self) -> dict:
+        return {"counter": dict(self.counter)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "EmojiAggregator":
+        aggregator = cls()
+        aggregator.counter = Counter(state["counter"])
+        return aggregator
+
+    def __getstate__(self) -> dict:
+        # Entre procesos solo se copia el contador (sin el cache de emojis)
+        return self.to_state()
+
+    def __setstate__(self, state: dict):
+        self.__init__()
+        self.counter = Counter(state["counter"])
+
+    def result(self, n: int = 10) -> List[Tuple[str, int]]:
+        return self.counter.most_common(n)
+
+
+class MentionAggregator:
+    """
+    Agregador para q3: conteo de menciones (@) a cada username.
+    """
+
+    name = "q3"
+
+    def __init__(self):
+        # Contador para usernames mencionados
+        self.counter = Counter()
+
+    def update(self, tweet: dict):
+        # Extracción de "mentioned users"
+        mentioned = tweet.get("mentionedUsers")
+        if mentioned is not None:
+            # Actualizar counter de menciones por cada user mencionado
+            for user in mentioned:
+                self.counter[user["username"]] += 1
+
+    def update_line(self, line: bytes):
+        # Extracción de usernames mencionados, decodificando solo la lista "mentionedUsers"
+        self.counter.update(project_mentioned_usernames(line))
+
+    def merge(self, other: "MentionAggregator"):
+        self.counter.update(other.counter)
+
+    def to_state(self) -> dict:
+        return {"counter": dict(self.counter)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "MentionAggregator":
+        aggregator = cls()
+        aggregator.counter = Counter(state["counter"])
+        return aggregator
+
+    def result(self, n: int = 10) -> List[Tuple[str, int]]:
+        return self.counter.most_common(n)
+
+
+# Agregadores usados por defecto en una pasada analítica (uno por pregunta)
+DEFAULT_AGGREGATORS = (DailyAggregator, EmojiAggregator, MentionAggregator)
+
+
+def feed_lines(lines: Iterable, aggregators: list):
+    """
+    Lee cada tweet una sola vez y lo entrega a todos los agregadores.
+
+    Parameters
+    ----------
+    lines : Iterable
+        Lineas del archivo JSON en bytes, un tweet por linea.
+    aggregators : list
+        Agregadores con métodos update, update_line, merge y result.
+    """
+
+    # Con un solo agregador se extraen solo sus campos desde los bytes de la linea
+    if len(aggregators) == 1:
+        update_line = aggregators[0].update_line
+        for line in lines:
+            update_line(line)
+        return
+
+    # Métodos update enlazados para no resolverlos en cada linea
+    updates = [aggregator.update for aggregator in aggregators]
+    for line in lines:
+        # Leer tweet una única vez
+        tweet = json.loads(line)
+        # Entregar el tweet a cada agregador
+        for update in updates:
+            update(tweet)
+
+
+def analytics_pass(file_path: str, aggregators: Optional[list] = None, n: int = 10) -> Dict[str, list]:
+    """
+    Lee archivo JSON con tweets desde path una sola vez y responde q1, q2 y q3 simultáneamente,
+    entregando cada tweet a un conjunto de agregadores intercambiables.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+    aggregators : list, optional
+        Agregadores a usar. Por defecto uno para cada pregunta (q1, q2 y q3).
+    n : int
+        Cantidad de elementos en cada top.
+
+    Returns
+    -------
+    Dict[str, list]
+        Diccionario con el resultado de cada agregador según su nombre ("q1", "q2", "q3"),
+        con el mismo formato que las funciones q*_memory.
+    """
+
+    check_n(n)
+    if aggregators is None:
+        aggregators = [aggregator() for aggregator in DEFAULT_AGGREGATORS]
+
+    feed_lines(iter_lines(file_path), aggregators)
+
+    return {aggregator.name: aggregator.result(n) for aggregator in aggregators}
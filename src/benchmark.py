@@ -0,0 +1,510 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import argparse
+import csv
+import importlib
+import json
+import multiprocessing
+import numbers
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+# Variantes a medir por pregunta: nombre de la variante -> (módulo, función)
+VARIANTS = {
+    "q1": {
+        "q1_time": ("q1_time", "q1_time"),
+        "q1_time_pandas": ("q1_time", "q1_time_pandas"),
+        "q1_memory": ("q1_memory", "q1_memory"),
+    },
+    "q2": {
+        "q2_time": ("q2_time", "q2_time"),
+        "q2_time_pandas": ("q2_time", "q2_time_pandas"),
+        "q2_memory": ("q2_memory", "q2_memory"),
+    },
+    "q3": {
+        "q3_time": ("q3_time", "q3_time"),
+        "q3_time_pandas": ("q3_time", "q3_time_pandas"),
+        "q3_memory": ("q3_memory", "q3_memory"),
+    },
+}
+
+# Lecturas secuenciales medidas por check_peak_rss junto a las variantes *_memory: nombre -> (módulo, función).
+# "open" (lectura buferizada sin procesar las lineas) es la referencia de memoria de una lectura completa.
+RSS_SCANS = {
+    "open": ("benchmark", "scan_open"),
+    "iter_lines": ("benchmark", "scan_iter_lines"),
+    "iter_offset_lines": ("benchmark", "scan_iter_offset_lines"),
+    "iter_mapped_lines": ("benchmark", "scan_iter_mapped_lines"),
+}
+
+# Crecimiento máximo del pico de memoria (MB de RSS por MB de archivo) aceptado por check_peak_rss.
+# Una lectura que mantiene el archivo mapeado en memoria crece ~1 MB por MB de archivo; los conteos y caches
+# acotados (ej. EmojiCache de q2_memory) crecen bastante menos hasta llenarse.
+RSS_MAX_GROWTH = 0.25
+
+# Dependencias pesadas reportadas por measure_imports cuando quedan cargadas al importar un módulo
+HEAVY_MODULES = ("pandas", "polars", "pyarrow", "emoji", "google.cloud")
+
+# Código ejecutado en un proceso nuevo para medir la importación de un módulo
+_IMPORT_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+# Emojis y palabras usados para generar el contenido de los tweets sintéticos
+_EMOJIS = ["🚜", "🙏", "🙏🏽", "❤️", "💚", "😂", "✊", "🇮🇳", "👨‍🌾", "🌾", "🔥", "👍🏻", "😢", "💪"]
+_WORDS = ["farmers", "protest", "delhi", "support", "kisan", "andolan", "india", "#FarmersProtest",
+          "solidarity", "now", "año", "niño", "\"quote\"", "line\nbreak"]
+
+
+def _synthetic_user(index: int) -> dict:
+    """
+    User sintético con la misma estructura (orden de keys) que los tweets originales.
+    """
+
+    username = f"user_{index}"
+    return {
+        "username": username,
+        "displayname": username.title(),
+        "id": 10_000_000 + index,
+        "description": "Synthetic user for benchmarks",
+        "rawDescription": "Synthetic user for benchmarks",
+        "descriptionUrls": None,
+        "verified": index % 97 == 0,
+        "created": "2015-06-01T00:00:00+00:00",
+        "followersCount": index * 7 % 5000,
+        "friendsCount": index * 3 % 800,
+        "location": "",
+        "url": f"https://twitter.com/{username}",
+    }
+
+
+def _synthetic_tweet(rng: random.Random, tweet_id: int, start: datetime, n_users: int, nested: bool = True) -> dict:
+    """
+    Tweet sintético con la misma estructura (orden de keys) que los tweets originales.
+    Usuarios, días y emojis siguen distribuciones sesgadas (pocos muy frecuentes, muchos poco frecuentes).
+    """
+
+    date = start + timedelta(days=int(rng.expovariate(0.25)) % 30, seconds=rng.randrange(86400))
+    words = rng.choices(_WORDS, k=rng.randint(5, 30))
+    # Aproximadamente la mitad de los tweets incluye emojis
+    if rng.random() < 0.5:
+        words += rng.choices(_EMOJIS, weights=range(len(_EMOJIS), 0, -1), k=rng.randint(1, 6))
+    rng.shuffle(words)
+    content = " ".join(words)
+    mentioned = {int(rng.paretovariate(1.1)) % n_users for _ in range(rng.choice((0, 0, 1, 1, 2, 3)))}
+
+    return {
+        "url": f"https://twitter.com/i/status/{tweet_id}",
+        "date": date.isoformat(),
+        "content": content,
+        "renderedContent": content,
+        "id": tweet_id,
+        "user": _synthetic_user(int(rng.paretovariate(1.2)) % n_users),
+        "outlinks": [],
+        "tcooutlinks": [],
+        "replyCount": rng.randrange(10),
+        "retweetCount": rng.randrange(100),
+        "likeCount": rng.randrange(500),
+        "quoteCount": rng.randrange(5),
+        "conversationId": tweet_id,
+        "lang": "en",
+        "source": "<a href=\"http://twitter.com/download/android\">Twitter for Android</a>",
+        "sourceUrl": "http://twitter.com/download/android",
+        "sourceLabel": "Twitter for Android",
+        "media": None,
+        "retweetedTweet": None,
+        "quotedTweet": (_synthetic_tweet(rng, tweet_id + 1, start, n_users, nested=False)
+                        if nested and rng.random() < 0.15 else None),
+        "mentionedUsers": [_synthetic_user(index) for index in sorted(mentioned)] or None,
+    }
+
+
+def generate_tweets(file_path: str, size_mb: float, seed: int = 0, n_users: int = 20000) -> int:
+    """
+    Genera un archivo JSON de tweets sintéticos (un tweet por linea) de aproximadamente size_mb megabytes.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo a generar.
+    size_mb : float
+        Tamaño aproximado del archivo en MB.
+    seed : int
+        Semilla para generar siempre el mismo archivo.
+    n_users : int
+        Cantidad de usuarios distintos.
+
+    Returns
+    -------
+    int
+        Cantidad de tweets generados.
+    """
+
+    rng = random.Random(seed)
+    start = datetime(2021, 2, 1, tzinfo=timezone.utc)
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    n_tweets = 0
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        while written < target:
+            line = json.dumps(_synthetic_tweet(rng, n_tweets, start, n_users), ensure_ascii=False) + "\n"
+            file.write(line)
+            written += len(line.encode("utf-8"))
+            n_tweets += 1
+
+    return n_tweets
+
+
+def _dataset(data_dir: str, size_mb: float, seed: int) -> str:
+    """
+    Ruta del dataset sintético de size_mb MB, generándolo si no existe.
+    """
+
+    os.makedirs(data_dir, exist_ok=True)
+    file_path = os.path.join(data_dir, f"tweets_{size_mb:g}mb_seed{seed}.json")
+    if not os.path.exists(file_path):
+        generate_tweets(file_path, size_mb, seed)
+    return file_path
+
+
+def scan_open(file_path: str) -> int:
+    """
+    Cuenta las lineas de un archivo con open en modo binario (referencia de check_peak_rss).
+    """
+
+    with open(file_path, "rb") as file:
+        return sum(1 for _ in file)
+
+
+def scan_iter_lines(file_path: str) -> int:
+    """
+    Cuenta las lineas de un archivo con line_reader.iter_lines.
+    """
+
+    from line_reader import iter_lines
+    return sum(1 for _ in iter_lines(file_path))
+
+
+def scan_iter_offset_lines(file_path: str) -> int:
+    """
+    Cuenta las lineas de un archivo con line_reader.iter_offset_lines.
+    """
+
+    from line_reader import iter_offset_lines
+    return sum(1 for _ in iter_offset_lines(file_path))
+
+
+def scan_iter_mapped_lines(file_path: str) -> int:
+    """
+    Cuenta las lineas de un archivo con line_reader.iter_mapped_lines.
+    """
+
+    from line_reader import iter_mapped_lines
+    return sum(1 for _ in iter_mapped_lines(file_path))
+
+
+def _run_variant(module_name: str, function_name: str, file_path: str, connection):
+    """
+    Ejecuta una variante en un proceso nuevo y envía sus métricas por connection.
+    """
+
+    module = importlib.import_module(module_name)
+    function = getattr(module, function_name)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = function(file_path)
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.perf_counter() - wall_start
+    # ru_maxrss está en KB en Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    connection.send({"result": result, "wall_time": wall_time, "cpu_time": cpu_time, "peak_rss_mb": peak_rss_mb})
+    connection.close()
+
+
+def measure(module_name: str, function_name: str, file_path: str) -> dict:
+    """
+    Mide una variante en un proceso nuevo (spawn), para que el pico de memoria no incluya otras mediciones.
+
+    Returns
+    -------
+    dict
+        Diccionario con result, wall_time (s), cpu_time (s) y peak_rss_mb.
+    """
+
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_variant, args=(module_name, function_name, file_path, sender))
+    process.start()
+    sender.close()
+    try:
+        metrics = receiver.recv()
+    except EOFError:
+        metrics = None
+    process.join()
+    if metrics is None:
+        raise RuntimeError(f"{module_name}.{function_name} terminó con código {process.exitcode}")
+    return metrics
+
+
+def _normalize(question: str, result: list):
+    """
+    Normaliza el resultado de una variante para comparar entre variantes.
+    Las variantes pandas de q2 y q3 entregan (conteo, elemento) y q1 pandas ordena por fecha;
+    los empates en el límite del top pueden quedar en distinto orden, por lo que se comparan
+    los conteos y los elementos que no están empatados con el último.
+    """
+
+    if question == "q1":
+        return sorted(result)
+    pairs = [(second, int(first)) if isinstance(first, numbers.Integral) else (first, int(second))
+             for first, second in result]
+    counts = sorted((count for _, count in pairs), reverse=True)
+    boundary = counts[-1] if counts else 0
+    return counts, sorted(item for item, count in pairs if count > boundary)
+
+
+def _median(values: List[float]) -> float:
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def measure_imports(modules: List[str], repeat: int = 5) -> Dict[str, object]:
+    """
+    Mide el tiempo de importación de cada módulo en procesos nuevos (sin módulos ya cargados ni caches
+    de importación en memoria), como en una ejecución corta desde la linea de comandos.
+
+    Parameters
+    ----------
+    modules : List[str]
+        Módulos de src a importar (ej. "q1_memory").
+    repeat : int
+        Cantidad de procesos por módulo. Se reporta la mediana.
+
+    Returns
+    -------
+    Dict[str, object]
+        Reporte con baseline_s (duración de un proceso de Python sin imports) y una fila por módulo con
+        import_s (tiempo de la importación), process_s (duración del proceso completo) y heavy_modules
+        (dependencias de HEAVY_MODULES cargadas por la importación), o error si no se pudo importar.
+    """
+
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def run(code: str) -> Tuple[float, subprocess.CompletedProcess]:
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", code], cwd=src_dir, capture_output=True, text=True)
+        return time.perf_counter() - start, completed
+
+    baseline = _median([run("pass")[0] for _ in range(repeat)])
+    rows = []
+    for module in modules:
+        import_times, process_times = [], []
+        row = {"module": module}
+        for _ in range(repeat):
+            process_time, completed = run(_IMPORT_CODE.format(module=module, heavy=HEAVY_MODULES))
+            if completed.returncode != 0:
+                row["error"] = (completed.stderr.strip().splitlines() or ["código " + str(completed.returncode)])[-1]
+                break
+            seconds, heavy = json.loads(completed.stdout)
+            import_times.append(seconds)
+            process_times.append(process_time)
+        else:
+            row.update(import_s=round(_median(import_times), 4), process_s=round(_median(process_times), 4),
+                       heavy_modules=heavy)
+        rows.append(row)
+
+    return {"python": platform.python_version(), "repeat": repeat, "baseline_s": round(baseline, 4), "modules": rows}
+
+
+def check_peak_rss(sizes_mb: List[float], data_dir: str, seed: int = 0,
+                   max_growth: float = RSS_MAX_GROWTH) -> Dict[str, object]:
+    """
+    Verifica que el pico de memoria de las lecturas secuenciales (RSS_SCANS) y de las variantes *_memory
+    no crezca con el tamaño del archivo, midiendo cada una en un proceso nuevo sobre datasets de distintos
+    tamaños.
+
+    Parameters
+    ----------
+    sizes_mb : List[float]
+        Tamaños de los datasets en MB (al menos dos distintos).
+    data_dir : str
+        Carpeta donde se guardan los datasets generados.
+    seed : int
+        Semilla de generación de datos.
+    max_growth : float
+        Crecimiento máximo aceptado del pico de memoria, en MB de RSS por MB de archivo, entre el dataset
+        más chico y el más grande.
+
+    Returns
+    -------
+    Dict[str, object]
+        Reporte con una fila por lectura (peak_rss_mb por tamaño, growth y ok) y ok global.
+    """
+
+    sizes_mb = sorted(set(sizes_mb))
+    if len(sizes_mb) < 2:
+        raise ValueError("check_peak_rss requiere al menos dos tamaños distintos")
+    files = [_dataset(data_dir, size_mb, seed) for size_mb in sizes_mb]
+    files_mb = [os.path.getsize(file_path) / (1024 * 1024) for file_path in files]
+
+    readers = dict(RSS_SCANS)
+    readers.update({name: VARIANTS[name[:2]][name] for name in ("q1_memory", "q2_memory", "q3_memory")})
+    rows = []
+    for name, (module_name, function_name) in readers.items():
+        peaks = [measure(module_name, function_name, file_path)["peak_rss_mb"] for file_path in files]
+        growth = (peaks[-1] - peaks[0]) / (files_mb[-1] - files_mb[0])
+        rows.append({"reader": name, "peak_rss_mb": [round(peak, 1) for peak in peaks],
+                     "growth": round(growth, 3), "ok": growth <= max_growth})
+
+    return {"sizes_mb": [round(file_mb, 2) for file_mb in files_mb], "max_growth": max_growth,
+            "results": rows, "ok": all(row["ok"] for row in rows)}
+
+
+def _git_commit() -> Optional[str]:
+    """
+    Commit actual del repositorio, para comparar reportes entre commits.
+    """
+
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sizes_mb: List[float], data_dir: str, questions: List[str], variants: Optional[List[str]] = None,
+                  repeat: int = 1, seed: int = 0) -> Dict[str, object]:
+    """
+    Ejecuta las variantes de cada pregunta sobre datasets sintéticos de distintos tamaños.
+
+    Parameters
+    ----------
+    sizes_mb : List[float]
+        Tamaños de los datasets a generar en MB (se reutilizan si ya existen).
+    data_dir : str
+        Carpeta donde se guardan los datasets generados.
+    questions : List[str]
+        Preguntas a medir ("q1", "q2", "q3").
+    variants : List[str], optional
+        Variantes a medir (ej. "q1_memory"). Por defecto todas las de cada pregunta.
+    repeat : int
+        Cantidad de repeticiones por variante (se reportan todas).
+    seed : int
+        Semilla de generación de datos.
+
+    Returns
+    -------
+    Dict[str, object]
+        Reporte con metadatos de la ejecución, una fila por medición y si las variantes coinciden.
+    """
+
+    rows = []
+    agreement = {}
+
+    for size_mb in sizes_mb:
+        file_path = _dataset(data_dir, size_mb, seed)
+        file_mb = os.path.getsize(file_path) / (1024 * 1024)
+        with open(file_path, "rb") as file:
+            n_tweets = sum(1 for _ in file)
+
+        for question in questions:
+            normalized = {}
+            for name, (module_name, function_name) in VARIANTS[question].items():
+                if variants is not None and name not in variants:
+                    continue
+                for iteration in range(repeat):
+                    metrics = measure(module_name, function_name, file_path)
+                    normalized[name] = _normalize(question, metrics["result"])
+                    rows.append({
+                        "size_mb": round(file_mb, 2),
+                        "tweets": n_tweets,
+                        "question": question,
+                        "variant": name,
+                        "iteration": iteration,
+                        "wall_time_s": round(metrics["wall_time"], 4),
+                        "cpu_time_s": round(metrics["cpu_time"], 4),
+                        "peak_rss_mb": round(metrics["peak_rss_mb"], 1),
+                        "tweets_per_s": round(n_tweets / metrics["wall_time"], 1),
+                        "mb_per_s": round(file_mb / metrics["wall_time"], 2),
+                    })
+            agreement[f"{question}@{size_mb:g}mb"] = len({json.dumps(value, default=str) for value in normalized.values()}) <= 1
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "results": rows,
+        "agreement": agreement,
+    }
+
+
+def write_report(report: Dict[str, object], json_path: Optional[str] = None, csv_path: Optional[str] = None):
+    """
+    Guarda el reporte como JSON (completo) y/o CSV (una fila por medición, con el commit).
+    """
+
+    if json_path is not None:
+        with open(json_path, "w") as file:
+            json.dump(report, file, indent=2)
+    if csv_path is not None and report["results"]:
+        with open(csv_path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=["commit"] + list(report["results"][0]))
+            writer.writeheader()
+            for row in report["results"]:
+                writer.writerow({"commit": report["commit"], **row})
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark reproducible de las variantes q1, q2 y q3.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[10], help="Tamaños de los datasets en MB")
+    parser.add_argument("--data-dir", default="benchmark_data", help="Carpeta para los datasets sintéticos")
+    parser.add_argument("--questions", nargs="+", default=["q1", "q2", "q3"], choices=list(VARIANTS))
+    parser.add_argument("--variants", nargs="+", default=None, help="Variantes a medir (por defecto todas)")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones por variante")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de generación de datos")
+    parser.add_argument("--json", default="benchmark_report.json", help="Ruta del reporte JSON")
+    parser.add_argument("--csv", default=None, help="Ruta del reporte CSV")
+    parser.add_argument("--check-rss", action="store_true",
+                        help="Solo verifica que el pico de memoria de las lecturas y variantes *_memory no crezca "
+                             "con el tamaño del archivo (requiere al menos dos tamaños en --sizes)")
+    args = parser.parse_args(argv)
+
+    if args.check_rss:
+        if len(set(args.sizes)) < 2:
+            parser.error("--check-rss requiere al menos dos tamaños distintos en --sizes")
+        report = check_peak_rss(args.sizes, args.data_dir, args.seed)
+        sizes = " / ".join(f"{size:g} MB" for size in report["sizes_mb"])
+        print(f"Pico de RSS con archivos de {sizes} (crecimiento máximo {report['max_growth']} MB por MB)")
+        for row in report["results"]:
+            peaks = " / ".join(f"{peak:.1f}" for peak in row["peak_rss_mb"])
+            print(f'{row["reader"]:<18} {peaks:>16} MB  {row["growth"]:>6.3f} MB/MB  {"ok" if row["ok"] else "CRECE"}')
+        sys.exit(0 if report["ok"] else 1)
+
+    report = run_benchmark(args.sizes, args.data_dir, args.questions, args.variants, args.repeat, args.seed)
+    write_report(report, args.json, args.csv)
+
+    for row in report["results"]:
+        print(f'{row["size_mb"]:>9} MB  {row["variant"]:<16} {row["wall_time_s"]:>9.3f} s  '
+              f'{row["peak_rss_mb"]:>8.1f} MB RSS  {row["tweets_per_s"]:>11.1f} tweets/s')
+    for key, agree in report["agreement"].items():
+        print(f"{key}: {'variantes coinciden' if agree else 'VARIANTES NO COINCIDEN'}")
+
+
+if __name__ == "__main__":
+    main()
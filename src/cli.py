@@ -0,0 +1,204 @@
+from typing import Callable, List, Optional
+from datetime import date
+import argparse
+import importlib
+import json
+import sys
+from window import check_n
+
+# Función a ejecutar por modo: modo -> (módulo, función), con "{q}" reemplazado por la pregunta (q1, q2, q3).
+# Los módulos se importan recién al ejecutar, por lo que cada modo solo carga sus dependencias
+# (ej. "memory" no importa pandas, Polars ni google-cloud).
+MODES = {
+    "time": ("{q}_time", "{q}_time"),
+    "memory": ("{q}_memory", "{q}_memory"),
+    "pandas": ("{q}_time", "{q}_time_pandas"),
+    "bigquery": ("gcp", "{q}_bigquery"),
+    "parallel": ("parallel", "{q}_parallel"),
+}
+
+QUESTIONS = ("q1", "q2", "q3")
+
+
+def positive_int(value: str) -> int:
+    """
+    Tipo de argparse para enteros mayores o iguales a 1 (ej. --n), con la validación de window.check_n.
+    """
+
+    try:
+        return check_n(int(value))
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f"debe ser un entero mayor o igual a 1, no {value!r}")
+
+
+def resolve(question: str, mode: str) -> Callable:
+    """
+    Importa y entrega la función de una pregunta en un modo.
+
+    Parameters
+    ----------
+    question : str
+        "q1", "q2" o "q3".
+    mode : str
+        Uno de los modos de MODES.
+
+    Returns
+    -------
+    Callable
+        Función q* correspondiente.
+    """
+
+    if question not in QUESTIONS:
+        raise ValueError(f"question debe ser uno de {QUESTIONS}, no {question!r}")
+    if mode not in MODES:
+        raise ValueError(f"mode debe ser uno de {tuple(MODES)}, no {mode!r}")
+    module_name, function_name = (name.format(q=question) for name in MODES[mode])
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _to_json(value):
+    """
+    Convierte valores de los resultados que json no serializa: fechas (a ISO 8601) y enteros de numpy.
+    """
+
+    if isinstance(value, date):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} no es serializable a JSON")
+
+
+def format_result(result: list, output_format: str) -> str:
+    """
+    Formatea el resultado de una función q*: "json" (lista de pares) o "text" (un par por linea, separado por tab).
+    """
+
+    if output_format == "json":
+        return json.dumps([list(row) for row in result], ensure_ascii=False, default=_to_json)
+    return "\n".join("\t".join(value.isoformat() if isinstance(value, date) else str(value) for value in row)
+                     for row in result)
+
+
+def run(args: argparse.Namespace) -> str:
+    """
+    Ejecuta el subcomando run: resuelve la función, arma sus argumentos según el modo y formatea el resultado.
+    """
+
+    function = resolve(args.question, args.mode)
+    kwargs = {"n": args.n, "start_date": args.start_date, "end_date": args.end_date}
+    if args.granularity is not None:
+        if args.question != "q1" or args.mode in ("bigquery", "parallel"):
+            raise ValueError("--granularity solo aplica a q1 en los modos time, memory y pandas")
+        kwargs["granularity"] = args.granularity
+
+    if args.mode == "bigquery":
+        missing = [option for option in ("keyfile", "project", "dataset", "table") if getattr(args, option) is None]
+        if missing:
+            raise ValueError("El modo bigquery requiere " + ", ".join(f"--{option}" for option in missing))
+        result = function(args.keyfile, args.project, args.dataset, args.table, **kwargs)
+    else:
+        if args.input is None:
+            raise ValueError(f"El modo {args.mode} requiere --input")
+        if args.chunksize is not None:
+            if args.mode != "pandas":
+                raise ValueError("--chunksize solo aplica al modo pandas")
+            kwargs["chunksize"] = args.chunksize
+        result = function(args.input, **kwargs)
+
+    return format_result(result, args.format)
+
+
+def cache(args: argparse.Namespace) -> str:
+    """
+    Ejecuta el subcomando cache: construye las estructuras auxiliares del archivo que las consultas usan
+    mientras estén vigentes, y entrega sus rutas (una por linea).
+
+    - "parquet": cache columnar usado por los modos time y pandas (ver tweet_cache.py).
+    - "index": índice de fechas usado por el modo memory con ventana de fechas (ver date_index.py). Solo para
+      archivos sin comprimir: por defecto se omite en archivos comprimidos.
+    """
+
+    from compression import compression_of
+
+    parts = args.parts
+    if parts is None:
+        parts = ["parquet"] if compression_of(args.input) is not None else ["parquet", "index"]
+
+    paths = []
+    if "parquet" in parts:
+        from tweet_cache import build_cache
+        paths.append(build_cache(args.input))
+    if "index" in parts:
+        from date_index import build_date_index
+        paths.append(build_date_index(args.input, hours=args.hours))
+    return "\n".join(paths)
+
+
+def bench_imports(args: argparse.Namespace) -> str:
+    """
+    Ejecuta el subcomando bench-imports: tiempo de importación de cada modo en procesos nuevos (ver benchmark.py).
+    """
+
+    from benchmark import measure_imports
+
+    modules = sorted({MODES[mode][0].format(q=question) for mode in args.modes for question in QUESTIONS})
+    report = measure_imports(modules, args.repeat)
+    if args.format == "json":
+        return json.dumps(report, indent=2)
+    lines = [f'{"módulo":<12} {"import":>9} {"proceso":>9}  dependencias cargadas',
+             f'{"(ninguno)":<12} {"":>9} {report["baseline_s"]:>7.3f} s']
+    for row in report["modules"]:
+        if "error" in row:
+            lines.append(f'{row["module"]:<12} error: {row["error"]}')
+        else:
+            lines.append(f'{row["module"]:<12} {row["import_s"]:>7.3f} s {row["process_s"]:>7.3f} s  '
+                         f'{", ".join(row["heavy_modules"]) or "-"}')
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Consultas q1, q2 y q3 sobre tweets.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Ejecuta una pregunta y escribe el resultado")
+    run_parser.add_argument("question", choices=QUESTIONS)
+    run_parser.add_argument("--mode", choices=list(MODES), default="memory")
+    run_parser.add_argument("--input", help="Ruta del archivo JSON con tweets (puede estar comprimido)")
+    run_parser.add_argument("--n", type=positive_int, default=10, help="Cantidad de elementos del top")
+    run_parser.add_argument("--start-date", type=date.fromisoformat, help="Primer día de la ventana (YYYY-MM-DD)")
+    run_parser.add_argument("--end-date", type=date.fromisoformat, help="Último día de la ventana (YYYY-MM-DD)")
+    run_parser.add_argument("--granularity", choices=["hour", "day", "week"], help="Agrupación del tiempo de q1")
+    run_parser.add_argument("--chunksize", type=int, help="Tweets por chunk en el modo pandas")
+    run_parser.add_argument("--format", choices=["json", "text"], default="json")
+    run_parser.add_argument("--keyfile", help="Archivo JSON de la cuenta de servicio (modo bigquery)")
+    run_parser.add_argument("--project", help="ID del proyecto en Google Cloud (modo bigquery)")
+    run_parser.add_argument("--dataset", help="ID del dataset en BigQuery (modo bigquery)")
+    run_parser.add_argument("--table", help="Nombre de la tabla en BigQuery (modo bigquery)")
+    run_parser.set_defaults(handler=run)
+
+    cache_parser = subparsers.add_parser("cache", help="Construye el cache columnar y el índice de fechas de un archivo")
+    cache_parser.add_argument("input", help="Ruta del archivo JSON con tweets (puede estar comprimido)")
+    cache_parser.add_argument("--parts", nargs="+", choices=["parquet", "index"],
+                              help="Estructuras a construir (por defecto ambas, o solo parquet si está comprimido)")
+    cache_parser.add_argument("--hours", action="store_true",
+                              help="Indexa también cada hora, para q1 con --granularity hour")
+    cache_parser.set_defaults(handler=cache)
+
+    bench_parser = subparsers.add_parser("bench-imports", help="Mide el tiempo de importación de cada modo")
+    bench_parser.add_argument("--modes", nargs="+", choices=list(MODES), default=["time", "memory"])
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Procesos por módulo (se reporta la mediana)")
+    bench_parser.add_argument("--format", choices=["json", "text"], default="text")
+    bench_parser.set_defaults(handler=bench_imports)
+
+    args = parser.parse_args(argv)
+    try:
+        output = args.handler(args)
+    except (ImportError, OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+from typing import BinaryIO, Dict, Iterator, Optional
+import bz2
+import gzip
+import hashlib
+import os
+
+# Extensiones de archivos comprimidos soportados y su formato
+COMPRESSIONS = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd"}
+
+# Tamaño de los bloques descomprimidos entregados por iter_chunks
+CHUNK_SIZE = 64 << 20
+
+# Tamaño de cada bloque del archivo usado para calcular su huella (inicio, medio y final)
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def compression_of(file_path: str) -> Optional[str]:
+    """
+    Formato de compresión de un archivo según su extensión.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo.
+
+    Returns
+    -------
+    Optional[str]
+        "gzip", "bz2", "zstd", o None si el archivo no está comprimido.
+    """
+
+    return COMPRESSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+def file_fingerprint(file_path: str) -> Dict[str, object]:
+    """
+    Huella del contenido de un archivo para invalidar datos derivados de él (cache columnar, índice de fechas).
+
+    Se usa tamaño, fecha de modificación y un hash de bloques al inicio, medio y final del archivo
+    (no del archivo completo, para que verificar la huella no cueste una lectura completa).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo.
+
+    Returns
+    -------
+    Dict[str, object]
+        Diccionario con "size", "mtime_ns" y "hash".
+    """
+
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        for offset in (0, stat.st_size // 2, max(stat.st_size - _HASH_BLOCK_SIZE, 0)):
+            file.seek(offset)
+            digest.update(file.read(_HASH_BLOCK_SIZE))
+
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()}
+
+
+def open_input(file_path: str) -> BinaryIO:
+    """
+    Abre un archivo de tweets en modo binario, descomprimiéndolo en streaming si es .gz, .bz2 o .zst.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (comprimido o no).
+
+    Returns
+    -------
+    BinaryIO
+        Archivo binario iterable linea a linea con el contenido descomprimido.
+    """
+
+    compression = compression_of(file_path)
+    if compression == "gzip":
+        return gzip.open(file_path, "rb")
+    if compression == "bz2":
+        return bz2.open(file_path, "rb")
+    if compression == "zstd":
+        # Dependencia solo necesaria para archivos .zst
+        import zstandard
+        import io
+        # Se envuelve el lector en un buffer para poder iterar linea a linea
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True))
+    return open(file_path, "rb")
+
+
+def iter_chunks(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Lee un archivo (comprimido o no) en bloques descomprimidos de aproximadamente chunk_size bytes,
+    cortados al final de una linea.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+    chunk_size : int
+        Tamaño aproximado de cada bloque en bytes.
+
+    Returns
+    -------
+    Iterator[bytes]
+        Bloques con lineas completas.
+    """
+
+    with open_input(file_path) as file:
+        # Resto de la ultima linea incompleta del bloque anterior
+        remainder = b""
+        while True:
+            data = file.read(chunk_size)
+            if not data:
+                break
+            data = remainder + data
+            # Corte en el ultimo salto de linea del bloque
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                remainder = data
+                continue
+            remainder = data[cut:]
+            yield data[:cut]
+        if remainder:
+            yield remainder
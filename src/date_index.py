@@ -0,0 +1,193 @@
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from datetime import date
+import json
+import os
+from projection import project_hour
+from compression import compression_of, file_fingerprint
+from line_reader import iter_mapped_lines
+from window import date_window, prefix_window
+
+# Versión del formato del índice. Índices con otra versión se descartan.
+INDEX_VERSION = 1
+
+# Distancia máxima en bytes entre lineas de un mismo día para guardarlas en un solo rango.
+# Los rangos pueden incluir lineas de otros días intercaladas, que se descartan al leer revisando la fecha de
+# cada linea, a cambio de que el índice tenga pocos rangos aunque el archivo no esté ordenado por fecha.
+MERGE_GAP = 256 << 10
+
+
+def index_path(file_path: str) -> str:
+    """
+    Ruta del índice de fechas de un archivo (junto al archivo fuente).
+    """
+
+    return file_path + ".dateindex.json"
+
+
+def _add_line(entries: Dict[str, dict], key: str, start: int, end: int):
+    """
+    Registra una linea [start, end) en la entrada de su día u hora, extendiendo el último rango si está cerca.
+    """
+
+    entry = entries.get(key)
+    if entry is None:
+        entries[key] = {"count": 1, "ranges": [[start, end]]}
+        return
+    entry["count"] += 1
+    last = entry["ranges"][-1]
+    if start - last[1] <= MERGE_GAP:
+        last[1] = end
+    else:
+        entry["ranges"].append([start, end])
+
+
+def build_date_index(file_path: str, hours: bool = False) -> str:
+    """
+    Construye el índice de fechas de un archivo JSON con tweets en una sola lectura secuencial:
+    para cada día (y opcionalmente cada hora) la cantidad de tweets y los rangos de bytes donde están.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (sin comprimir, para poder saltar a cada rango).
+    hours : bool
+        Si es True se indexa también cada hora ("YYYY-MM-DDTHH"), para q1 con granularidad "hour".
+
+    Returns
+    -------
+    str
+        Ruta del índice generado.
+    """
+
+    if compression_of(file_path) is not None:
+        raise ValueError("El índice de fechas requiere un archivo sin comprimir para saltar a cada rango")
+
+    # La huella se calcula antes de leer, si el archivo cambia durante la lectura el índice queda obsoleto
+    source = file_fingerprint(file_path)
+
+    # Entradas por día y por hora, en orden de primera aparición en el archivo
+    days = {}
+    hour_entries = {}
+    for offset, line in iter_mapped_lines(file_path):
+        end = offset + len(line)
+        prefix = project_hour(line)
+        _add_line(days, prefix[:10], offset, end)
+        if hours:
+            _add_line(hour_entries, prefix, offset, end)
+
+    index = {"version": INDEX_VERSION, "source": source, "days": days}
+    if hours:
+        index["hours"] = hour_entries
+
+    # Escritura en archivo temporal y reemplazo atómico
+    path = index_path(file_path)
+    with open(path + ".tmp", "w") as file:
+        json.dump(index, file)
+    os.replace(path + ".tmp", path)
+
+    return path
+
+
+def load_date_index(file_path: str) -> Optional[dict]:
+    """
+    Lee el índice de fechas del archivo si existe y corresponde al contenido actual del archivo.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+
+    Returns
+    -------
+    Optional[dict]
+        Índice con "days" (y "hours" si se construyó con horas): key -> {"count", "ranges"},
+        o None si no hay índice, el archivo está comprimido o el índice está obsoleto.
+    """
+
+    path = index_path(file_path)
+    if compression_of(file_path) is not None or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as file:
+            index = json.load(file)
+    except ValueError:
+        return None
+    if index.get("version") != INDEX_VERSION or index.get("source") != file_fingerprint(file_path):
+        return None
+    return index
+
+
+def merge_ranges(ranges: List[List[int]]) -> List[Tuple[int, int]]:
+    """
+    Ordena y une rangos de bytes que se solapan o son contiguos.
+    """
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def window_ranges(index: dict, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> List[Tuple[int, int]]:
+    """
+    Rangos de bytes (ordenados y sin solaparse) que contienen todos los tweets de la ventana de fechas.
+
+    Parameters
+    ----------
+    index : dict
+        Índice de fechas (ver load_date_index).
+    start_date : datetime.date, optional
+        Primer día de la ventana (incluido).
+    end_date : datetime.date, optional
+        Último día de la ventana (incluido).
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        Lista de rangos (inicio, fin) en bytes.
+    """
+
+    window = prefix_window(*date_window(start_date, end_date))
+    ranges = []
+    for day, entry in index["days"].items():
+        if window is None or window[0] <= day <= window[1]:
+            ranges.extend(entry["ranges"])
+    return merge_ranges(ranges)
+
+
+def iter_window_lines(file_path: str, start_date: Optional[date] = None,
+                      end_date: Optional[date] = None) -> Iterator[Union[bytes, memoryview]]:
+    """
+    Itera las lineas de un archivo que pueden pertenecer a la ventana de fechas.
+
+    Si la ventana tiene algún extremo y el archivo tiene un índice de fechas vigente, se leen solo los rangos
+    de los días de la ventana. Si no, se lee el archivo completo (comprimido o no). En ambos casos se pueden
+    entregar lineas fuera de la ventana, por lo que se debe revisar la fecha de cada linea.
+    Las lineas se leen sin copiarlas desde ventanas del archivo mapeadas en memoria, y cada una es válida solo
+    hasta pedir la siguiente (ver line_reader.iter_mapped_lines).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    start_date : datetime.date, optional
+        Primer día de la ventana (incluido).
+    end_date : datetime.date, optional
+        Último día de la ventana (incluido).
+
+    Returns
+    -------
+    Iterator[Union[bytes, memoryview]]
+        Lineas del archivo (memoryview, o bytes en archivos comprimidos).
+    """
+
+    start_date, end_date = date_window(start_date, end_date)
+    index = None if start_date is None and end_date is None else load_date_index(file_path)
+    ranges = None if index is None else window_ranges(index, start_date, end_date)
+    for _, line in iter_mapped_lines(file_path, ranges):
+        yield line
@@ -0,0 +1,199 @@
+from typing import TYPE_CHECKING, Callable, Dict, List
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+from instrumentation import counter
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# Cantidad máxima de textos distintos con sus emojis guardados en cada EmojiCache
+EMOJI_CACHE_SIZE = 1 << 16
+
+# Caracteres de unión de secuencias de emojis: ZWJ (U+200D) y etiquetas de banderas de subdivisiones
+# (U+E0020 a U+E007F). Un texto con alguno de ellos fuera de los emojis reconocidos por EMOJI_PATTERN puede
+# tener secuencias que no existen en la base de datos de emoji, que emoji.emoji_list separa con reglas propias.
+JOINER_PATTERN = "[\u200d\U000e0020-\U000e007f]"
+
+# Caracteres con significado especial en expresiones regulares (sintaxis común a re de Python y regex de Polars/Rust)
+_SPECIAL_CHARS = set("\\.+*?()|[]{}^$#&-~")
+
+
+def _escape(text: str) -> str:
+    """
+    Escapa los caracteres especiales de un texto para usarlo como literal en una expresión regular.
+    """
+
+    return "".join("\\" + char if char in _SPECIAL_CHARS else char for char in text)
+
+
+def build_emoji_pattern() -> str:
+    """
+    Construye una expresión regular que reconoce todos los emojis de la base de datos de la librería emoji,
+    para motores con expresiones regulares nativas (funciones str de Polars). En Python se usa list_emojis,
+    ya que la alternativa de miles de emojis con re es varias veces más lenta que el tokenizador de emoji.
+
+    Las alternativas se ordenan de mayor a menor largo, por lo que en cada posición se reconoce el emoji más
+    largo posible, igual que el tokenizador de emoji.emoji_list: secuencias ZWJ, modificadores de tono de piel
+    y selectores de variación forman un solo emoji cuando la secuencia completa existe en la base de datos.
+    El resultado es el mismo que emoji.emoji_list salvo en textos con caracteres de unión (JOINER_PATTERN)
+    fuera de los emojis reconocidos, que polars_emojis resuelve con emoji.emoji_list.
+
+    Returns
+    -------
+    str
+        Expresión regular compatible con la sintaxis de regex de Polars/Rust.
+    """
+
+    import emoji
+
+    emojis = sorted(emoji.EMOJI_DATA, key=len, reverse=True)
+    return "|".join(_escape(item) for item in emojis)
+
+
+@lru_cache(maxsize=None)
+def _emoji_pattern() -> str:
+    return build_emoji_pattern()
+
+
+def __getattr__(name: str):
+    # Expresión regular (EMOJI_PATTERN) construida una sola vez al usarla por primera vez y no al importar
+    # el módulo (construirla toma más que el resto de la importación)
+    if name == "EMOJI_PATTERN":
+        return _emoji_pattern()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def list_emojis(content: str) -> List[str]:
+    """
+    Extrae emojis que aparecen en el texto con el tokenizador de la librería emoji (sin expresión regular).
+
+    Parameters
+    ----------
+    content : str
+        String con posibles emojis.
+
+    Returns
+    -------
+    List[str]
+        Lista con emojis que aparecen en el contenido.
+    """
+
+    import emoji
+
+    # Obtención de lista de diccionarios por cada emoji de la forma: {'match_start': 262, 'match_end': 263, 'emoji': '🚜'}
+    return [match["emoji"] for match in emoji.emoji_list(content)]
+
+
+def _resolve_emojis(batch: "pl.Series") -> "pl.Series":
+    """
+    Reemplaza los emojis encontrados con EMOJI_PATTERN por los de list_emojis en las filas marcadas
+    como no resueltas (ver polars_emojis).
+    """
+
+    import polars as pl
+
+    content = batch.struct.field("content")
+    matches = batch.struct.field("matches")
+    unresolved = batch.struct.field("unresolved")
+    rows = unresolved.arg_true()
+    if rows.is_empty():
+        return matches
+    # Emojis con el tokenizador de emoji solo en las filas marcadas (nulo en el resto)
+    values = [None] * len(batch)
+    for row, text in zip(rows.to_list(), content.gather(rows).to_list()):
+        values[row] = list_emojis(text)
+    resolved = pl.Series(values, dtype=pl.List(pl.Utf8))
+    return pl.select(pl.when(unresolved).then(resolved).otherwise(matches)).to_series()
+
+
+def polars_emojis(content: "pl.Expr") -> "pl.Expr":
+    """
+    Expresión de Polars con la lista de emojis de cada texto, con el mismo resultado que emoji.emoji_list.
+
+    Los emojis se extraen con EMOJI_PATTERN dentro de Polars. Solo los textos con caracteres de unión
+    (JOINER_PATTERN) que no quedaron dentro de un emoji reconocido, donde el tokenizador de emoji separa las
+    secuencias con reglas propias, se vuelven a procesar con list_emojis.
+
+    Parameters
+    ----------
+    content : pl.Expr
+        Expresión con los textos (Utf8).
+
+    Returns
+    -------
+    pl.Expr
+        Expresión con la lista de emojis de cada texto (List(Utf8), nulo si el texto es nulo).
+    """
+
+    import polars as pl
+
+    matches = content.str.extract_all(_emoji_pattern())
+    # Textos con caracteres de unión fuera de los emojis encontrados
+    unresolved = content.str.count_matches(JOINER_PATTERN) != matches.list.join("").str.count_matches(JOINER_PATTERN)
+    return (pl.struct(content=content, matches=matches, unresolved=unresolved)
+            .map_batches(_resolve_emojis, return_dtype=pl.List(pl.Utf8)))
+
+
+class EmojiCache:
+    """
+    Cache LRU de los emojis de cada texto, para no volver a buscar emojis en contenidos repetidos
+    (retweets, campañas de copiar y pegar).
+
+    La clave es un hash blake2b de 16 bytes del contenido, por lo que el cache no guarda los textos y su tamaño
+    queda acotado por maxsize. Los textos solo ASCII se saltan sin buscar ni guardar nada, ya que todos los emojis
+    incluyen caracteres no ASCII. Las listas entregadas se comparten entre llamadas y no se deben modificar.
+
+    Parameters
+    ----------
+    extract : Callable[[str], List[str]]
+        Función que extrae los emojis de un texto (list_emojis por defecto, con el tokenizador de la librería emoji).
+    maxsize : int
+        Cantidad máxima de textos distintos guardados.
+    """
+
+    def __init__(self, extract: Callable[[str], List[str]] = list_emojis, maxsize: int = EMOJI_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize debe ser mayor o igual a 1")
+        self.extract = extract
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        # Textos encontrados en el cache, no encontrados y saltados por ser solo ASCII
+        self.hits = 0
+        self.misses = 0
+        self.ascii = 0
+
+    def __call__(self, content: str) -> List[str]:
+        # Texto solo ASCII: no puede tener emojis
+        if content.isascii():
+            self.ascii += 1
+            return []
+        key = hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        emojis = self._entries.get(key)
+        if emojis is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return emojis
+        self.misses += 1
+        emojis = self._entries[key] = self.extract(content)
+        # Se descarta el texto usado hace más tiempo
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return emojis
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Conteo de textos encontrados en el cache ("hits"), no encontrados ("misses"), saltados por ser solo ASCII
+        ("ascii") y cantidad de textos guardados ("size").
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "ascii": self.ascii, "size": len(self._entries)}
+
+    def report(self):
+        """
+        Suma los conteos del cache a la ejecución instrumentada en curso (ver instrumentation.counter).
+        """
+
+        counter("emoji_cache_hits", self.hits)
+        counter("emoji_cache_misses", self.misses)
+        counter("emoji_cache_ascii", self.ascii)
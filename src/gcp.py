@@ -1,10 +1,213 @@
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+from collections import OrderedDict
 from datetime import datetime
-from google.cloud import storage, bigquery
+from functools import lru_cache
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import json
+import os
+import re
+import tempfile
+from emoji_regex import EmojiCache
+from instrumentation import profiled, stage
+from line_reader import iter_lines
+from window import check_n, date_window
 
-def q1_bigquery(keyfile_path: str, project_id: str, dataset_id: str, table_name: str) -> List[Tuple[datetime.date, str]]:
+if TYPE_CHECKING:
+    from google.cloud import bigquery, storage
+
+# Tamaño máximo (sin comprimir) de cada chunk proyectado que se sube a Cloud Storage
+LOAD_CHUNK_SIZE = 64 << 20
+
+# Nivel de compresión gzip de los chunks (el 9 por defecto es varias veces más lento y casi no reduce el tamaño)
+COMPRESS_LEVEL = 6
+
+# Tamaño de cada parte de una subida resumible (debe ser múltiplo de 256 KB)
+UPLOAD_CHUNK_SIZE = 8 << 20
+
+# Cantidad máxima de chunks subiéndose a la vez (también acota los chunks guardados en disco)
+MAX_CONCURRENT_UPLOADS = 8
+
+# Cantidad máxima de URIs de origen por load job de BigQuery
+MAX_LOAD_URIS = 10000
+
+
+@lru_cache(maxsize=None)
+def _load_schema() -> List["bigquery.SchemaField"]:
+    # Esquema de la tabla en BigQuery: las mismas columnas proyectadas que tweet_schema.TWEET_SCHEMA,
+    # más la lista de emojis de content (precalculada al cargar, usada por q2_bigquery)
+    from google.cloud import bigquery
+
+    return [
+        bigquery.SchemaField("date", "TIMESTAMP"),
+        bigquery.SchemaField("content", "STRING"),
+        bigquery.SchemaField("user", "RECORD", fields=[bigquery.SchemaField("username", "STRING")]),
+        bigquery.SchemaField("mentionedUsers", "RECORD", mode="REPEATED",
+                             fields=[bigquery.SchemaField("username", "STRING")]),
+        bigquery.SchemaField("emojis", "STRING", mode="REPEATED"),
+    ]
+
+
+def __getattr__(name: str):
+    # LOAD_SCHEMA se construye al usarlo por primera vez, para que importar el módulo no importe google-cloud
+    # (las librerías de Google Cloud se importan recién en las funciones que las usan)
+    if name == "LOAD_SCHEMA":
+        return _load_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Formato de las IDs usadas para construir el nombre de la tabla (los identificadores no pueden ser parámetros
+# de una query): proyecto (opcionalmente con dominio, ej. "example.com:proyecto"), dataset y tabla
+_PROJECT_PATTERN = re.compile(r"(?:[a-z][a-z0-9.-]*[a-z0-9]:)?[a-z][a-z0-9-]{4,28}[a-z0-9]")
+_NAME_PATTERN = re.compile(r"[A-Za-z0-9_]{1,1024}")
+
+# Cantidad máxima de resultados de queries guardados en memoria
+RESULT_CACHE_SIZE = 128
+
+# Resultados de queries ya ejecutadas: (query, parámetros, tabla, última modificación de la tabla) -> filas
+_results = OrderedDict()
+
+# Filtro de la ventana de fechas, común a q1, q2 y q3 (parámetros @start_date y @end_date, NULL sin límite)
+_WINDOW_FILTER = ("WHERE (@start_date IS NULL OR CAST(date AS DATE) >= @start_date) "
+                  "AND (@end_date IS NULL OR CAST(date AS DATE) <= @end_date)")
+
+
+@lru_cache(maxsize=None)
+def get_client(keyfile_path: str, project_id: str) -> "bigquery.Client":
+    """
+    Cliente de BigQuery autenticado con la cuenta de servicio, creado una sola vez por keyfile y proyecto
+    y reutilizado entre llamadas (evita repetir la autenticación y la conexión en cada query).
+
+    Parameters
+    ----------
+    keyfile_path : str
+        Ruta del archivo JSON para autenticar la cuenta de servicio
+    project_id : str
+        La ID del proyecto en Google Cloud Platform
+
+    Returns
+    -------
+    bigquery.Client
+        Cliente de BigQuery compartido.
+    """
+
+    from google.cloud import bigquery
+
+    return bigquery.Client.from_service_account_json(keyfile_path, project=project_id)
+
+
+def table_reference(project_id: str, dataset_id: str, table_name: str) -> str:
     """
-    Lee archivo JSON con tweets desde path y devuelve las top 10 fechas donde hay más tweets,
+    Valida las IDs y construye el nombre completo "proyecto.dataset.tabla".
+
+    Parameters
+    ----------
+    project_id : str
+        La ID del proyecto en Google Cloud Platform
+    dataset_id : str
+        La ID del dataset en BigQuery
+    table_name : str
+        El nombre de la tabla dentro del dataset en BigQuery
+
+    Returns
+    -------
+    str
+        Nombre completo de la tabla, seguro para usar entre comillas invertidas en una query.
+    """
+
+    if not _PROJECT_PATTERN.fullmatch(project_id):
+        raise ValueError(f"project_id inválido: {project_id!r}")
+    if not _NAME_PATTERN.fullmatch(dataset_id):
+        raise ValueError(f"dataset_id inválido: {dataset_id!r}")
+    if not _NAME_PATTERN.fullmatch(table_name):
+        raise ValueError(f"table_name inválido: {table_name!r}")
+    return f"{project_id}.{dataset_id}.{table_name}"
+
+
+def _query_parameters(n: int, start_date, end_date) -> List["bigquery.ScalarQueryParameter"]:
+    """
+    Parámetros comunes de las queries (@n, @start_date, @end_date).
+    """
+
+    from google.cloud import bigquery
+
+    n = check_n(n)
+    start_date, end_date = date_window(start_date, end_date)
+    return [
+        bigquery.ScalarQueryParameter("n", "INT64", n),
+        bigquery.ScalarQueryParameter("start_date", "DATE", start_date),
+        bigquery.ScalarQueryParameter("end_date", "DATE", end_date),
+    ]
+
+
+def run_query(client: "bigquery.Client", query: str, parameters: List["bigquery.ScalarQueryParameter"],
+              table_id: str, use_cache: bool = True) -> List[tuple]:
+    """
+    Ejecuta una query parametrizada y entrega sus filas como tuplas.
+
+    Con use_cache el resultado se guarda en memoria asociado a la query, sus parámetros y la fecha de última
+    modificación de la tabla, por lo que repetir la misma query sobre una tabla sin cambios no ejecuta (ni cobra)
+    un nuevo escaneo.
+
+    Parameters
+    ----------
+    client : bigquery.Client
+        Cliente de BigQuery (o un objeto con la misma interfaz: query(query, job_config=...) y get_table(table_id)).
+    query : str
+        Query con parámetros @nombre.
+    parameters : List[bigquery.ScalarQueryParameter]
+        Parámetros de la query.
+    table_id : str
+        Tabla leída por la query, "proyecto.dataset.tabla".
+    use_cache : bool
+        Si es False se ejecuta siempre la query.
+
+    Returns
+    -------
+    List[tuple]
+        Filas del resultado.
+    """
+
+    key = None
+    if use_cache:
+        # Fecha de última modificación de la tabla (llamada de metadatos, sin escaneo)
+        modified = client.get_table(table_id).modified
+        key = (query, tuple((parameter.name, parameter.type_, parameter.value) for parameter in parameters),
+               table_id, modified)
+        rows = _results.get(key)
+        if rows is not None:
+            _results.move_to_end(key)
+            return list(rows)
+
+    from google.cloud import bigquery
+
+    # Se crea un BigQuery Job para ejecutar la query y se convierte la salida a lista de tuplas
+    job_config = bigquery.QueryJobConfig(query_parameters=parameters)
+    with stage("query"):
+        rows = [tuple(row.values()) for row in client.query(query, job_config=job_config).result()]
+
+    if key is not None:
+        _results[key] = rows
+        # Se descarta el resultado usado hace más tiempo
+        if len(_results) > RESULT_CACHE_SIZE:
+            _results.popitem(last=False)
+    return list(rows)
+
+
+def clear_result_cache():
+    """
+    Descarta los resultados de queries guardados en memoria.
+    """
+
+    _results.clear()
+
+
+@profiled
+def q1_bigquery(keyfile_path: str, project_id: str, dataset_id: str, table_name: str, n: int = 10,
+                start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None,
+                client: Optional["bigquery.Client"] = None, use_cache: bool = True) -> List[Tuple[datetime.date, str]]:
+    """
+    Lee la tabla de BigQuery con tweets y devuelve las top n (10 por defecto) fechas donde hay más tweets,
     mencionando el usuario (username) que más publicaciones tiene por cada uno de esos días.
 
     Parameters
@@ -17,6 +220,16 @@ def q1_bigquery(keyfile_path: str, project_id: str, dataset_id: str, table_name:
         La ID del dataset en BigQuery
     table_name : str
         El nombre de la tabla dentro del dataset en BigQuery con los datos de los tweets
+    n : int
+        Cantidad de fechas a entregar.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    client : bigquery.Client, optional
+        Cliente a usar. Por defecto el cliente compartido de get_client.
+    use_cache : bool
+        Si es True se reutiliza el resultado de la misma query mientras la tabla no cambie (ver run_query).
 
     Returns
     -------
@@ -25,43 +238,152 @@ def q1_bigquery(keyfile_path: str, project_id: str, dataset_id: str, table_name:
         en orden descendente según publicaciones totales en los días.
     """
 
-    # Conectarse a BigQuery usando keyfile
-    client = bigquery.Client.from_service_account_json(keyfile_path, project=project_id)
+    table_id = table_reference(project_id, dataset_id, table_name)
+    # Cliente compartido, autenticado con keyfile solo la primera vez
+    if client is None:
+        client = get_client(keyfile_path, project_id)
 
-    # Se seleccionan de columnas a usar, tomando date y username (desde dentro de user)
+    # Se seleccionan de columnas a usar, tomando date y username (desde dentro de user), de los tweets de la ventana
     # Se agrega columna date_count con conteo de tweets por día (usando lógica over similar a funciones de venta en SQL).
     # Se agrega columna user_count con conteo tweets por combinacion de día y username (usando lógica over).
-    # Se ordena según user_count, se agrupa según date y se extrae el primer username por cada partición, junto con date_count asociada.
-    # Se ordena el resultado por date_count descendiente y se extraen los primeros 10.
-    query = """
+    # Se ordena según user_count (si hay empate, el menor username), se agrupa según date y se extrae el primer username por cada partición, junto con date_count asociada.
+    # Se ordena el resultado por date_count descendiente (si hay empate, el día más antiguo primero) y se extraen los primeros n.
+    query = f"""
     SELECT date, username FROM (
         SELECT  date,
                 username,
                 date_count,
-                row_number() OVER (partition BY date ORDER BY user_count DESC) AS user_position
+                row_number() OVER (partition BY date ORDER BY user_count DESC, username) AS user_position
                 FROM (
                     SELECT USER.username,
                             Cast(date AS DATE) AS date,
                             Count(*) OVER (partition BY Cast(date AS DATE)) AS date_count,
                             Count(*) OVER (partition BY Cast(date AS DATE), USER.username) AS user_count
-                    FROM   `{project_id}.{dataset_id}.{table_name}`
+                    FROM   `{table_id}`
+                    {_WINDOW_FILTER}
                 )
     )
     WHERE user_position = 1
-    ORDER BY date_count DESC
-    limit 10
+    ORDER BY date_count DESC, date
+    limit @n
+    """
+
+    return run_query(client, query, _query_parameters(n, start_date, end_date), table_id, use_cache)
+
+
+@profiled
+def q2_bigquery(keyfile_path: str, project_id: str, dataset_id: str, table_name: str, n: int = 10,
+                start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None,
+                client: Optional["bigquery.Client"] = None, use_cache: bool = True) -> List[Tuple[str, int]]:
+    """
+    Lee la tabla de BigQuery con tweets y devuelve los top n (10 por defecto) emojis más usados,
+    con su respectivo conteo.
+
+    Parameters
+    ----------
+    keyfile_path : str
+        Ruta del archivo JSON para autenticar la cuenta de servicio
+    project_id : str
+        La ID del proyecto en Google Cloud Platform
+    dataset_id : str
+        La ID del dataset en BigQuery
+    table_name : str
+        El nombre de la tabla dentro del dataset en BigQuery con los datos de los tweets
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    client : bigquery.Client, optional
+        Cliente a usar. Por defecto el cliente compartido de get_client.
+    use_cache : bool
+        Si es True se reutiliza el resultado de la misma query mientras la tabla no cambie (ver run_query).
+
+    Returns
+    -------
+    List[Tuple[str, int]]
+        Una lista de tuplas con el emoji y las veces que fue utilizado,
+        en orden descendente según cantidad de apariciones.
+    """
+
+    table_id = table_reference(project_id, dataset_id, table_name)
+    if client is None:
+        client = get_client(keyfile_path, project_id)
+
+    # Los emojis de cada tweet se extraen al cargar la tabla (ver ingest_to_bigquery), con el mismo tokenizador
+    # de la librería emoji que las demás variantes. La expresión regular de todos los emojis no se usa en BigQuery:
+    # con miles de alternativas excede la memoria del DFA de RE2, que pasa a un NFA mucho más lento por fila.
+    if "emojis" not in {field.name for field in client.get_table(table_id).schema}:
+        raise ValueError(f"La tabla {table_id} no tiene la columna emojis: se debe cargar con ingest_to_bigquery")
+
+    # Se expande la lista de emojis de cada tweet en una fila por emoji y se cuenta cada emoji.
+    # Se ordena por conteo descendiente (y por emoji para desempatar) y se extraen los primeros n.
+    query = f"""
+    SELECT emoji, COUNT(*) AS count
+    FROM `{table_id}`, UNNEST(emojis) AS emoji
+    {_WINDOW_FILTER}
+    GROUP BY emoji
+    ORDER BY count DESC, emoji
+    LIMIT @n
+    """
+
+    return run_query(client, query, _query_parameters(n, start_date, end_date), table_id, use_cache)
+
+
+@profiled
+def q3_bigquery(keyfile_path: str, project_id: str, dataset_id: str, table_name: str, n: int = 10,
+                start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None,
+                client: Optional["bigquery.Client"] = None, use_cache: bool = True) -> List[Tuple[str, int]]:
     """
+    Lee la tabla de BigQuery con tweets y devuelve el top n (10 por defecto) histórico de usuarios (username)
+    más influyentes en función del conteo de las menciones (@) que registra cada uno de ellos.
 
-    # Se reemplaza el project_id, dataset_id y table_name según los argumentos entregados a la función
-    query = query.replace("{project_id}", project_id).replace("{dataset_id}", dataset_id).replace("{table_name}", table_name)
+    Parameters
+    ----------
+    keyfile_path : str
+        Ruta del archivo JSON para autenticar la cuenta de servicio
+    project_id : str
+        La ID del proyecto en Google Cloud Platform
+    dataset_id : str
+        La ID del dataset en BigQuery
+    table_name : str
+        El nombre de la tabla dentro del dataset en BigQuery con los datos de los tweets
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    client : bigquery.Client, optional
+        Cliente a usar. Por defecto el cliente compartido de get_client.
+    use_cache : bool
+        Si es True se reutiliza el resultado de la misma query mientras la tabla no cambie (ver run_query).
 
-    # Se crea un BigQuery Job para ejecutar la query
-    job = client.query(query)
+    Returns
+    -------
+    List[Tuple[str, int]]
+        Una lista de tuplas con el username y las veces que fue mencionado,
+        en orden descendente según cantidad de menciones.
+    """
+
+    table_id = table_reference(project_id, dataset_id, table_name)
+    if client is None:
+        client = get_client(keyfile_path, project_id)
 
-	# Convierte salida a lista de tuplas
-    out = [tuple(row.values()) for row in job.result()]
+    # Se expande mentionedUsers en una fila por mención (tweets sin menciones no generan filas)
+    # y se cuentan las menciones por username.
+    # Se ordena por conteo descendiente (y por username para desempatar) y se extraen los primeros n.
+    query = f"""
+    SELECT mentioned.username, COUNT(*) AS count
+    FROM `{table_id}`, UNNEST(mentionedUsers) AS mentioned
+    {_WINDOW_FILTER}
+    GROUP BY mentioned.username
+    ORDER BY count DESC, username
+    LIMIT @n
+    """
 
-    return out
+    return run_query(client, query, _query_parameters(n, start_date, end_date), table_id, use_cache)
 
 
 
@@ -82,16 +404,295 @@ def upload_file_to_cloud_storage(keyfile_path: str, project_id: str, bucket_name
         Debe estar en la misma carpeta que el script que llama a esta función 
     """
     
+    from google.cloud import storage
+
     # Conectarse a Cloud Storage usando keyfile
     storage_client = storage.Client.from_service_account_json(keyfile_path, project=project_id)
 
     # Bucket dentro de Cloud Storage
     bucket = storage_client.bucket(bucket_name)
 
-    # Creación de blob con el nombre del archivo
-    blob = bucket.blob(file_name)
+    # Creación de blob con el nombre del archivo (subida resumible por partes de UPLOAD_CHUNK_SIZE)
+    blob = bucket.blob(file_name, chunk_size=UPLOAD_CHUNK_SIZE)
 
     # Subir el archivo a Bucket de Google Cloud Storage
     blob.upload_from_filename(file_name)
 
-    return
\ No newline at end of file
+    return
+
+
+def clients_from_keyfile(keyfile_path: str, project_id: str) -> Tuple["storage.Client", "bigquery.Client"]:
+    """
+    Crea los clientes de Cloud Storage y BigQuery autenticados con la cuenta de servicio.
+
+    Parameters
+    ----------
+    keyfile_path : str
+        Ruta del archivo JSON para autenticar la cuenta de servicio
+    project_id : str
+        La ID del proyecto en Google Cloud Platform
+
+    Returns
+    -------
+    Tuple[storage.Client, bigquery.Client]
+        Cliente de Cloud Storage y cliente de BigQuery.
+    """
+
+    from google.cloud import storage
+
+    return storage.Client.from_service_account_json(keyfile_path, project=project_id), get_client(keyfile_path, project_id)
+
+
+def project_tweet(line: bytes, emoji_cache: Optional[EmojiCache] = None) -> bytes:
+    """
+    Proyecta un tweet a las columnas de LOAD_SCHEMA, como linea JSON en bytes.
+    Tweets sin menciones (mentionedUsers null) quedan con una lista vacía.
+    Los emojis de content se extraen con emoji_cache (por defecto uno nuevo, ver emoji_regex.EmojiCache).
+    """
+
+    if emoji_cache is None:
+        emoji_cache = EmojiCache()
+    tweet = json.loads(line)
+    projected = {
+        "date": tweet["date"],
+        "content": tweet["content"],
+        "user": {"username": tweet["user"]["username"]},
+        "mentionedUsers": [{"username": user["username"]} for user in tweet.get("mentionedUsers") or []],
+        "emojis": emoji_cache(tweet["content"]),
+    }
+    return json.dumps(projected, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def iter_projected_chunks(file_path: str, out_dir: str, chunk_size: int = LOAD_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Divide el archivo JSON con tweets en chunks proyectados (ver project_tweet) y comprimidos con gzip,
+    entregando la ruta de cada chunk apenas se termina de escribir.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    out_dir : str
+        Carpeta donde se escriben los chunks ("part-00000.json.gz", "part-00001.json.gz", ...).
+    chunk_size : int
+        Tamaño máximo aproximado de cada chunk, en bytes sin comprimir.
+
+    Returns
+    -------
+    Iterator[str]
+        Rutas de los chunks en orden.
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+    # Emojis de cada contenido, reutilizados para contenidos repetidos (retweets)
+    emoji_cache = EmojiCache()
+    n_chunks = 0
+    file = None
+    written = 0
+    try:
+        for line in iter_lines(file_path):
+            # Lineas vacías (ej. al final del archivo) se ignoran
+            if not line.strip():
+                continue
+            # Se cierra el chunk actual al llegar al tamaño máximo y se entrega su ruta
+            if file is not None and written >= chunk_size:
+                file.close()
+                file = None
+                yield path
+            if file is None:
+                path = os.path.join(out_dir, f"part-{n_chunks:05d}.json.gz")
+                file = gzip.open(path, "wb", compresslevel=COMPRESS_LEVEL)
+                n_chunks += 1
+                written = 0
+            projected = project_tweet(line, emoji_cache)
+            file.write(projected)
+            written += len(projected)
+    finally:
+        if file is not None:
+            file.close()
+    # Último chunk (si el archivo tenía tweets)
+    if file is not None:
+        yield path
+
+
+async def upload_chunks(bucket, chunk_paths: Iterable[str], prefix: str,
+                        max_concurrency: int = MAX_CONCURRENT_UPLOADS, upload_chunk_size: int = UPLOAD_CHUNK_SIZE,
+                        remove: bool = False) -> List[str]:
+    """
+    Sube chunks a un Bucket de Cloud Storage con subidas resumibles, hasta max_concurrency a la vez.
+
+    Los chunks se piden a chunk_paths recién cuando hay un cupo libre, por lo que si chunk_paths es un generador
+    (ej. iter_projected_chunks) la escritura de los chunks avanza en paralelo con la subida y en disco hay
+    a lo más max_concurrency + 1 chunks a la vez (con remove=True).
+
+    Parameters
+    ----------
+    bucket : google.cloud.storage.Bucket
+        Bucket de destino (o un objeto con la misma interfaz: name y blob(name, chunk_size=...)).
+    chunk_paths : Iterable[str]
+        Rutas locales de los chunks.
+    prefix : str
+        Prefijo (carpeta) de los objetos dentro del Bucket.
+    max_concurrency : int
+        Cantidad máxima de subidas en curso.
+    upload_chunk_size : int
+        Tamaño de cada parte de la subida resumible (múltiplo de 256 KB).
+    remove : bool
+        Si es True se borra cada chunk local apenas se termina de subir.
+
+    Returns
+    -------
+    List[str]
+        URIs "gs://bucket/prefix/part-....json.gz" de los chunks subidos, en el orden de chunk_paths.
+    """
+
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency debe ser mayor o igual a 1")
+    from google.cloud.storage.retry import DEFAULT_RETRY
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    paths = iter(chunk_paths)
+    tasks = []
+
+    async def upload(path: str) -> str:
+        try:
+            blob = bucket.blob(f"{prefix}/{os.path.basename(path)}", chunk_size=upload_chunk_size)
+            # La subida es bloqueante: se ejecuta en un thread, reintentando errores transitorios
+            await asyncio.to_thread(blob.upload_from_filename, path, content_type="application/gzip",
+                                    retry=DEFAULT_RETRY)
+        finally:
+            semaphore.release()
+        if remove:
+            os.remove(path)
+        return f"gs://{bucket.name}/{blob.name}"
+
+    try:
+        while True:
+            await semaphore.acquire()
+            # Si alguna subida falló no se siguen generando chunks
+            for task in tasks:
+                if task.done() and task.exception() is not None:
+                    semaphore.release()
+                    raise task.exception()
+            # El siguiente chunk se genera en un thread para no bloquear las subidas en curso
+            path = await asyncio.to_thread(next, paths, None)
+            if path is None:
+                semaphore.release()
+                break
+            tasks.append(asyncio.create_task(upload(path)))
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _run(coroutine):
+    """
+    Ejecuta una corrutina hasta terminar, en otro thread si ya hay un event loop en curso (ej. Jupyter).
+    """
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def load_chunks(client: "bigquery.Client", uris: List[str], table_id: str,
+                write_disposition: str = "WRITE_TRUNCATE") -> int:
+    """
+    Carga chunks JSON (comprimidos o no) desde Cloud Storage a una tabla de BigQuery con load jobs por lotes
+    de hasta MAX_LOAD_URIS archivos.
+
+    Parameters
+    ----------
+    client : bigquery.Client
+        Cliente de BigQuery.
+    uris : List[str]
+        URIs "gs://..." de los chunks.
+    table_id : str
+        Tabla de destino "proyecto.dataset.tabla".
+    write_disposition : str
+        Disposición del primer lote (bigquery.WriteDisposition, por defecto reemplaza la tabla).
+        Los lotes siguientes se agregan.
+
+    Returns
+    -------
+    int
+        Cantidad de filas cargadas.
+    """
+
+    from google.cloud import bigquery
+
+    rows = 0
+    for start in range(0, len(uris), MAX_LOAD_URIS):
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            schema=_load_schema(),
+            write_disposition=write_disposition if start == 0 else bigquery.WriteDisposition.WRITE_APPEND,
+        )
+        job = client.load_table_from_uri(uris[start:start + MAX_LOAD_URIS], table_id, job_config=job_config)
+        # Espera a que termine el load job (lanza excepción si falla)
+        job.result()
+        rows += job.output_rows or 0
+    return rows
+
+
+@profiled
+def ingest_to_bigquery(file_path: str, bucket_name: str, table_id: str, storage_client: "storage.Client",
+                       bigquery_client: "bigquery.Client", prefix: Optional[str] = None,
+                       chunk_size: int = LOAD_CHUNK_SIZE, max_concurrency: int = MAX_CONCURRENT_UPLOADS,
+                       work_dir: Optional[str] = None) -> int:
+    """
+    Carga un archivo JSON con tweets a una tabla de BigQuery: lo divide en chunks proyectados y comprimidos,
+    los sube en paralelo a Cloud Storage y luego los carga con un load job. La tabla resultante tiene las
+    columnas usadas por q1_bigquery, q2_bigquery y q3_bigquery.
+
+    Los clientes se reciben como argumentos (ver clients_from_keyfile), por lo que se pueden reemplazar por
+    objetos locales con la misma interfaz para probar el pipeline sin Google Cloud (ver tests/fake_gcp.py).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    bucket_name : str
+        Nombre del Bucket de Cloud Storage donde se suben los chunks.
+    table_id : str
+        Tabla de destino "proyecto.dataset.tabla" (se reemplaza su contenido).
+    storage_client : storage.Client
+        Cliente de Cloud Storage.
+    bigquery_client : bigquery.Client
+        Cliente de BigQuery.
+    prefix : str, optional
+        Prefijo de los chunks en el Bucket. Por defecto "<nombre del archivo>/<fecha y hora UTC>".
+    chunk_size : int
+        Tamaño máximo aproximado de cada chunk, en bytes sin comprimir.
+    max_concurrency : int
+        Cantidad máxima de subidas en curso.
+    work_dir : str, optional
+        Carpeta donde se escriben los chunks temporales. Por defecto una carpeta temporal del sistema.
+
+    Returns
+    -------
+    int
+        Cantidad de filas cargadas.
+    """
+
+    if prefix is None:
+        prefix = f"{os.path.basename(file_path)}/{datetime.utcnow():%Y%m%dT%H%M%S}"
+    bucket = storage_client.bucket(bucket_name)
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as out_dir:
+        # Proyección, compresión y subida en paralelo (cada chunk se borra al terminar de subirse)
+        with stage("upload"):
+            chunks = iter_projected_chunks(file_path, out_dir, chunk_size)
+            uris = _run(upload_chunks(bucket, chunks, prefix, max_concurrency, remove=True))
+
+    if not uris:
+        raise ValueError(f"{file_path} no tiene tweets")
+
+    with stage("load"):
+        return load_chunks(bigquery_client, uris, table_id)
@@ -0,0 +1,126 @@
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+from analytics import DEFAULT_AGGREGATORS, feed_lines
+from compression import compression_of
+from window import check_n
+
+# Versión del formato del archivo de estado. Estados con otra versión se descartan.
+STATE_VERSION = 1
+
+# Bytes del archivo procesado usados para verificar que solo se le agregaron lineas al final
+_CHECK_SIZE = 64 << 10
+
+
+def _fingerprint(file_path: str, offset: int) -> Dict[str, object]:
+    """
+    Huella de la parte ya procesada del archivo: hash del inicio y del final de los primeros offset bytes.
+    Si el archivo fue reescrito (y no solo extendido), la huella deja de coincidir.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        digest.update(file.read(min(offset, _CHECK_SIZE)))
+        file.seek(max(offset - _CHECK_SIZE, 0))
+        digest.update(file.read(offset - file.tell()))
+    return {"inode": os.stat(file_path).st_ino, "offset": offset, "hash": digest.hexdigest()}
+
+
+def _load_state(state_path: str, file_path: str) -> Optional[dict]:
+    """
+    Lee el estado persistido si existe, es de la versión actual y la parte procesada del archivo no cambió.
+    """
+
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path) as file:
+            state = json.load(file)
+    except ValueError:
+        return None
+    if state.get("version") != STATE_VERSION:
+        return None
+    offset = state["source"]["offset"]
+    # El archivo se truncó o se reescribió: se descarta el estado
+    if os.path.getsize(file_path) < offset or _fingerprint(file_path, offset) != state["source"]:
+        return None
+    return state
+
+
+def run_incremental(file_path: str, state_path: Optional[str] = None, n: int = 10) -> Dict[str, list]:
+    """
+    Responde q1, q2 y q3 procesando solo las lineas agregadas al archivo desde la ejecución anterior.
+
+    El estado de agregación (conteos por día, por día y usuario, de emojis y de menciones) se persiste
+    en JSON junto al byte hasta el que se procesó el archivo. Si el archivo fue truncado o reescrito,
+    se recalcula desde el inicio.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (sin comprimir, al que se agregan lineas al final).
+    state_path : str, optional
+        Ruta del archivo de estado. Por defecto junto al archivo fuente con extensión ".state.json".
+    n : int
+        Cantidad de elementos en cada top.
+
+    Returns
+    -------
+    Dict[str, list]
+        Diccionario con el resultado de cada pregunta ("q1", "q2", "q3"), con el mismo formato
+        que las funciones q*_memory.
+    """
+
+    check_n(n)
+    if compression_of(file_path) is not None:
+        raise ValueError("El modo incremental requiere un archivo sin comprimir para retomar desde un byte")
+    if state_path is None:
+        state_path = file_path + ".state.json"
+
+    # Restauración de agregadores y posición desde el estado persistido (o desde cero)
+    state = _load_state(state_path, file_path)
+    if state is None:
+        offset = 0
+        aggregators = [aggregator_type() for aggregator_type in DEFAULT_AGGREGATORS]
+    else:
+        offset = state["source"]["offset"]
+        aggregators = [aggregator_type.from_state(state["aggregators"][aggregator_type.name])
+                       for aggregator_type in DEFAULT_AGGREGATORS]
+
+    # Lectura solo de las lineas nuevas. Una ultima linea sin salto de linea puede estar a medio escribir,
+    # por lo que se considera en el resultado pero no en el estado persistido.
+    incomplete = None
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        complete_lines = []
+        for line in file:
+            if not line.endswith(b"\n"):
+                incomplete = line
+                break
+            complete_lines.append(line)
+            offset += len(line)
+            # Se procesan por bloques para no acumular todas las lineas nuevas en memoria
+            if len(complete_lines) >= 10000:
+                feed_lines(complete_lines, aggregators)
+                complete_lines = []
+        feed_lines(complete_lines, aggregators)
+
+    # Persistencia del estado con escritura atómica
+    state = {
+        "version": STATE_VERSION,
+        "source": _fingerprint(file_path, offset),
+        "aggregators": {aggregator.name: aggregator.to_state() for aggregator in aggregators},
+    }
+    with open(state_path + ".tmp", "w") as file:
+        json.dump(state, file)
+    os.replace(state_path + ".tmp", state_path)
+
+    if incomplete is not None and incomplete.strip():
+        try:
+            feed_lines([incomplete], aggregators)
+        except ValueError:
+            # Linea aún incompleta (JSON inválido): se procesará en la próxima ejecución
+            pass
+
+    return {aggregator.name: aggregator.result(n) for aggregator in aggregators}
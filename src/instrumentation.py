@@ -0,0 +1,255 @@
+from typing import Callable, Deque, Dict, Iterable, Optional
+from collections import deque
+from contextlib import contextmanager, nullcontext
+import contextvars
+import functools
+import json
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+# Variables de entorno que activan la instrumentación:
+# - TWEETS_PROFILE=1 registra cada ejecución como log estructurado (JSON) en el logger "tweets.profile".
+# - TWEETS_PROFILE_PROMETHEUS=<ruta> escribe además las métricas en formato de texto de Prometheus.
+# - TWEETS_PROFILE_TRACEMALLOC=1 mide el pico de memoria de Python de cada función con tracemalloc (más lento).
+ENV_PROFILE = "TWEETS_PROFILE"
+ENV_PROMETHEUS = "TWEETS_PROFILE_PROMETHEUS"
+ENV_TRACEMALLOC = "TWEETS_PROFILE_TRACEMALLOC"
+
+logger = logging.getLogger("tweets.profile")
+
+# Cantidad máxima de ejecuciones guardadas en RUNS
+MAX_RUNS = 1000
+
+# Últimas ejecuciones registradas en este proceso. Se descartan las más antiguas, para que un proceso de larga
+# duración (ej. server.py, que ejecuta una consulta por request) no acumule memoria con cada ejecución
+RUNS: Deque[Dict[str, object]] = deque(maxlen=MAX_RUNS)
+
+# Última ejecución de cada función (la que se exporta a Prometheus), aunque ya no esté en RUNS
+_LATEST: Dict[str, Dict[str, object]] = {}
+
+# Configuración activa, inicializada desde las variables de entorno
+_config = {
+    "enabled": os.environ.get(ENV_PROFILE, "") not in ("", "0") or bool(os.environ.get(ENV_PROMETHEUS)),
+    "prometheus_path": os.environ.get(ENV_PROMETHEUS) or None,
+    "tracemalloc": os.environ.get(ENV_TRACEMALLOC, "") not in ("", "0"),
+}
+
+# Ejecución instrumentada en curso (None si no hay)
+_current = contextvars.ContextVar("tweets_profile_run", default=None)
+
+# Contexto vacío reutilizado cuando la instrumentación está desactivada
+_NULL_CONTEXT = nullcontext()
+
+
+class _Stage:
+    """
+    Context manager que acumula el tiempo de una etapa en la ejecución en curso.
+    """
+
+    __slots__ = ("stages", "name", "start")
+
+    def __init__(self, stages: dict, name: str):
+        self.stages = stages
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        totals = self.stages.get(self.name)
+        if totals is None:
+            self.stages[self.name] = [elapsed, 1]
+        else:
+            totals[0] += elapsed
+            totals[1] += 1
+
+
+def stage(name: str):
+    """
+    Mide el tiempo de una etapa dentro de una función instrumentada (ej. "json_decode", "collect").
+    Sin instrumentación activa no hace nada.
+
+    Parameters
+    ----------
+    name : str
+        Nombre de la etapa. Varias mediciones con el mismo nombre se acumulan.
+    """
+
+    run = _current.get()
+    if run is None:
+        return _NULL_CONTEXT
+    return _Stage(run["stages"], name)
+
+
+def count(lines: int = 0, bytes_read: int = 0):
+    """
+    Suma lineas y bytes leídos a la ejecución instrumentada en curso. Sin instrumentación activa no hace nada.
+    """
+
+    run = _current.get()
+    if run is not None:
+        run["lines"] += lines
+        run["bytes"] += bytes_read
+
+
+def counter(name: str, value: int = 1):
+    """
+    Suma value al contador con nombre name de la ejecución instrumentada en curso (ej. aciertos de un cache).
+    Sin instrumentación activa no hace nada.
+    """
+
+    run = _current.get()
+    if run is not None:
+        run["counters"][name] = run["counters"].get(name, 0) + value
+
+
+def active() -> bool:
+    """
+    Indica si hay una ejecución instrumentada en curso (para evitar trabajo extra de conteo si no la hay).
+    """
+
+    return _current.get() is not None
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Decorador que registra tiempo total, tiempos por etapa, lineas, bytes leídos y pico de memoria
+    de cada llamada a la función cuando la instrumentación está activa.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _config["enabled"]:
+            return func(*args, **kwargs)
+
+        run = {"function": func.__name__, "stages": {}, "counters": {}, "lines": 0, "bytes": 0}
+        token = _current.set(run)
+        trace = _config["tracemalloc"]
+        if trace:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            run["seconds"] = time.perf_counter() - start
+            _current.reset(token)
+            if trace:
+                run["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            _finish(run)
+
+    return wrapper
+
+
+def _finish(run: dict):
+    """
+    Completa el registro de una ejecución y lo exporta (log estructurado y/o Prometheus).
+    """
+
+    # ru_maxrss está en KB en Linux (pico del proceso hasta el momento)
+    run["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    run["stages"] = {name: {"seconds": seconds, "calls": calls} for name, (seconds, calls) in run["stages"].items()}
+    RUNS.append(run)
+    _LATEST[run["function"]] = run
+
+    if not logger.handlers and not logging.getLogger().handlers:
+        # Sin configuración de logging se escriben los registros en stderr
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    logger.info(json.dumps(run))
+
+    if _config["prometheus_path"] is not None:
+        write_prometheus(_config["prometheus_path"])
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(runs: Optional[Iterable[Dict[str, object]]] = None) -> str:
+    """
+    Métricas de la última ejecución de cada función en formato de texto de Prometheus
+    (de todas las ejecuciones del proceso, o de runs si se indica).
+    """
+
+    if runs is None:
+        latest = _LATEST
+    else:
+        latest = {}
+        for run in runs:
+            latest[run["function"]] = run
+
+    lines = [
+        "# HELP tweets_function_seconds Tiempo total de la ultima ejecucion de la funcion.",
+        "# TYPE tweets_function_seconds gauge",
+    ]
+    lines += [f'tweets_function_seconds{{function="{_label(name)}"}} {run["seconds"]:.6f}' for name, run in latest.items()]
+    lines += [
+        "# HELP tweets_stage_seconds Tiempo acumulado por etapa en la ultima ejecucion de la funcion.",
+        "# TYPE tweets_stage_seconds gauge",
+    ]
+    lines += [f'tweets_stage_seconds{{function="{_label(name)}",stage="{_label(stage_name)}"}} {totals["seconds"]:.6f}'
+              for name, run in latest.items() for stage_name, totals in run["stages"].items()]
+    counters = [(name, counter_name, value) for name, run in latest.items()
+                for counter_name, value in run.get("counters", {}).items()]
+    if counters:
+        lines += [
+            "# HELP tweets_counter Contadores de la ultima ejecucion de la funcion (ej. aciertos de cache).",
+            "# TYPE tweets_counter gauge",
+        ]
+        lines += [f'tweets_counter{{function="{_label(name)}",counter="{_label(counter_name)}"}} {value}'
+                  for name, counter_name, value in counters]
+    for metric, key, help_text in (("tweets_lines", "lines", "Lineas leidas"),
+                                   ("tweets_bytes_read", "bytes", "Bytes leidos"),
+                                   ("tweets_peak_rss_bytes", "peak_rss_bytes", "Pico de memoria residente del proceso"),
+                                   ("tweets_traced_peak_bytes", "traced_peak_bytes", "Pico de memoria de Python (tracemalloc)")):
+        values = [(name, run[key]) for name, run in latest.items() if key in run]
+        if not values:
+            continue
+        lines += [f"# HELP {metric} {help_text} en la ultima ejecucion de la funcion.", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{function="{_label(name)}"}} {value}' for name, value in values]
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    """
+    Escribe las métricas en un archivo de texto de Prometheus (ej. para node_exporter textfile collector).
+    """
+
+    with open(path + ".tmp", "w") as file:
+        file.write(prometheus_text())
+    os.replace(path + ".tmp", path)
+
+
+@contextmanager
+def profiling(prometheus_path: Optional[str] = None, trace_memory: bool = False):
+    """
+    Activa la instrumentación dentro del bloque, independiente de las variables de entorno.
+
+    Parameters
+    ----------
+    prometheus_path : str, optional
+        Ruta donde escribir las métricas en formato Prometheus después de cada función.
+    trace_memory : bool
+        Si es True se mide el pico de memoria de Python de cada función con tracemalloc.
+    """
+
+    previous = dict(_config)
+    _config.update(enabled=True, prometheus_path=prometheus_path or previous["prometheus_path"],
+                   tracemalloc=trace_memory or previous["tracemalloc"])
+    try:
+        yield RUNS
+    finally:
+        _config.update(previous)
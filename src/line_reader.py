@@ -0,0 +1,261 @@
+from typing import Iterator, List, Optional, Tuple, Union
+import mmap
+import os
+from compression import compression_of, open_input
+
+# Tamaño del buffer de las lecturas buferizadas (archivos comprimidos, lecturas que copian cada linea a bytes)
+READ_BUFFER_SIZE = 1 << 20
+
+# Tamaño de la ventana mapeada en memoria (mmap) de MappedFile. Solo una ventana queda mapeada a la vez y sus
+# páginas se liberan al pasar a la siguiente, por lo que la memoria residente queda acotada a este tamaño y no
+# crece con el tamaño del archivo.
+WINDOW_SIZE = 4 << 20
+
+# Estrategias de lectura por adelantado (madvise) para la ventana mapeada en memoria:
+# - "sequential": el sistema operativo lee por adelantado (recorridos secuenciales, MappedFile.iter_lines).
+# - "random": sin lectura por adelantado (saltos a lineas sueltas, ej. segunda pasada de q1_memory).
+# - "willneed": carga la ventana completa de inmediato.
+# - "normal": comportamiento por defecto del sistema operativo.
+ADVICES = {
+    "normal": getattr(mmap, "MADV_NORMAL", None),
+    "sequential": getattr(mmap, "MADV_SEQUENTIAL", None),
+    "random": getattr(mmap, "MADV_RANDOM", None),
+    "willneed": getattr(mmap, "MADV_WILLNEED", None),
+}
+
+# Estrategia por defecto de MappedFile.line_at, configurable con la variable de entorno TWEETS_MMAP_ADVICE
+DEFAULT_ADVICE = os.environ.get("TWEETS_MMAP_ADVICE", "random")
+
+
+class MappedFile:
+    """
+    Archivo sin comprimir mapeado en memoria (mmap) por ventanas acotadas, del que se leen lineas sin copiarlas:
+    cada linea es un memoryview sobre la ventana mapeada.
+
+    - iter_lines recorre el archivo (o un rango) en orden, con lectura por adelantado (MADV_SEQUENTIAL).
+    - line_at lee lineas sueltas según su posición (ej. guardadas en una primera pasada), con la estrategia
+      advice. Conviene pedirlas en orden de posición.
+
+    Solo una ventana queda mapeada a la vez. Al pasar a otra, las páginas de la anterior se liberan (MADV_DONTNEED)
+    y se desmapea, por lo que la memoria residente no crece con el tamaño del archivo. Por lo mismo, cada linea
+    entregada es válida solo hasta pedir la siguiente (después se libera y no se puede leer): quien necesite
+    guardarla debe copiarla con bytes(linea).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo (sin comprimir).
+    advice : str, optional
+        Estrategia de lectura por adelantado de line_at, una de las keys de ADVICES. None para no indicar ninguna.
+    window_size : int
+        Tamaño mínimo en bytes de cada ventana (se agranda si una linea no cabe en ella).
+    """
+
+    def __init__(self, file_path: str, advice: Optional[str] = DEFAULT_ADVICE, window_size: int = WINDOW_SIZE):
+        if advice is not None and advice not in ADVICES:
+            raise ValueError(f"advice debe ser uno de {tuple(ADVICES)}, no {advice!r}")
+        self._file = open(file_path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.advice = advice
+        self.window_size = window_size
+        # Ventana mapeada actual, una vista sobre ella y su rango [inicio, fin) en el archivo
+        self._region = None
+        self._view = None
+        self._start = 0
+        self._end = 0
+        # Última linea entregada por line_at (se libera en la siguiente llamada)
+        self._line = None
+
+    def _release(self):
+        """
+        Libera las páginas de la ventana actual y la desmapea.
+        """
+
+        if self._line is not None:
+            self._line.release()
+            self._line = None
+        if self._region is None:
+            return
+        self._view.release()
+        if hasattr(self._region, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            self._region.madvise(mmap.MADV_DONTNEED)
+        self._region.close()
+        self._region = self._view = None
+
+    def _map(self, offset: int, length: int, advice: Optional[str]):
+        """
+        Mapea una ventana de al menos length bytes desde offset (o hasta el final del archivo).
+        """
+
+        self._release()
+        # El inicio de un mmap debe estar alineado a la granularidad de asignación del sistema
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        end = min(offset + max(length, self.window_size), self.size)
+        self._region = mmap.mmap(self._file.fileno(), end - start, offset=start, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._region)
+        self._start, self._end = start, end
+        flag = ADVICES[advice] if advice is not None else None
+        if flag is not None and hasattr(self._region, "madvise"):
+            self._region.madvise(flag)
+
+    def _line_end(self, offset: int, advice: Optional[str]) -> int:
+        """
+        Mapea (si es necesario) la ventana que contiene la linea que comienza en offset y entrega su fin en el
+        archivo (después del salto de linea).
+        """
+
+        if not self._start <= offset < self._end:
+            self._map(offset, self.window_size, advice)
+        while True:
+            newline = self._region.find(b"\n", offset - self._start)
+            if newline != -1:
+                return self._start + newline + 1
+            if self._end == self.size:
+                return self.size
+            # La linea no termina dentro de la ventana: se mapea una ventana más grande desde la linea
+            self._map(offset, 2 * (self._end - offset), advice)
+
+    def line_at(self, offset: int) -> memoryview:
+        """
+        Linea que comienza en la posición offset, sin copiarla (válida hasta la siguiente llamada).
+        """
+
+        if self._line is not None:
+            self._line.release()
+            self._line = None
+        end = self._line_end(offset, self.advice)
+        self._line = self._view[offset - self._start:end - self._start]
+        return self._line
+
+    def iter_lines(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, memoryview]]:
+        """
+        Itera en orden las lineas que comienzan en el rango de bytes [start, end), sin copiarlas.
+
+        Parameters
+        ----------
+        start : int
+            Byte de inicio (inicio de una linea).
+        end : int, optional
+            Byte de fin (excluyente). Por defecto el final del archivo.
+
+        Returns
+        -------
+        Iterator[Tuple[int, memoryview]]
+            Tuplas con la posición de cada linea y la linea (válida hasta pedir la siguiente).
+        """
+
+        end = self.size if end is None else min(end, self.size)
+        offset = start
+        while offset < end:
+            line_end = self._line_end(offset, "sequential")
+            line = self._view[offset - self._start:line_end - self._start]
+            try:
+                yield offset, line
+            finally:
+                line.release()
+            offset = line_end
+
+    def close(self):
+        self._release()
+        self._file.close()
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_mapped_lines(file_path: str, ranges: Optional[List[Tuple[int, int]]] = None
+                      ) -> Iterator[Tuple[int, Union[bytes, memoryview]]]:
+    """
+    Itera las lineas de un archivo con su posición (byte offset) sin copiarlas, mapeando en memoria una ventana
+    acotada del archivo a la vez (ver MappedFile.iter_lines). Cada linea es válida solo hasta pedir la siguiente.
+    Los archivos comprimidos se leen en streaming con lecturas buferizadas (ver iter_offset_lines).
+
+    Las lineas son memoryview (o bytes en archivos comprimidos): las funciones de projection.py aceptan ambos.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    ranges : List[Tuple[int, int]], optional
+        Rangos (inicio, fin) en bytes a leer, alineados a inicios de linea. Por defecto el archivo completo.
+        Solo para archivos sin comprimir.
+
+    Returns
+    -------
+    Iterator[Tuple[int, Union[bytes, memoryview]]]
+        Tuplas con la posición de cada linea y la linea.
+    """
+
+    if compression_of(file_path) is not None:
+        yield from iter_offset_lines(file_path, ranges)
+        return
+
+    with MappedFile(file_path) as mapped:
+        for start, end in ranges if ranges is not None else [(0, mapped.size)]:
+            yield from mapped.iter_lines(start, end)
+
+
+def iter_offset_lines(file_path: str, ranges: Optional[List[Tuple[int, int]]] = None) -> Iterator[Tuple[int, bytes]]:
+    """
+    Itera las lineas de un archivo con su posición (byte offset), con lecturas buferizadas (cada linea se copia
+    a un objeto bytes, que se puede guardar). Los archivos comprimidos se leen en streaming (la posición es la del
+    contenido descomprimido).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    ranges : List[Tuple[int, int]], optional
+        Rangos (inicio, fin) en bytes a leer, alineados a inicios de linea. Por defecto el archivo completo.
+        Solo para archivos sin comprimir.
+
+    Returns
+    -------
+    Iterator[Tuple[int, bytes]]
+        Tuplas con la posición de cada linea y la linea en bytes.
+    """
+
+    if ranges is not None and compression_of(file_path) is not None:
+        raise ValueError("Solo se pueden leer rangos de bytes de archivos sin comprimir")
+
+    if ranges is None:
+        with open_input(file_path) as file:
+            offset = 0
+            for line in file:
+                yield offset, line
+                offset += len(line)
+        return
+
+    with open(file_path, "rb", buffering=READ_BUFFER_SIZE) as file:
+        for start, end in ranges:
+            # Salto al inicio del rango y lectura secuencial hasta su fin
+            file.seek(start)
+            offset = start
+            for line in file:
+                if offset >= end:
+                    break
+                yield offset, line
+                offset += len(line)
+
+
+def iter_lines(file_path: str) -> Iterator[bytes]:
+    """
+    Itera las lineas en bytes de un archivo con lecturas buferizadas, descomprimiéndolo en streaming si está
+    comprimido.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+
+    Returns
+    -------
+    Iterator[bytes]
+        Lineas del archivo en bytes.
+    """
+
+    with open_input(file_path) as file:
+        yield from file
@@ -0,0 +1,121 @@
+from typing import Iterator, List, Optional
+from itertools import islice
+import io
+import pandas as pd
+from line_reader import iter_lines
+from instrumentation import stage
+
+# Motores de lectura de JSON de pandas soportados
+ENGINES = ("ujson", "pyarrow")
+
+# Backends de tipos de pandas soportados (None para los tipos numpy por defecto)
+DTYPE_BACKENDS = (None, "numpy_nullable", "pyarrow")
+
+# Filas de conteos parciales pendientes bajo las que CountMerger no los suma a los acumulados
+COMPACT_MIN_ROWS = 1 << 16
+
+
+def iter_json_frames(file_path: str, chunksize: Optional[int] = None, engine: str = "ujson",
+                     dtype_backend: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo JSON con tweets (un tweet por linea) en DataFrames de pandas, completo o por chunks de
+    chunksize tweets, para acotar la memoria a la de un chunk.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    chunksize : int, optional
+        Cantidad de tweets por DataFrame. Por defecto se lee el archivo completo en un solo DataFrame.
+    engine : str
+        Motor de lectura de pandas: "ujson" (por defecto) o "pyarrow".
+    dtype_backend : str, optional
+        Backend de tipos de las columnas: "numpy_nullable" o "pyarrow". Por defecto los tipos numpy.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        DataFrames con todas las columnas de los tweets.
+    """
+
+    if engine not in ENGINES:
+        raise ValueError(f"engine debe ser uno de {ENGINES}, no {engine!r}")
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"dtype_backend debe ser uno de {DTYPE_BACKENDS}, no {dtype_backend!r}")
+    if chunksize is not None and chunksize < 1:
+        raise ValueError("chunksize debe ser mayor o igual a 1")
+    kwargs = {} if dtype_backend is None else {"dtype_backend": dtype_backend}
+
+    if chunksize is None:
+        with stage("read_json"):
+            df = pd.read_json(file_path, lines=True, engine=engine, **kwargs)
+        yield df
+        return
+
+    if engine == "ujson":
+        with pd.read_json(file_path, lines=True, chunksize=chunksize, **kwargs) as reader:
+            while True:
+                with stage("read_json"):
+                    df = next(reader, None)
+                if df is None:
+                    return
+                yield df
+
+    # El motor pyarrow de pandas no soporta chunksize: se agrupan chunksize lineas del archivo
+    # (descomprimido en streaming si es necesario) y se lee cada grupo por separado
+    lines = iter_lines(file_path)
+    while True:
+        with stage("read_json"):
+            chunk = b"".join(islice(lines, chunksize))
+            if not chunk.strip():
+                return
+            df = pd.read_json(io.BytesIO(chunk), lines=True, engine="pyarrow", **kwargs)
+        yield df
+
+
+class CountMerger:
+    """
+    Suma conteos parciales (ej. de cada chunk), alineándolos por su índice (simple o MultiIndex).
+
+    Los parciales se acumulan en una lista y se suman con un solo concat + groupby al pedir el resultado,
+    en vez de sumar cada chunk a los conteos acumulados (que copia los acumulados en cada chunk y hace el
+    costo cuadrático en la cantidad de chunks). Para acotar la memoria, los parciales pendientes se suman a
+    los acumulados cuando suman más filas que ellos, lo que mantiene el costo total lineal.
+    """
+
+    def __init__(self):
+        self._total: Optional[pd.Series] = None
+        self._partials: List[pd.Series] = []
+        self._pending = 0
+
+    def add(self, partial: pd.Series):
+        """
+        Agrega los conteos de un chunk.
+        """
+
+        self._partials.append(partial)
+        self._pending += len(partial)
+        if self._pending > max(COMPACT_MIN_ROWS, 0 if self._total is None else len(self._total)):
+            self._compact()
+
+    def _compact(self):
+        """
+        Suma los parciales pendientes a los conteos acumulados (un solo concat + groupby).
+        """
+
+        series = ([] if self._total is None else [self._total]) + self._partials
+        if len(series) == 1:
+            self._total = series[0]
+        else:
+            self._total = pd.concat(series).groupby(level=list(range(series[0].index.nlevels))).sum()
+        self._partials = []
+        self._pending = 0
+
+    def result(self) -> Optional[pd.Series]:
+        """
+        Conteos sumados de todos los chunks, o None si no se agregó ninguno.
+        """
+
+        if self._partials:
+            self._compact()
+        return self._total
@@ -0,0 +1,266 @@
+from typing import Dict, Iterable, List, Tuple, Iterator, Optional
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import os
+from analytics import DailyAggregator, EmojiAggregator, MentionAggregator, DEFAULT_AGGREGATORS, feed_lines
+from compression import compression_of, iter_chunks
+from line_reader import iter_offset_lines
+from instrumentation import profiled
+from projection import project_date
+from window import check_n, date_window, prefix_window
+
+# Tamaño de los bloques descomprimidos enviados a cada proceso cuando el archivo está comprimido
+COMPRESSED_CHUNK_SIZE = 8 << 20
+
+
+def split_byte_ranges(file_path: str, n_chunks: int) -> List[Tuple[int, int]]:
+    """
+    Divide un archivo en rangos de bytes de tamaño similar, alineados al inicio de cada linea.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+    n_chunks : int
+        Cantidad de rangos a generar (pueden resultar menos en archivos pequeños).
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        Lista de rangos (inicio, fin) en bytes, contiguos y en orden dentro del archivo.
+    """
+
+    file_size = os.path.getsize(file_path)
+    # Límites iniciales equiespaciados
+    boundaries = [0]
+    with open(file_path, "rb") as file:
+        for i in range(1, n_chunks):
+            # Se avanza hasta el final de la linea que contiene el límite aproximado
+            file.seek(max(file_size * i // n_chunks - 1, boundaries[-1]))
+            file.readline()
+            boundary = file.tell()
+            if boundary >= file_size:
+                break
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+    boundaries.append(file_size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def iter_range_lines(file_path: str, start: int, end: int) -> Iterator[bytes]:
+    """
+    Itera las lineas de un archivo que comienzan dentro del rango de bytes [start, end).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+    start : int
+        Byte de inicio (inicio de una linea).
+    end : int
+        Byte de fin (excluyente).
+
+    Returns
+    -------
+    Iterator[bytes]
+        Lineas del rango en bytes.
+    """
+
+    # Lectura buferizada del rango desde su posición en el archivo
+    for _, line in iter_offset_lines(file_path, [(start, end)]):
+        yield line
+
+
+def _window_lines(lines: Iterable[bytes], window: Optional[Tuple[str, str]]) -> Iterable[bytes]:
+    """
+    Filtra las lineas cuyo día está dentro de la ventana ("YYYY-MM-DD", "YYYY-MM-DD"), sin decodificar el tweet.
+    """
+
+    if window is None:
+        return lines
+    return (line for line in lines if window[0] <= project_date(line) <= window[1])
+
+
+def _aggregate_range(file_path: str, start: int, end: int, aggregator_types: tuple,
+                     window: Optional[Tuple[str, str]]) -> list:
+    """
+    Trabajo de cada proceso: agrega las lineas de un rango con agregadores nuevos y los devuelve.
+    """
+
+    aggregators = [aggregator_type() for aggregator_type in aggregator_types]
+    feed_lines(_window_lines(iter_range_lines(file_path, start, end), window), aggregators)
+    return aggregators
+
+
+def _aggregate_chunk(chunk: bytes, aggregator_types: tuple, window: Optional[Tuple[str, str]]) -> list:
+    """
+    Trabajo de cada proceso para archivos comprimidos: agrega las lineas de un bloque ya descomprimido.
+    """
+
+    aggregators = [aggregator_type() for aggregator_type in aggregator_types]
+    feed_lines(_window_lines(chunk.splitlines(keepends=True), window), aggregators)
+    return aggregators
+
+
+def _merge(merged: Optional[list], partial: list) -> list:
+    """
+    Combina agregadores parciales con los acumulados hasta el momento.
+    """
+
+    if merged is None:
+        return partial
+    for aggregator, other in zip(merged, partial):
+        aggregator.merge(other)
+    return merged
+
+
+def parallel_pass(file_path: str, aggregator_types: tuple = DEFAULT_AGGREGATORS,
+                  n_workers: Optional[int] = None, n: int = 10, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> Dict[str, list]:
+    """
+    Lee archivo JSON con tweets en paralelo, procesando rangos de bytes en un pool de procesos
+    con agregadores parciales por rango que luego se combinan.
+    Los archivos comprimidos se descomprimen en streaming y se reparten por bloques de lineas.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    aggregator_types : tuple
+        Clases de agregadores a usar (ver analytics.py). Por defecto uno para cada pregunta.
+    n_workers : int, optional
+        Cantidad de procesos. Por defecto la cantidad de CPUs.
+    n : int
+        Cantidad de elementos en cada top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+
+    Returns
+    -------
+    Dict[str, list]
+        Diccionario con el resultado de cada agregador según su nombre ("q1", "q2", "q3").
+    """
+
+    check_n(n)
+    # Ventana de días como strings "YYYY-MM-DD" comparables con el prefijo de cada linea (se filtra en cada proceso)
+    window = prefix_window(*date_window(start_date, end_date))
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        if compression_of(file_path) is not None:
+            # Archivo comprimido: se descomprime en streaming en este proceso y se envían bloques de lineas
+            # a los procesos, con a lo más 2 bloques pendientes por proceso para acotar la memoria
+            tasks = ((_aggregate_chunk, chunk, aggregator_types, window)
+                     for chunk in iter_chunks(file_path, COMPRESSED_CHUNK_SIZE))
+        else:
+            # Varios rangos por proceso para balancear la carga entre ellos
+            tasks = ((_aggregate_range, file_path, start, end, aggregator_types, window)
+                     for start, end in split_byte_ranges(file_path, n_workers * 4))
+
+        # Combinación de resultados parciales en el orden de los rangos en el archivo,
+        # lo que mantiene los desempates por primera aparición de las versiones secuenciales
+        merged = None
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(*task))
+            while len(pending) > 2 * n_workers or (pending and pending[0].done()):
+                merged = _merge(merged, pending.popleft().result())
+        while pending:
+            merged = _merge(merged, pending.popleft().result())
+
+    if merged is None:
+        merged = [aggregator_type() for aggregator_type in aggregator_types]
+
+    return {aggregator.name: aggregator.result(n) for aggregator in merged}
+
+
+@profiled
+def q1_parallel(file_path: str, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                n_workers: Optional[int] = None) -> List[Tuple[datetime.date, str]]:
+    """
+    Versión multiproceso de q1_memory: top n fechas con más tweets y el usuario con más publicaciones en cada una.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    n_workers : int, optional
+        Cantidad de procesos. Por defecto la cantidad de CPUs.
+
+    Returns
+    -------
+    List[Tuple[datetime.date, str]]
+        Una lista de tuplas con el dia y el usuario con más tweets en el dia,
+        en orden descendente según publicaciones totales en los días.
+    """
+
+    return parallel_pass(file_path, (DailyAggregator,), n_workers, n, start_date, end_date)["q1"]
+
+
+@profiled
+def q2_parallel(file_path: str, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                n_workers: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Versión multiproceso de q2_memory: top n emojis más usados con su respectivo conteo.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    n_workers : int, optional
+        Cantidad de procesos. Por defecto la cantidad de CPUs.
+
+    Returns
+    -------
+    List[Tuple[str, int]]
+        Una lista de tuplas con el emoji y las veces que fue utilizado,
+        en orden descendente según cantidad de apariciones.
+    """
+
+    return parallel_pass(file_path, (EmojiAggregator,), n_workers, n, start_date, end_date)["q2"]
+
+
+@profiled
+def q3_parallel(file_path: str, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                n_workers: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Versión multiproceso de q3_memory: top n usuarios más mencionados con su respectivo conteo.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    n_workers : int, optional
+        Cantidad de procesos. Por defecto la cantidad de CPUs.
+
+    Returns
+    -------
+    List[Tuple[str, int]]
+        Una lista de tuplas con el username y las veces que fue mencionado,
+        en orden descendente según cantidad de menciones.
+    """
+
+    return parallel_pass(file_path, (MentionAggregator,), n_workers, n, start_date, end_date)["q3"]
@@ -0,0 +1,298 @@
+from typing import Dict, List, Union
+from collections import Counter
+import json
+import re
+
+# Expresiones para ubicar los campos directamente en los bytes de cada linea, sin decodificar el tweet completo.
+# Se asume el orden de keys del archivo de tweets: "url", "date", "content", ..., "user" (con "username" como
+# primera key), ..., "quotedTweet", ..., "mentionedUsers" (despues de "quotedTweet").
+# Las comillas dentro de strings JSON siempre van escapadas, por lo que estos patrones solo calzan con keys reales.
+_DATE_PATTERN = re.compile(rb'"date":\s*"(\d{4}-\d{2}-\d{2})')
+_HOUR_PATTERN = re.compile(rb'"date":\s*"(\d{4}-\d{2}-\d{2}T\d{2})')
+# El primer "user" es el del autor (el de "quotedTweet" va después). Si no es un objeto con "username" como
+# primera key el grupo queda vacío y se lee el tweet completo, en lugar de seguir buscando y calzar con el "user"
+# de "quotedTweet"
+_USERNAME_PATTERN = re.compile(rb'"user":(?:\s*\{\s*"username":\s*"((?:[^"\\]|\\.)*)")?')
+_CONTENT_PATTERN = re.compile(rb'"content":\s*"((?:[^"\\]|\\.)*)"')
+_MENTIONED_KEY = b'"mentionedUsers":'
+# Última aparición de la key en lineas memoryview (no tienen rfind): el ".*" codicioso calza hasta la última
+_LAST_MENTIONED_PATTERN = re.compile(rb'.*"mentionedUsers":', re.DOTALL)
+# "username" de cualquier objeto (en "mentionedUsers" son los únicos objetos con esa key después de la lista)
+_USERNAME_KEY_PATTERN = re.compile(rb'"username":\s*"((?:[^"\\]|\\.)*)"')
+_NULL_PATTERN = re.compile(rb'\s*null')
+
+# Decodificador para leer solo el valor de "mentionedUsers" desde su posición
+_decoder = json.JSONDecoder()
+
+
+# Las lineas pueden ser bytes o memoryview sobre un archivo mapeado en memoria (ver line_reader.MappedFile):
+# las expresiones regulares aceptan ambos y sus grupos son bytes, y la lectura completa del tweet (json.loads)
+# requiere copiar la linea a bytes
+Line = Union[bytes, memoryview]
+
+
+def _mentioned_position(line: Line) -> int:
+    """
+    Posición del valor de la última key "mentionedUsers" de la linea, o -1 si no aparece.
+    """
+
+    if isinstance(line, bytes):
+        position = line.rfind(_MENTIONED_KEY)
+        return position if position == -1 else position + len(_MENTIONED_KEY)
+    match = _LAST_MENTIONED_PATTERN.match(line)
+    return -1 if match is None else match.end()
+
+
+def _decode_string(raw: bytes) -> str:
+    """
+    Decodifica el contenido de un string JSON (sin comillas) extraído desde bytes.
+    """
+
+    # Sin secuencias de escape basta con decodificar UTF-8
+    if b"\\" not in raw:
+        return raw.decode("utf-8")
+    # Con secuencias de escape (\", \n, \uXXXX, ...) se decodifica como string JSON
+    return json.loads(b'"' + raw + b'"')
+
+
+def _encode_string(value: str) -> bytes:
+    """
+    Codifica un string como el contenido de un string JSON en bytes (sin comillas), inverso de _decode_string.
+    """
+
+    return json.dumps(value, ensure_ascii=False)[1:-1].encode("utf-8")
+
+
+def decode_username(raw: bytes) -> str:
+    """
+    Decodifica un username extraído en bytes por project_username_raw o project_mentioned_raw.
+
+    Parameters
+    ----------
+    raw : bytes
+        Username tal como aparece dentro del string JSON (sin comillas, con secuencias de escape).
+
+    Returns
+    -------
+    str
+        Username decodificado.
+    """
+
+    return _decode_string(raw)
+
+
+def decode_counts(counts: Dict[bytes, int]) -> Counter:
+    """
+    Decodifica las llaves de un conteo de usernames en bytes (ver project_username_raw y project_mentioned_raw).
+
+    Un mismo username puede aparecer con bytes distintos en distintas lineas (ej. "jos\\u00e9" y "josé", según
+    cómo se escribió el JSON), por lo que los conteos de las llaves que corresponden al mismo username se suman.
+    Cada llave distinta se decodifica una sola vez.
+
+    Parameters
+    ----------
+    counts : Dict[bytes, int]
+        Conteo por username en bytes, en orden de primera aparición.
+
+    Returns
+    -------
+    Counter
+        Conteo por username decodificado, en orden de primera aparición (desempate de Counter.most_common).
+    """
+
+    decoded = Counter()
+    for raw, value in counts.items():
+        decoded[_decode_string(raw)] += value
+    return decoded
+
+
+def canonical_username(raw: bytes) -> bytes:
+    """
+    Forma única en bytes de un username extraído por project_username_raw o project_mentioned_raw: las
+    secuencias de escape que no son necesarias (ej. "\\u00e9") se reemplazan por el carácter en UTF-8.
+    Sirve como llave cuando los conteos no se pueden decodificar al final (ej. en un sketch de memoria acotada).
+    """
+
+    # Sin secuencias de escape los bytes ya son la forma única
+    if b"\\" not in raw:
+        return raw
+    try:
+        return _encode_string(_decode_string(raw))
+    except UnicodeEncodeError:
+        # Surrogate sin pareja ("\\ud800"): no tiene representación en UTF-8 y se deja escapado
+        return raw
+
+
+def project_date(line: Line) -> str:
+    """
+    Extrae el día ("YYYY-MM-DD") de un tweet sin decodificar el JSON completo.
+
+    Parameters
+    ----------
+    line : bytes o memoryview
+        Linea del archivo JSON con un tweet.
+
+    Returns
+    -------
+    str
+        Prefijo "YYYY-MM-DD" del campo "date".
+    """
+
+    match = _DATE_PATTERN.search(line)
+    if match is not None:
+        return match.group(1).decode("ascii")
+    # Linea con formato inesperado: lectura completa del tweet
+    return json.loads(bytes(line))["date"][:10]
+
+
+def project_hour(line: Line) -> str:
+    """
+    Extrae el día y la hora ("YYYY-MM-DDTHH") de un tweet sin decodificar el JSON completo.
+
+    Parameters
+    ----------
+    line : bytes o memoryview
+        Linea del archivo JSON con un tweet.
+
+    Returns
+    -------
+    str
+        Prefijo "YYYY-MM-DDTHH" del campo "date".
+    """
+
+    match = _HOUR_PATTERN.search(line)
+    if match is not None:
+        return match.group(1).decode("ascii")
+    # Linea con formato inesperado: lectura completa del tweet
+    return json.loads(bytes(line))["date"][:13]
+
+
+def project_username(line: Line) -> str:
+    """
+    Extrae el username del autor de un tweet sin decodificar el JSON completo.
+
+    Parameters
+    ----------
+    line : bytes o memoryview
+        Linea del archivo JSON con un tweet.
+
+    Returns
+    -------
+    str
+        Campo "username" dentro de "user".
+    """
+
+    match = _USERNAME_PATTERN.search(line)
+    if match is not None and match.group(1) is not None:
+        return _decode_string(match.group(1))
+    # Linea con formato inesperado: lectura completa del tweet
+    return (json.loads(bytes(line)).get("user") or {}).get("username", "")
+
+
+def project_username_raw(line: Line) -> bytes:
+    """
+    Extrae el username del autor de un tweet en bytes, sin decodificarlo. Sirve como llave de conteo, pero JSON
+    no garantiza que el mismo username tenga los mismos bytes en todas las lineas (un carácter puede ir escapado
+    o no), por lo que los conteos se suman por username decodificado al final (ver decode_counts).
+
+    Parameters
+    ----------
+    line : bytes o memoryview
+        Linea del archivo JSON con un tweet.
+
+    Returns
+    -------
+    bytes
+        Campo "username" dentro de "user", sin comillas y con sus secuencias de escape.
+    """
+
+    match = _USERNAME_PATTERN.search(line)
+    if match is not None and match.group(1) is not None:
+        return match.group(1)
+    # Linea con formato inesperado: lectura completa del tweet
+    return _encode_string((json.loads(bytes(line)).get("user") or {}).get("username", ""))
+
+
+def project_content(line: Line) -> str:
+    """
+    Extrae el texto ("content") de un tweet sin decodificar el JSON completo.
+
+    Parameters
+    ----------
+    line : bytes o memoryview
+        Linea del archivo JSON con un tweet.
+
+    Returns
+    -------
+    str
+        Campo "content" del tweet.
+    """
+
+    match = _CONTENT_PATTERN.search(line)
+    if match is not None:
+        return _decode_string(match.group(1))
+    # Linea con formato inesperado: lectura completa del tweet
+    return json.loads(bytes(line)).get("content") or ""
+
+
+def project_mentioned_usernames(line: Line) -> List[str]:
+    """
+    Extrae los usernames de los usuarios mencionados en un tweet, decodificando solo la lista "mentionedUsers".
+
+    Parameters
+    ----------
+    line : bytes o memoryview
+        Linea del archivo JSON con un tweet.
+
+    Returns
+    -------
+    List[str]
+        Lista con el "username" de cada usuario mencionado (vacía si no hay menciones).
+    """
+
+    # La key del tweet principal es la última del archivo en aparecer (la de "quotedTweet" va antes)
+    position = _mentioned_position(line)
+    if position != -1:
+        # Caso sin menciones
+        if _NULL_PATTERN.match(line, position):
+            return []
+        try:
+            # Se decodifica solo desde el valor de "mentionedUsers" hasta el final de la lista
+            mentioned, _ = _decoder.raw_decode(str(line[position:], "utf-8").lstrip())
+            return [user["username"] for user in mentioned]
+        except (ValueError, TypeError, KeyError):
+            pass
+    # Linea con formato inesperado: lectura completa del tweet
+    mentioned = json.loads(bytes(line)).get("mentionedUsers")
+    if mentioned is None:
+        return []
+    return [user["username"] for user in mentioned]
+
+
+def project_mentioned_raw(line: Line) -> List[bytes]:
+    """
+    Extrae los usernames de los usuarios mencionados en un tweet en bytes, sin decodificar la lista
+    "mentionedUsers" ni los usernames (ver project_username_raw). Los conteos se decodifican con decode_counts.
+
+    Parameters
+    ----------
+    line : bytes o memoryview
+        Linea del archivo JSON con un tweet.
+
+    Returns
+    -------
+    List[bytes]
+        Lista con el "username" de cada usuario mencionado, sin comillas y con sus secuencias de escape.
+    """
+
+    # La key del tweet principal es la última del archivo en aparecer (la de "quotedTweet" va antes)
+    position = _mentioned_position(line)
+    if position != -1:
+        # Caso sin menciones
+        if _NULL_PATTERN.match(line, position):
+            return []
+        # Después de la key solo los usuarios mencionados tienen "username" (el resto son "coordinates", "place",
+        # "hashtags", etc.), y una key no puede calzar dentro de un string porque sus comillas van escapadas
+        return _USERNAME_KEY_PATTERN.findall(line, position)
+    # Linea con formato inesperado: lectura completa del tweet
+    return [_encode_string(user["username"]) for user in json.loads(bytes(line)).get("mentionedUsers") or []]
@@ -1,16 +1,32 @@
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Optional
 from datetime import datetime
-import json
+from array import array
+from projection import project_date, project_hour, project_username_raw, decode_counts
+from compression import compression_of
+from line_reader import MappedFile, iter_lines, iter_mapped_lines
+from instrumentation import profiled, stage, count
+from window import check_granularity, check_n, date_window, prefix_window, bucket_from_prefix
+from date_index import load_date_index, merge_ranges
 
-def q1_memory(file_path: str) -> List[Tuple[datetime.date, str]]:
+@profiled
+def q1_memory(file_path: str, n: int = 10, start_date: Optional[datetime.date] = None,
+              end_date: Optional[datetime.date] = None, granularity: str = "day") -> List[Tuple[datetime.date, str]]:
     """
-    Lee archivo JSON con tweets desde path y devuelve las top 10 fechas donde hay más tweets,
+    Lee archivo JSON con tweets desde path y devuelve las top n (10 por defecto) fechas donde hay más tweets,
     mencionando el usuario (username) que más publicaciones tiene por cada uno de esos días.
 
     Parameters
     ----------
     file_path : str
-        Ruta del archivo JSON.
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    n : int
+        Cantidad de fechas a entregar.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    granularity : str
+        Agrupación del tiempo: "day" (por defecto), "hour" (datetime con la hora) o "week" (lunes de la semana).
 
     Returns
     -------
@@ -18,39 +34,150 @@ def q1_memory(file_path: str) -> List[Tuple[datetime.date, str]]:
         Una lista de tuplas con el dia y el usuario con más tweets en el dia,
         en orden descendente según publicaciones totales en los días.
     """
-  
-    # Diccionario para guardar numero de tweets por cada día
-    date_counts = {}
-    
-    with open(file_path, "r") as file:
-        # Iterar por cada linea ie. tweet del archivo
-        for line in file:
-            # Leer un tweet
-            tweet = json.loads(line)
-            # Conversion de date del tweet de str a datetime.date
-            date = datetime.strptime(tweet["date"][:10], "%Y-%m-%d").date()
-            # Actualizacion de conteo para el día
-            date_counts[date] = date_counts.get(date, 0) + 1
-    
-    # Obtención de los 10 días con más tweets
-    dates_max = sorted(date_counts, key=date_counts.get, reverse=True)[:10]
-    
+
+    check_granularity(granularity)
+    check_n(n)
+    # Ventana de días como strings "YYYY-MM-DD" comparables con el prefijo de cada linea
+    window = prefix_window(*date_window(start_date, end_date))
+    # Extracción del prefijo de "date" según la granularidad ("YYYY-MM-DDTHH" o "YYYY-MM-DD")
+    project_prefix = project_hour if granularity == "hour" else project_date
+
+    # Archivo con índice de fechas vigente (ver date_index.py): los conteos por intervalo salen del índice
+    # y solo se leen los rangos de bytes de los n intervalos máximos
+    index = load_date_index(file_path)
+    if index is not None and (granularity != "hour" or "hours" in index):
+        return _q1_indexed(file_path, index, n, window, granularity)
+
+    # Cada intervalo de tiempo se identifica con un id denso (en orden de primera aparición):
+    # prefijo -> id (hay pocos prefijos distintos), intervalo -> id, id -> intervalo
+    prefix_ids = {}
+    bucket_ids = {}
+    buckets = []
+    # Posiciones (byte offset) de los tweets de cada intervalo, por id
+    # El número de tweets del intervalo es el largo de su arreglo de posiciones
+    bucket_offsets = []
+
+    with stage("date_scan"):
+        size = 0
+        # Iterar por cada linea ie. tweet del archivo, sin copiarla, desde ventanas acotadas mapeadas en memoria
+        for offset, line in iter_mapped_lines(file_path):
+            size += len(line)
+            # Extracción del día (y hora) del tweet directamente desde los bytes de la linea
+            prefix = project_prefix(line)
+            # Tweets fuera de la ventana de fechas se saltan sin leer nada más de la linea
+            if window is not None and not window[0] <= prefix[:10] <= window[1]:
+                continue
+            bucket_id = prefix_ids.get(prefix)
+            if bucket_id is None:
+                # Primera aparición del prefijo: conversión a su intervalo de tiempo
+                # (varios prefijos pueden ser del mismo intervalo, ej. días de una semana)
+                bucket = bucket_from_prefix(prefix, granularity)
+                bucket_id = bucket_ids.get(bucket)
+                if bucket_id is None:
+                    bucket_id = bucket_ids[bucket] = len(buckets)
+                    buckets.append(bucket)
+                    bucket_offsets.append(array("Q"))
+                prefix_ids[prefix] = bucket_id
+            # Registro de la posición del tweet en el arreglo del intervalo (8 bytes por tweet)
+            bucket_offsets[bucket_id].append(offset)
+        count(sum(map(len, bucket_offsets)), size)
+
+    # Obtención de los ids de los n intervalos con más tweets (si hay empate, el intervalo más antiguo primero)
+    ids_max = sorted(range(len(buckets)),
+                     key=lambda bucket_id: (-len(bucket_offsets[bucket_id]), buckets[bucket_id]))[:n]
+
+    # Los usernames se cuentan en bytes, tal como aparecen en cada linea, y se decodifican al final de cada
+    # intervalo (ver _top_user)
+    # Archivo comprimido: no se puede saltar a una posición sin descomprimir desde el inicio,
+    # por lo que se hace una segunda lectura secuencial contando usernames solo de los n intervalos máximos
+    if compression_of(file_path) is not None:
+        # Diccionario con conteo de tweets por username para cada uno de los n intervalos máximos
+        user_counts = {bucket_id: {} for bucket_id in ids_max}
+        # Prefijos de los n intervalos máximos (varios prefijos pueden ser de la misma semana)
+        prefixes_max = {prefix: bucket_id for prefix, bucket_id in prefix_ids.items() if bucket_id in user_counts}
+        with stage("user_count"):
+            for line in iter_lines(file_path):
+                count(1, len(line))
+                bucket_id = prefixes_max.get(project_prefix(line))
+                if bucket_id is not None:
+                    day_users = user_counts[bucket_id]
+                    username = project_username_raw(line)
+                    day_users[username] = day_users.get(username, 0) + 1
+        return [(buckets[bucket_id], _top_user(user_counts[bucket_id])) for bucket_id in ids_max]
+
     # Lista de salida
     out = []
-    # Iterar por cada uno de los 10 dates máximos
-    for date in dates_max:
-        # Diccionario para guardar numero de tweets por cada username
-        user_counts = {}
-        with open(file_path, "r") as file:
-            for line in file:
-                tweet = json.loads(line)
-                # Comparacion de date del tweet actual con el date máximo considerado actualmente
-                if datetime.strptime(tweet["date"][:10], "%Y-%m-%d").date() == date:
-                    # Extraccion de username
-                    username = tweet.get("user",{}).get("username","")
-                    # Actualizacion de conteo para el username
-                    user_counts[username] = user_counts.get(username, 0) + 1
-                    # Agregar tupla con date máxima actual y el username con el conteo mayor para este día
-        out.append((date, max(user_counts, key=user_counts.get)))
-
-    return out
\ No newline at end of file
+    # Lectura de lineas sueltas desde ventanas acotadas del archivo mapeadas en memoria, sin lectura por adelantado
+    with stage("user_count"), MappedFile(file_path, advice="random") as mapped:
+        # Iterar por cada uno de los n intervalos máximos
+        for bucket_id in ids_max:
+            # Diccionario para guardar numero de tweets por cada username
+            user_counts = {}
+            # Se leen solo las lineas del intervalo, directamente desde su posición en el archivo
+            for offset in bucket_offsets[bucket_id]:
+                line = mapped.line_at(offset)
+                count(1, len(line))
+                # Extraccion de username (en bytes) directamente desde los bytes de la linea
+                username = project_username_raw(line)
+                # Actualizacion de conteo para el username
+                user_counts[username] = user_counts.get(username, 0) + 1
+            # Agregar tupla con el intervalo máximo actual y el username con el conteo mayor para este intervalo
+            out.append((buckets[bucket_id], _top_user(user_counts)))
+            # Liberar posiciones del intervalo ya procesado
+            bucket_offsets[bucket_id] = None
+
+    return out
+
+
+def _top_user(user_counts: Dict[bytes, int]) -> str:
+    """
+    Username con más tweets de un intervalo a partir de sus conteos en bytes (si hay empate, el menor username
+    en orden alfabético, como en q1_time).
+
+    Los conteos se suman por username decodificado antes de elegir el máximo, porque el mismo username puede
+    estar escrito con bytes distintos en distintas lineas (ej. con o sin secuencias de escape "\\uXXXX").
+    """
+
+    users = decode_counts(user_counts)
+    return min(users, key=lambda username: (-users[username], username))
+
+
+def _q1_indexed(file_path: str, index: dict, n: int, window: Optional[Tuple[str, str]],
+                granularity: str) -> List[Tuple[datetime.date, str]]:
+    """
+    q1_memory usando el índice de fechas: conteo de tweets por intervalo desde el índice y conteo de usernames
+    leyendo solo los rangos de bytes de los n intervalos máximos.
+    """
+
+    # Entradas del índice por hora o por día, en orden de primera aparición en el archivo
+    entries = index["hours"] if granularity == "hour" else index["days"]
+    project_prefix = project_hour if granularity == "hour" else project_date
+
+    # Conteo de tweets y rangos de bytes por intervalo, y el intervalo de cada prefijo de la ventana
+    bucket_counts = {}
+    bucket_ranges = {}
+    buckets = {}
+    for prefix, entry in entries.items():
+        if window is not None and not window[0] <= prefix[:10] <= window[1]:
+            continue
+        bucket = buckets[prefix] = bucket_from_prefix(prefix, granularity)
+        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + entry["count"]
+        bucket_ranges.setdefault(bucket, []).extend(entry["ranges"])
+
+    # Obtención de los n intervalos con más tweets (si hay empate, el intervalo más antiguo primero)
+    dates_max = sorted(bucket_counts, key=lambda bucket: (-bucket_counts[bucket], bucket))[:n]
+
+    out = []
+    with stage("user_count"):
+        for date in dates_max:
+            user_counts = {}
+            # Los rangos pueden incluir lineas de otros intervalos, que se descartan según su prefijo
+            for _, line in iter_mapped_lines(file_path, merge_ranges(bucket_ranges[date])):
+                count(1, len(line))
+                if buckets.get(project_prefix(line)) != date:
+                    continue
+                username = project_username_raw(line)
+                user_counts[username] = user_counts.get(username, 0) + 1
+            out.append((date, _top_user(user_counts)))
+
+    return out
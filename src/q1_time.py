@@ -1,17 +1,34 @@
-from typing import List, Tuple
-import pandas as pd
+from typing import TYPE_CHECKING, List, Tuple, Optional
 from datetime import datetime
-import polars as pl
+from tweet_cache import scan_projected, fresh_cache, parquet_filters
+from instrumentation import profiled, stage
+from window import check_granularity, check_n, date_window
 
-def q1_time(file_path: str) -> List[Tuple[datetime.date, str]]:
+# pandas y Polars se importan dentro de cada función, para que importar el módulo (ej. desde cli.py) no cargue
+# ambas librerías (cada variante usa solo una)
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@profiled
+def q1_time(file_path: str, n: int = 10, start_date: Optional[datetime.date] = None,
+            end_date: Optional[datetime.date] = None, granularity: str = "day") -> List[Tuple[datetime.date, str]]:
     """
-    Lee archivo JSON con tweets desde path y devuelve las top 10 fechas donde hay más tweets,
+    Lee archivo JSON con tweets desde path y devuelve las top n (10 por defecto) fechas donde hay más tweets,
     mencionando el usuario (username) que más publicaciones tiene por cada uno de esos días.
 
     Parameters
     ----------
     file_path : str
         Ruta del archivo JSON.
+    n : int
+        Cantidad de fechas a entregar.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    granularity : str
+        Agrupación del tiempo: "day" (por defecto), "hour" (datetime con la hora) o "week" (lunes de la semana).
 
     Returns
     -------
@@ -20,39 +37,49 @@ def q1_time(file_path: str) -> List[Tuple[datetime.date, str]]:
         en orden descendente según publicaciones totales en los días.
     """
     
-    # Crear LazyFrame para leer el JSON
-    lf_tweets = pl.scan_ndjson(file_path, low_memory=True)
-
-    # Selección de columnas a usar
-    lf_tweets = lf_tweets.select(
-            # Cast "date" a tipo Date de Polars
-            pl.col("date").cast(pl.Datetime).cast(pl.Date),
-            # Extracción de usernames desde users como columna "username"
-            pl.col("user").struct.field("username").alias("username"),
-    )
-
-    # Agregar columna "date_count" con el conteo de tweets por día (tweets del mismo día tienen mismo valor en la columna)
-    lf_tweets = lf_tweets.with_columns(pl.len().over(["date"]).alias("date_count"))
-    # Agregar columna "user_count" con el conteo de tweets por combinacion de día y user (tweets del mismo día y user tienen mismo valor en la columna)
-    lf_tweets = lf_tweets.with_columns(pl.len().over(["date", "username"]).alias("user_count"))
-
-    lf_tweets = (lf_tweets
-                 # Ordenar por conteo de tweets por username
-                 .sort(by=["user_count"], descending=True)
+    import polars as pl
+
+    check_granularity(granularity)
+    check_n(n)
+
+    # Crear LazyFrame con las columnas a usar: "date" como Date de Polars (o "hour" como Datetime) y "username"
+    # (desde dentro de "user"). Se lee desde el cache columnar si está vigente, o desde el JSON con esquema proyectado.
+    # El filtro de fechas se empuja a la lectura.
+    time_column = "hour" if granularity == "hour" else "date"
+    # El motor de streaming de Polars (0.20) solo ejecuta por lotes los planes que leen parquet: con el cache
+    # columnar vigente la lectura y el primer conteo se hacen por lotes, sin cargar el archivo completo. El scan del
+    # JSON no es soportado por ese motor, por lo que en ese caso se usa el motor en memoria (con low_memory).
+    streaming = fresh_cache(file_path) is not None
+    lf_tweets = scan_projected(file_path, [time_column, "username"], start_date, end_date, low_memory=True)
+    # El intervalo de tiempo de cada tweet queda en la columna "date"
+    if granularity == "hour":
+        lf_tweets = lf_tweets.rename({"hour": "date"})
+    elif granularity == "week":
+        # Inicio (lunes) de la semana de cada tweet
+        lf_tweets = lf_tweets.with_columns(pl.col("date").dt.truncate("1w"))
+
+    # Conteo de tweets por combinación de día y username (agregación agrupada, sin columnas calculadas por fila)
+    lf_user_counts = lf_tweets.group_by(["date", "username"]).agg(pl.len().alias("user_count"))
+
+    lf_tweets = (lf_user_counts
                  # Agrupar por días
                  .group_by(["date"])
                  .agg(
-                     # Agregar columna "username_max" con el primer username de cada particion/dia
-                     pl.col("username").first().alias("username_max"), 
-                     # Agregar columna "date_count" con el date count asociado (conteo de tweets del dia)
-                     pl.col("date_count").first().alias("date_count"))
+                     # Agregar columna "username_max" con el username con más tweets del día
+                     # (si hay empate, el menor username en orden alfabético)
+                     pl.col("username").filter(pl.col("user_count") == pl.col("user_count").max()).min()
+                     .alias("username_max"),
+                     # Agregar columna "date_count" con el conteo de tweets del día (suma de los conteos por username)
+                     pl.col("user_count").sum().alias("date_count"))
                 )
 
-    # Ordenar según el conteo total de tweets de los días y extraer los 10 mayores
-    lf_tweets = lf_tweets.sort(by=["date_count"], descending=True).limit(10)
+    # Ordenar según el conteo total de tweets de los días (si hay empate, el día más antiguo primero)
+    # y extraer los n mayores
+    lf_tweets = lf_tweets.sort(by=["date_count", "date"], descending=[True, False]).limit(n)
 
-    # Materializar el LazyFrame a DataFrame
-    df_tweets = lf_tweets.collect()
+    # Materializar el LazyFrame a DataFrame (con el motor de streaming si se lee desde el cache columnar)
+    with stage("collect"):
+        df_tweets = lf_tweets.collect(streaming=streaming)
 
     # Eliminar columna "date_count" para preparar output
     df_tweets = df_tweets.drop("date_count")
@@ -63,15 +90,33 @@ def q1_time(file_path: str) -> List[Tuple[datetime.date, str]]:
     return out
 
 
-def q1_time_pandas(file_path: str) -> List[Tuple[datetime.date, str]]:
+@profiled
+def q1_time_pandas(file_path: str, n: int = 10, start_date: Optional[datetime.date] = None,
+                   end_date: Optional[datetime.date] = None, granularity: str = "day", chunksize: Optional[int] = None,
+                   engine: str = "ujson", dtype_backend: Optional[str] = None) -> List[Tuple[datetime.date, str]]:
     """
-    Lee archivo JSON con tweets desde path y devuelve las top 10 fechas donde hay más tweets,
+    Lee archivo JSON con tweets desde path y devuelve las top n (10 por defecto) fechas donde hay más tweets,
     mencionando el usuario (username) que más publicaciones tiene por cada uno de esos días.
 
     Parameters
     ----------
     file_path : str
         Ruta del archivo JSON.
+    n : int
+        Cantidad de fechas a entregar.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    granularity : str
+        Agrupación del tiempo: "day" (por defecto), "hour" (datetime con la hora) o "week" (lunes de la semana).
+    chunksize : int, optional
+        Si se indica, el JSON se lee por chunks de chunksize tweets, sumando los conteos de cada chunk
+        (la memoria queda acotada a un chunk y los conteos). Por defecto se lee completo.
+    engine : str
+        Motor de lectura del JSON: "ujson" (por defecto) o "pyarrow".
+    dtype_backend : str, optional
+        Backend de tipos del JSON leído: "numpy_nullable" o "pyarrow". Por defecto los tipos numpy.
 
     Returns
     -------
@@ -80,33 +125,91 @@ def q1_time_pandas(file_path: str) -> List[Tuple[datetime.date, str]]:
         en orden descendente según publicaciones totales en los días.
     """
     
-    # Carga de datos del JSON en Dataframe de Pandas
-    df_tweets = pd.read_json(file_path, lines=True)
-       
-    # Extracción de nombre de usuario
-    df_tweets["username"] = df_tweets["user"].apply(lambda x: x.get("username"))
-
-    # Conversión de date a datetime de pandas
-    # Se deja solo la fecha para agrupar los días
-    df_tweets["date"] = pd.to_datetime(df_tweets["date"]).dt.date
-
-    # Obtención de indices de los 10 días con más tweets
-    days_max = df_tweets['date'].value_counts().nlargest(10).index
-    # Extracción de los 10 días con más tweets
-    df_tweets = df_tweets[df_tweets["date"].isin(days_max)]
-
-    # Conteo de tweets por día y por username (Para cada combinación)
-    df_tweets = df_tweets.groupby(["date", "username"]).size().reset_index(name="count")
-
-    # Indices de usernames con más tweets por día
+    import pandas as pd
+    from pandas_reader import CountMerger, iter_json_frames
+
+    check_granularity(granularity)
+    check_n(n)
+    start_date, end_date = date_window(start_date, end_date)
+    columns = ["date", "username"] + (["hour"] if granularity == "hour" else [])
+
+    cache_path = fresh_cache(file_path)
+    if cache_path is not None:
+        # Carga de columnas proyectadas desde el cache columnar (date ya viene como fecha)
+        # El filtro de fechas se aplica en la lectura, saltando row groups fuera de la ventana
+        with stage("read_parquet"):
+            frames = [pd.read_parquet(cache_path, columns=columns, filters=parquet_filters(start_date, end_date))]
+    else:
+        # Carga de datos del JSON en Dataframes de Pandas (uno solo, o uno por chunk)
+        frames = (_parse_tweets(df, granularity, start_date, end_date)
+                  for df in iter_json_frames(file_path, chunksize, engine, dtype_backend))
+
+    # Conteo de tweets por día y por username (Para cada combinación), sumando los conteos de cada chunk
+    merger = CountMerger()
+    for df_tweets in frames:
+        # El intervalo de tiempo de cada tweet queda en la columna "date"
+        if granularity == "hour":
+            df_tweets = df_tweets.assign(date=df_tweets["hour"])
+        elif granularity == "week":
+            # Inicio (lunes) de la semana de cada tweet
+            days = pd.to_datetime(df_tweets["date"])
+            df_tweets = df_tweets.assign(date=(days - pd.to_timedelta(days.dt.weekday, unit="D")).dt.date)
+        with stage("count"):
+            merger.add(df_tweets.groupby(["date", "username"]).size())
+    with stage("count"):
+        user_counts = merger.result()
+
+    # Sin tweets en la ventana
+    if user_counts is None or user_counts.empty:
+        return []
+
+    # Obtención de indices de los n días con más tweets (suma de los conteos de sus usernames)
+    # Los días quedan ordenados por fecha al agrupar, por lo que en un empate nlargest deja el día más antiguo primero
+    days_max = user_counts.groupby(level="date").sum().nlargest(n).index
+    # Extracción de los conteos de los n días con más tweets
+    df_tweets = user_counts[user_counts.index.get_level_values("date").isin(days_max)].reset_index(name="count")
+
+    # Indices de usernames con más tweets por día (los usernames de cada día quedan en orden alfabético al agrupar,
+    # por lo que en un empate idxmax entrega el menor username)
     idx_max = df_tweets.groupby("date")["count"].idxmax()
-    # Obtención de usernames con más tweets por día
-    usernames_max = df_tweets.loc[idx_max]
+    # Obtención de usernames con más tweets por día, en el orden de los días con más tweets
+    usernames_max = df_tweets.loc[idx_max[days_max]]
 
     # Eliminar columna "count" para preparar output
     usernames_max = usernames_max.drop("count", axis=1)
     
     # Transformación de Dataframe a lista de tuplas para salida
     out = list(usernames_max.itertuples(index=False, name=None))
+    if granularity == "hour":
+        # Horas como datetime de Python (en lugar de pd.Timestamp)
+        out = [(hour.to_pydatetime(), username) for hour, username in out]
     
-    return out
\ No newline at end of file
+    return out
+
+
+def _parse_tweets(df_tweets: "pd.DataFrame", granularity: str, start_date: Optional[datetime.date],
+                  end_date: Optional[datetime.date]) -> "pd.DataFrame":
+    """
+    Extrae "username" y "date" (y "hour") de los tweets leídos desde el JSON y aplica la ventana de fechas.
+    """
+
+    import pandas as pd
+
+    with stage("parse"):
+        # Extracción de nombre de usuario
+        df_tweets["username"] = df_tweets["user"].apply(lambda x: x.get("username"))
+
+        # Conversión de date a datetime de pandas
+        # Se deja solo la fecha para agrupar los días (y el inicio de la hora si se agrupa por hora)
+        timestamps = pd.to_datetime(df_tweets["date"])
+        df_tweets["date"] = timestamps.dt.date
+        if granularity == "hour":
+            df_tweets["hour"] = timestamps.dt.floor("h").dt.tz_localize(None)
+
+    # Filtro de la ventana de fechas
+    if start_date is not None:
+        df_tweets = df_tweets[df_tweets["date"] >= start_date]
+    if end_date is not None:
+        df_tweets = df_tweets[df_tweets["date"] <= end_date]
+
+    return df_tweets
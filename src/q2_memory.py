@@ -1,44 +1,108 @@
-from typing import List, Tuple
-import json
-import emoji
+from typing import List, Tuple, Iterator, Optional, Union
+from datetime import date
+from projection import project_date, project_content
+from emoji_regex import EmojiCache
+from sketch import ApproximateTop, approximate_top_k
+from date_index import iter_window_lines
+from instrumentation import profiled, stage, count
+from window import check_n, date_window, prefix_window
 from collections import Counter
 
-def q2_memory(file_path: str) -> List[Tuple[str, int]]:
+@profiled
+def q2_memory(file_path: str, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+              approximate: bool = False, capacity: int = 1000,
+              verify: bool = True) -> Union[List[Tuple[str, int]], ApproximateTop]:
     """
-    Lee archivo JSON con tweets desde path y devuelve los top 10 emojis más usados,
+    Lee archivo JSON con tweets desde path y devuelve los top n (10 por defecto) emojis más usados,
     con su respectivo conteo.
 
     Parameters
     ----------
     file_path : str
-        Ruta del archivo JSON.
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    approximate : bool
+        Si es True se usa un sketch Space-Saving con memoria acotada en lugar de contar todos los emojis,
+        seguido (si verify es True) de una segunda pasada que cuenta exactamente solo los candidatos al top n.
+    capacity : int
+        Cantidad máxima de emojis contados a la vez en el modo aproximado (al menos n).
+    verify : bool
+        Solo en el modo aproximado: si es False se omite la segunda pasada y se entregan los conteos estimados
+        por el sketch, con su error máximo.
 
     Returns
     -------
-    List[Tuple[str, int]]
+    List[Tuple[str, int]] o ApproximateTop
         Una lista de tuplas con el emoji y las veces que fue utilizado,
         en orden descendente según cantidad de apariciones.
+        En el modo aproximado, un ApproximateTop con tuplas (emoji, conteo, error máximo) y si el top está
+        garantizado como el real (ver sketch.py).
     """
-    
+
+    check_n(n)
+
+    if approximate:
+        # Modo con memoria acotada (ver sketch.py)
+        return approximate_top_k(lambda: iter_emojis(file_path, start_date, end_date), n=n, capacity=capacity,
+                                 verify=verify)
+
     # Contador para emojis
     counter_emojis = Counter()
   
-    with open(file_path, "r") as file:
-        # Iterar por cada linea ie. tweet del archivo
-        for line in file:
-            # Leer tweet
-            tweet = json.loads(line)
-            # Extracción de "content"
-            content = tweet.get("content")
-            # Obtención de emojis en el contenido actual
-            # Es una lista de diccionarios por cada emoji de la forma: {'match_start': 262, 'match_end': 263, 'emoji': '🚜'}
-            emojis_match = emoji.emoji_list(content)
-            # Agregar solo "emoji" a lista
-            emojis_list = [match['emoji'] for match in emojis_match]
-            # Actualizar counter de emojis
+    for emojis_list in iter_emojis(file_path, start_date, end_date):
+        # Actualizar counter de emojis
+        with stage("count"):
             counter_emojis.update(emojis_list)
             
-    # Extraccion de los 10 emojis mas usados
-    out = counter_emojis.most_common(10)
+    # Extraccion de los n emojis mas usados
+    out = counter_emojis.most_common(n)
     
-    return out
\ No newline at end of file
+    return out
+
+
+def iter_emojis(file_path: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[List[str]]:
+    """
+    Lee archivo JSON con tweets linea a linea y entrega los emojis usados en cada tweet.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    start_date : datetime.date, optional
+        Si se indica, se saltan los tweets anteriores a este día.
+    end_date : datetime.date, optional
+        Si se indica, se saltan los tweets posteriores a este día.
+
+    Returns
+    -------
+    Iterator[List[str]]
+        Lista de emojis por cada tweet.
+    """
+
+    # Ventana de días como strings "YYYY-MM-DD" comparables con el prefijo de cada linea
+    window = prefix_window(*date_window(start_date, end_date))
+
+    # Emojis de cada contenido, reutilizados para contenidos repetidos y saltando textos solo ASCII
+    emoji_cache = EmojiCache()
+
+    # Iterar por cada linea ie. tweet del archivo (solo los rangos de la ventana si hay índice de fechas)
+    for line in iter_window_lines(file_path, start_date, end_date):
+        count(1, len(line))
+        # Tweets fuera de la ventana de fechas se saltan sin extraer el contenido
+        if window is not None and not window[0] <= project_date(line) <= window[1]:
+            continue
+        # Extracción de "content" directamente desde los bytes de la linea
+        with stage("project_content"):
+            content = project_content(line)
+        # Obtención de emojis en el contenido actual (desde el cache si el contenido ya apareció)
+        with stage("emoji_match"):
+            emojis = emoji_cache(content)
+        yield emojis
+
+    # Aciertos y fallos del cache en la instrumentación
+    emoji_cache.report()
@@ -1,19 +1,34 @@
-from typing import List, Tuple
-import pandas as pd
-import emoji
+from typing import TYPE_CHECKING, List, Tuple, Optional
+from datetime import date
 from collections import Counter
-import polars as pl
+from emoji_regex import EmojiCache
+from tweet_cache import scan_projected, fresh_cache, parquet_filters
+from instrumentation import profiled, stage
+from window import check_n, date_window
 
+# pandas y Polars se importan dentro de cada función, para que importar el módulo (ej. desde cli.py) no cargue
+# ambas librerías (cada variante usa solo una)
+if TYPE_CHECKING:
+    import pandas as pd
 
-def q2_time(file_path: str) -> List[Tuple[str, int]]:    
+
+@profiled
+def q2_time(file_path: str, n: int = 10, start_date: Optional[date] = None,
+            end_date: Optional[date] = None) -> List[Tuple[str, int]]:    
     """
-    Lee archivo JSON con tweets desde path y devuelve los top 10 emojis más usados,
+    Lee archivo JSON con tweets desde path y devuelve los top n (10 por defecto) emojis más usados,
     con su respectivo conteo.
 
     Parameters
     ----------
     file_path : str
         Ruta del archivo JSON.
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
 
     Returns
     -------
@@ -22,26 +37,32 @@ def q2_time(file_path: str) -> List[Tuple[str, int]]:
         en orden descendente según cantidad de apariciones.
     """
     
-    # Crear LazyFrame para leer el JSON
-    lf_emojis = pl.scan_ndjson(file_path)
+    import polars as pl
+
+    check_n(n)
+
+    # Crear LazyFrame con la lista de emojis de cada tweet ("emojis")
+    # Se lee precalculada desde el cache columnar si está vigente, o se extrae desde "content" del JSON
+    # con la expresión regular precompilada (sin pasar por Python). El filtro de fechas se empuja a la lectura.
+    lf_emojis = scan_projected(file_path, ["emojis"], start_date, end_date)
     
     # Selección de columnas a usar
     lf_emojis = lf_emojis.select(
-        # Extraccion de lista de emojis de cada tweet
-        pl.col("content").map_batches(extract_emojis_list).alias("emojis_lists")
+        pl.col("emojis").alias("emojis_lists")
     ).filter(
         # Filtrado de tweets sin emojis
         pl.col("emojis_lists").list.len() > 0
     )
     
     # Materialización del LazyFrame a DataFrame
-    df_emojis_lists = lf_emojis.collect()
+    with stage("collect"):
+        df_emojis_lists = lf_emojis.collect()
     
     # "Abrir" filas creando una fila nueva por cada emoji en la lista (Se renombra column a "emojis")
     df_emojis = df_emojis_lists.get_column("emojis_lists").explode().alias("emojis")
 
-    # Se genera dataframe con conteo por cada emoji ordenado de mayor a menor y se extraen los 10 emojis con mayor conteo
-    emojis_counts = df_emojis.value_counts(sort=True)[0:10]
+    # Se genera dataframe con conteo por cada emoji ordenado de mayor a menor y se extraen los n emojis con mayor conteo
+    emojis_counts = df_emojis.value_counts(sort=True)[0:n]
 
     # Se crea lista de tuplas de salida
     out = list(zip(emojis_counts["emojis"], emojis_counts["count"]))
@@ -50,15 +71,31 @@ def q2_time(file_path: str) -> List[Tuple[str, int]]:
 
 
 
-def q2_time_pandas(file_path: str) -> List[Tuple[str, int]]:
+@profiled
+def q2_time_pandas(file_path: str, n: int = 10, start_date: Optional[date] = None,
+                   end_date: Optional[date] = None, chunksize: Optional[int] = None, engine: str = "ujson",
+                   dtype_backend: Optional[str] = None) -> List[Tuple[str, int]]:
     """
-    Lee archivo JSON con tweets desde path y devuelve los top 10 emojis más usados,
+    Lee archivo JSON con tweets desde path y devuelve los top n (10 por defecto) emojis más usados,
     con su respectivo conteo.
 
     Parameters
     ----------
     file_path : str
         Ruta del archivo JSON.
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    chunksize : int, optional
+        Si se indica, el JSON se lee por chunks de chunksize tweets, sumando los conteos de cada chunk
+        (la memoria queda acotada a un chunk y los conteos). Por defecto se lee completo.
+    engine : str
+        Motor de lectura del JSON: "ujson" (por defecto) o "pyarrow".
+    dtype_backend : str, optional
+        Backend de tipos del JSON leído: "numpy_nullable" o "pyarrow". Por defecto los tipos numpy.
 
     Returns
     -------
@@ -67,19 +104,44 @@ def q2_time_pandas(file_path: str) -> List[Tuple[str, int]]:
         en orden descendente según cantidad de apariciones.
     """
     
-    # Carga de datos del JSON en Dataframe de Pandas
-    df = pd.read_json(file_path, lines=True)
-
-    # Extracción de columna content
-    df_content = df['content']
-
-    # Aplicación de función para extraer lista de emojis de cada content
-    df_emojis = df_content.apply(get_emojis_list)
-    # "Abrir" cada fila, creando una fila nueva por cada emoji en la lista
-    df_emojis = df_emojis.explode()
-
-    # Contar y ordenar por apariciones de cada emoji y extraer los 10 mayores
-    emojis_max = df_emojis.value_counts()[0:10]
+    import pandas as pd
+    from pandas_reader import CountMerger, iter_json_frames
+
+    check_n(n)
+    start_date, end_date = date_window(start_date, end_date)
+
+    cache_path = fresh_cache(file_path)
+    if cache_path is not None:
+        # Carga de lista de emojis de cada tweet, precalculada en el cache columnar
+        with stage("read_parquet"):
+            emojis_lists = [pd.read_parquet(cache_path, columns=["emojis"],
+                                            filters=parquet_filters(start_date, end_date))["emojis"]]
+    else:
+        # Emojis de cada contenido, reutilizados para contenidos repetidos y saltando textos solo ASCII
+        # (con el tokenizador de la librería emoji, ver emoji_regex.list_emojis)
+        emoji_cache = EmojiCache()
+        # Carga de datos del JSON en Dataframes de Pandas (uno solo, o uno por chunk)
+        emojis_lists = (_find_emojis(df, start_date, end_date, emoji_cache)
+                        for df in iter_json_frames(file_path, chunksize, engine, dtype_backend))
+
+    # Conteo de apariciones de cada emoji, sumando los conteos de cada chunk
+    merger = CountMerger()
+    for df_emojis in emojis_lists:
+        # "Abrir" cada fila, creando una fila nueva por cada emoji en la lista, y contar apariciones
+        with stage("count"):
+            merger.add(df_emojis.explode().value_counts())
+    with stage("count"):
+        emojis_counts = merger.result()
+
+    if cache_path is None:
+        # Aciertos y fallos del cache en la instrumentación
+        emoji_cache.report()
+
+    if emojis_counts is None:
+        return []
+
+    # Ordenar por apariciones de cada emoji y extraer los n mayores
+    emojis_max = emojis_counts.sort_values(ascending=False)[0:n]
 
     # Ordenar serie de pandas como lista de tuplas
     out = list(zip(emojis_max, emojis_max.index))
@@ -87,6 +149,28 @@ def q2_time_pandas(file_path: str) -> List[Tuple[str, int]]:
     return out
 
 
+def _find_emojis(df: "pd.DataFrame", start_date: Optional[date], end_date: Optional[date],
+                 emoji_cache: EmojiCache) -> "pd.Series":
+    """
+    Aplica la ventana de fechas a los tweets leídos desde el JSON y extrae la lista de emojis de cada uno.
+    """
+
+    import pandas as pd
+
+    # Filtro de la ventana de fechas
+    if start_date is not None or end_date is not None:
+        days = pd.to_datetime(df["date"]).dt.date
+        df = df[days.between(start_date or date.min, end_date or date.max)]
+
+    # Extracción de lista de emojis de cada content a través del cache
+    with stage("emoji_match"):
+        return df["content"].map(emoji_cache)
+
+
+
+# Cache de emojis compartido por las llamadas a get_emojis_list
+_emoji_cache = EmojiCache()
+
 
 def get_emojis_list(content: str) -> List[str]:
     """
@@ -103,30 +187,7 @@ def get_emojis_list(content: str) -> List[str]:
         Lista con emojis que aparecen en el contenido.
     """
     
-    # Obtención de lista de diccionarios por cada emoji de la forma: {'match_start': 262, 'match_end': 263, 'emoji': '🚜'}
-    emojis_match = emoji.emoji_list(content)
-    # Agregar solo 'emoji' a lista
-    emojis_list = [match['emoji'] for match in emojis_match]
+    # Emojis desde el cache compartido (copia, ya que la lista del cache no se debe modificar)
+    emojis_list = list(_emoji_cache(content))
     
     return emojis_list
-
-
-def extract_emojis_list(batch: pl.DataFrame) -> pl.Series:
-    """
-    Extrae lista de emojis en cada elemento de un Dataframe.
-
-    Parameters
-    ----------
-    batch : pl.DataFrame
-        Dataframe con texto en cada elemento.
-
-    Returns
-    -------
-    pl.Series
-        Serie de Polars con lista de emojis en cada elemento.
-    """
-    
-    # Se aplica función "get_emojis_list" a cada item dentro del batch
-    emojis_lists = [get_emojis_list(x) for x in batch]
-    # Se devuelve la lista como una serie de Polars 
-    return pl.Series(emojis_lists)
\ No newline at end of file
@@ -1,42 +1,107 @@
-from typing import List, Tuple
-import json
+from typing import List, Tuple, Iterator, Optional, Union
+from datetime import date
+from projection import project_date, project_mentioned_raw, canonical_username, decode_counts, decode_username
+from sketch import ApproximateTop, approximate_top_k
+from date_index import iter_window_lines
+from instrumentation import profiled, stage, count
+from window import check_n, date_window, prefix_window
 from collections import Counter
 
-def q3_memory(file_path: str) -> List[Tuple[str, int]]:
+@profiled
+def q3_memory(file_path: str, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+              approximate: bool = False, capacity: int = 1000,
+              verify: bool = True) -> Union[List[Tuple[str, int]], ApproximateTop]:
     """
-    Lee archivo JSON con tweets desde path y devuelve el top 10 histórico de usuarios (username)
+    Lee archivo JSON con tweets desde path y devuelve el top n (10 por defecto) histórico de usuarios (username)
     más influyentes en función del conteo de las menciones (@) que registra cada uno de ellos.
 
     Parameters
     ----------
     file_path : str
-        Ruta del archivo JSON.
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    approximate : bool
+        Si es True se usa un sketch Space-Saving con memoria acotada en lugar de contar todos los usernames,
+        seguido (si verify es True) de una segunda pasada que cuenta exactamente solo los candidatos al top n.
+    capacity : int
+        Cantidad máxima de usernames contados a la vez en el modo aproximado (al menos n).
+    verify : bool
+        Solo en el modo aproximado: si es False se omite la segunda pasada y se entregan los conteos estimados
+        por el sketch, con su error máximo.
 
     Returns
     -------
-    List[Tuple[str, int]]
+    List[Tuple[str, int]] o ApproximateTop
         Una lista de tuplas con el username y las veces que fue mencionado,
         en orden descendente según cantidad de menciones.
+        En el modo aproximado, un ApproximateTop con tuplas (username, conteo, error máximo) y si el top está
+        garantizado como el real (ver sketch.py).
     """
 
-    # Contador para usernames mencionados
+    check_n(n)
+
+    # Los usernames se cuentan en bytes, tal como aparecen en cada linea. Un mismo username puede estar escrito
+    # con bytes distintos (con o sin secuencias de escape "\\uXXXX"), por lo que los conteos se suman por
+    # username decodificado antes de extraer el top
+    if approximate:
+        # Modo con memoria acotada (ver sketch.py). Los conteos no se pueden sumar al final (el sketch descarta
+        # contadores), por lo que cada username se cuenta con su forma única en bytes
+        out = approximate_top_k(lambda: ([canonical_username(username) for username in mentioned]
+                                         for mentioned in iter_mentioned(file_path, start_date, end_date)),
+                                n=n, capacity=capacity, verify=verify)
+        return out._replace(top=[(decode_username(username), mentions, error)
+                                 for username, mentions, error in out.top])
+
+    # Contador para usernames mencionados (en bytes)
     counter_mentioned = Counter()
     
-    with open(file_path, "r") as file:
-        # Leer linea a linea ie. tweet por tweet
-        for line in file:
-            # Leer tweet
-            tweet = json.loads(line)
-            # Extracción de "mentioned users"
-            mentioned = tweet.get('mentionedUsers')
-
-            if mentioned is not None:
-                # Por cada user mencionado en el tweet
-                for user in mentioned:
-                    # Actualizar counter de menciones
-                    counter_mentioned[user['username']] += 1
-
-    # Extracción de los 10 usernames mas mencionados
-    out = counter_mentioned.most_common(10)
-
-    return out
\ No newline at end of file
+    for mentioned in iter_mentioned(file_path, start_date, end_date):
+        # Actualizar counter de menciones por cada user mencionado en el tweet
+        with stage("count"):
+            counter_mentioned.update(mentioned)
+
+    # Conteos por username decodificado (cada username distinto en bytes se decodifica una vez)
+    # y extracción de los n usernames mas mencionados
+    out = decode_counts(counter_mentioned).most_common(n)
+
+    return out
+
+
+def iter_mentioned(file_path: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[List[bytes]]:
+    """
+    Lee archivo JSON con tweets linea a linea y entrega los usernames mencionados en cada tweet,
+    en bytes sin decodificar (ver projection.decode_counts).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    start_date : datetime.date, optional
+        Si se indica, se saltan los tweets anteriores a este día.
+    end_date : datetime.date, optional
+        Si se indica, se saltan los tweets posteriores a este día.
+
+    Returns
+    -------
+    Iterator[List[bytes]]
+        Lista de usernames mencionados por cada tweet.
+    """
+
+    # Ventana de días como strings "YYYY-MM-DD" comparables con el prefijo de cada linea
+    window = prefix_window(*date_window(start_date, end_date))
+
+    # Leer linea a linea ie. tweet por tweet (solo los rangos de la ventana si hay índice de fechas)
+    for line in iter_window_lines(file_path, start_date, end_date):
+        count(1, len(line))
+        # Tweets fuera de la ventana de fechas se saltan sin decodificar las menciones
+        if window is not None and not window[0] <= project_date(line) <= window[1]:
+            continue
+        # Extracción de usernames de "mentioned users" directamente desde los bytes de la linea
+        with stage("project_mentions"):
+            mentioned = project_mentioned_raw(line)
+        yield mentioned
@@ -1,17 +1,32 @@
-from typing import List, Tuple, Dict
-import pandas as pd
-import polars as pl
+from typing import TYPE_CHECKING, List, Tuple, Optional, Dict
+from datetime import date
+from tweet_cache import scan_projected, fresh_cache, parquet_filters
+from instrumentation import profiled, stage
+from window import check_n, date_window
 
+# pandas y Polars se importan dentro de cada función, para que importar el módulo (ej. desde cli.py) no cargue
+# ambas librerías (cada variante usa solo una)
+if TYPE_CHECKING:
+    import pandas as pd
 
-def q3_time(file_path: str) -> List[Tuple[str, int]]:
+
+@profiled
+def q3_time(file_path: str, n: int = 10, start_date: Optional[date] = None,
+            end_date: Optional[date] = None) -> List[Tuple[str, int]]:
     """
-    Lee archivo JSON con tweets desde path y devuelve el top 10 histórico de usuarios (username)
+    Lee archivo JSON con tweets desde path y devuelve el top n (10 por defecto) histórico de usuarios (username)
     más influyentes en función del conteo de las menciones (@) que registra cada uno de ellos.
 
     Parameters
     ----------
     file_path : str
         Ruta del archivo JSON.
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
 
     Returns
     -------
@@ -20,43 +35,65 @@ def q3_time(file_path: str) -> List[Tuple[str, int]]:
         en orden descendente según cantidad de menciones.
     """
     
-    # Crear LazyFrame para leer el JSON
-    lf_tweets = pl.scan_ndjson(file_path)
-    
-    # Selección de columnas a usar
-    lf_tweets = lf_tweets.select(
-        # Extraccion de lista de usernames de users mencionados de cada tweet
-        pl.col("mentionedUsers").map_batches(extract_usernames).alias("mentioned_list")
-    ).filter(
-        # Filtrado de tweets sin menciones
-        pl.col("mentioned_list").list.len() > 0
-    )
-    
-    # Materialización del LazyFrame a DataFrame
-    df_mentioned = lf_tweets.collect()
-
-    # "Abrir" filas creando una fila nueva por cada username mencionado en la lista (Se renombra columna a "mentioned")
-    df_mentioned = df_mentioned.get_column("mentioned_list").explode().alias("mentioned")
-
-    # Generación de conteo por cada username mencionado ordenado de mayor a menor y extracción de los 10 mas mencionados
-    mentioned_max = df_mentioned.value_counts(sort=True)[0:10]
+    import polars as pl
+
+    check_n(n)
+
+    # Crear LazyFrame con la lista de usernames mencionados en cada tweet ("mentioned")
+    # Se lee desde el cache columnar si está vigente, o desde el JSON con esquema explícito que solo lee
+    # "username" de cada usuario en "mentionedUsers", sin inferir ni materializar el resto del tweet
+    # El filtro de fechas se empuja a la lectura
+    lf_tweets = scan_projected(file_path, ["mentioned"], start_date, end_date)
+
+    lf_mentioned = (lf_tweets
+                    # "Abrir" filas creando una fila nueva por cada username mencionado
+                    .select(pl.col("mentioned").explode())
+                    # Filtrado de tweets sin menciones (quedan como nulos al abrir las listas)
+                    .drop_nulls()
+                    # Conteo por cada username mencionado
+                    .group_by("mentioned")
+                    .agg(pl.len().alias("count"))
+                    # Ordenar de mayor a menor y extraer los n mas mencionados
+                    .sort(by=["count"], descending=True)
+                    .limit(n)
+                   )
+
+    # Materialización del LazyFrame a DataFrame (todo el procesamiento ocurre dentro de Polars)
+    with stage("collect"):
+        mentioned_max = lf_mentioned.collect()
 
     # Se crea lista de tuplas de salida
-    out = list(zip(mentioned_max["mentioned"], mentioned_max["count"]))
+    out = mentioned_max.rows()
     
     return out
 
 
 
-def q3_time_pandas(file_path: str) -> List[Tuple[str, int]]:
+@profiled
+def q3_time_pandas(file_path: str, n: int = 10, start_date: Optional[date] = None,
+                   end_date: Optional[date] = None, chunksize: Optional[int] = None, engine: str = "ujson",
+                   dtype_backend: Optional[str] = None) -> List[Tuple[str, int]]:
     """
-    Lee archivo JSON con tweets desde path y devuelve el top 10 histórico de usuarios (username)
+    Lee archivo JSON con tweets desde path y devuelve el top n (10 por defecto) histórico de usuarios (username)
     más influyentes en función del conteo de las menciones (@) que registra cada uno de ellos.
 
     Parameters
     ----------
     file_path : str
         Ruta del archivo JSON.
+    n : int
+        Cantidad de elementos del top.
+    start_date : datetime.date, optional
+        Si se indica, solo se consideran tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se consideran tweets hasta este día (incluido).
+    chunksize : int, optional
+        Si se indica, el JSON se lee por chunks de chunksize tweets, sumando los conteos de cada chunk
+        (la memoria queda acotada a un chunk y los conteos). Por defecto se lee completo.
+    engine : str
+        Motor de lectura del JSON: "ujson" (por defecto) o "pyarrow".
+    dtype_backend : str, optional
+        Backend de tipos del JSON leído: "numpy_nullable" o "pyarrow". Por defecto los tipos numpy.
 
     Returns
     -------
@@ -65,8 +102,58 @@ def q3_time_pandas(file_path: str) -> List[Tuple[str, int]]:
         en orden descendente según cantidad de menciones.
     """
 
-    # Carga de datos del JSON en Dataframe de Pandas
-    df = pd.read_json(file_path, lines=True)
+    import pandas as pd
+    from pandas_reader import CountMerger, iter_json_frames
+
+    check_n(n)
+    start_date, end_date = date_window(start_date, end_date)
+
+    cache_path = fresh_cache(file_path)
+    if cache_path is not None:
+        # Carga de lista de usernames mencionados de cada tweet desde el cache columnar
+        with stage("read_parquet"):
+            df_mentioned = pd.read_parquet(cache_path, columns=["mentioned"],
+                                           filters=parquet_filters(start_date, end_date))["mentioned"]
+        # Eliminar nulos
+        mentioned_lists = [df_mentioned.dropna()]
+    else:
+        # Carga de datos del JSON en Dataframes de Pandas (uno solo, o uno por chunk)
+        mentioned_lists = (_mentioned_usernames(df, start_date, end_date)
+                           for df in iter_json_frames(file_path, chunksize, engine, dtype_backend))
+
+    # Conteo de menciones de cada username, sumando los conteos de cada chunk
+    merger = CountMerger()
+    for df_mentioned in mentioned_lists:
+        # "Abrir" cada fila, creando una fila nueva por cada username mencionado en la lista, y contar apariciones
+        with stage("count"):
+            merger.add(df_mentioned.explode().value_counts())
+    with stage("count"):
+        mentioned_counts = merger.result()
+
+    if mentioned_counts is None:
+        return []
+
+    # Ordenar por apariciones de cada username y extraer los n mayores
+    mentioned_max = mentioned_counts.sort_values(ascending=False)[0:n]
+
+    # Ordenar serie de pandas como lista de tuplas
+    out = list(zip(mentioned_max, mentioned_max.index))
+
+    return out
+
+
+def _mentioned_usernames(df: "pd.DataFrame", start_date: Optional[date], end_date: Optional[date]) -> "pd.Series":
+    """
+    Aplica la ventana de fechas a los tweets leídos desde el JSON y extrae la lista de usernames mencionados
+    de cada uno.
+    """
+
+    import pandas as pd
+
+    # Filtro de la ventana de fechas
+    if start_date is not None or end_date is not None:
+        days = pd.to_datetime(df["date"]).dt.date
+        df = df[days.between(start_date or date.min, end_date or date.max)]
 
     # Extracción de columna "mentionedUsers"
     df_mentioned = df['mentionedUsers']
@@ -74,17 +161,8 @@ def q3_time_pandas(file_path: str) -> List[Tuple[str, int]]:
     df_mentioned = df_mentioned.dropna()
 
     # Aplicación de función para extraer usernames
-    df_mentioned = df_mentioned.apply(get_usernames_list)
-    # "Abrir" cada fila, creando una fila nueva por cada username mencionado en la lista
-    df_mentioned = df_mentioned.explode()
-
-    # Contar y ordenar por apariciones de cada username y extraer los 10 mayores
-    mentioned_max = df_mentioned.value_counts()[0:10]
-
-    # Ordenar serie de pandas como lista de tuplas
-    out = list(zip(mentioned_max, mentioned_max.index))
-
-    return out
+    with stage("parse"):
+        return df_mentioned.apply(get_usernames_list)
 
 
 
@@ -109,26 +187,3 @@ def get_usernames_list(users_list: List[Dict[str, str]]) -> List[str]:
         return [user["username"] for user in users_list]
     # Si es None devolver lista vacia
     return []
-
-    
-def extract_usernames(batch: pl.DataFrame) -> pl.Series:
-    """
-    Extrae la key "username" de cada elemento de un Dataframe.
-
-    Parameters
-    ----------
-    batch : pl.DataFrame
-        Dataframe con listas de "users" (diccionario) en cada elemento.
-
-    Returns
-    -------
-    pl.Series
-        Serie de Polars con lista de "username" en cada elemento.
-    """
-
-    # Se aplica función "get_usernames_list" a cada item dentro del batch
-    usernames_lists = [get_usernames_list(x) for x in batch]
-    # Se devuelve la lista como una serie de Polars 
-    return pl.Series(usernames_lists)
-
-
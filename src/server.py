@@ -0,0 +1,343 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from datetime import date
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import asyncio
+import json
+import os
+import time
+import polars as pl
+from tweet_cache import scan_projected
+from window import check_n
+
+# Máximo de elementos que se pueden pedir en un top
+MAX_N = 1000
+
+_EPOCH = date(1970, 1, 1)
+
+
+class _Snapshot(NamedTuple):
+    """
+    Estructuras de una carga de TweetStore (ver TweetStore). No se modifican después de crearse: una recarga crea
+    un snapshot nuevo, por lo que una consulta que lee el snapshot una vez ve siempre una carga completa.
+    """
+
+    tweets: pl.DataFrame
+    # Representación física de tweets["date"] (días desde 1970-01-01), para la búsqueda binaria
+    days: pl.Series
+    emojis: pl.DataFrame
+    mentions: pl.DataFrame
+    user_rows: pl.Series
+    user_index: Dict[str, Tuple[int, int]]
+    signature: Tuple[int, int, int]
+
+    def date_range(self, start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+        """
+        Rango de filas [inicio, fin) de los tweets entre start_date y end_date (ambas incluidas).
+        """
+
+        days = self.days
+        start = 0 if start_date is None else days.search_sorted((start_date - _EPOCH).days, side="left")
+        end = len(days) if end_date is None else days.search_sorted((end_date - _EPOCH).days, side="right")
+        return start, max(start, end)
+
+    def rows_of(self, username: str, start: int, end: int) -> pl.Series:
+        """
+        Filas de los tweets del username dentro del rango de filas [start, end).
+        """
+
+        first, last = self.user_index.get(username, (0, 0))
+        rows = self.user_rows.slice(first, last - first)
+        # Las filas de cada username están ordenadas, por lo que el rango se obtiene con búsqueda binaria
+        first = rows.search_sorted(start, side="left")
+        return rows.slice(first, rows.search_sorted(end, side="left") - first)
+
+
+def _explode(df: pl.DataFrame, column: str, alias: str) -> pl.DataFrame:
+    """
+    Abre una columna de listas a una fila por elemento, con la fila del tweet ("row") y la posición del elemento
+    en el orden del archivo ("order", para desempatar como Counter.most_common), ordenado por fila.
+    """
+
+    # "position": índice en el orden por fila (conserva el orden de los elementos dentro de cada tweet)
+    return (df.select("row", "source_row", pl.col(column).alias(alias))
+              .explode(alias).drop_nulls()
+              .with_row_index("position")
+              .sort(["source_row", "position"])
+              .with_row_index("order")
+              .sort("position")
+              .select("row", "order", pl.col(alias).cast(pl.Categorical)))
+
+
+class TweetStore:
+    """
+    Tweets cargados una vez en memoria en estructuras columnares compactas, con índices por fecha y por username.
+
+    - tweets: columnas "row", "date" y "username" (categórica), ordenadas por fecha. Un rango de fechas
+      corresponde a un rango contiguo de filas, que se obtiene con búsqueda binaria.
+    - emojis y mentions: una fila por emoji / username mencionado con la fila del tweet ("row") y su posición en
+      el orden del archivo ("order"), ordenadas por fila, por lo que un rango de filas de tweets también es un
+      rango contiguo en ellas.
+    - user_rows: filas de tweets ordenadas por username (y fila), con user_index: username -> (inicio, fin)
+      dentro de user_rows.
+
+    Las estructuras forman un snapshot inmutable que se reemplaza completo (una sola asignación) al recargar,
+    y cada consulta lee el snapshot una sola vez, por lo que una recarga en otro thread no la afecta.
+    Se recarga si el archivo fuente cambia (tamaño, fecha de modificación o inodo).
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.snapshot: Optional[_Snapshot] = None
+        self.load()
+
+    def _source_signature(self) -> Tuple[int, int, int]:
+        stat = os.stat(self.file_path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def is_stale(self) -> bool:
+        """
+        Indica si el archivo fuente cambió desde la última carga.
+        """
+
+        snapshot = self.snapshot
+        return snapshot is None or self._source_signature() != snapshot.signature
+
+    def load(self):
+        """
+        Carga (o recarga) los tweets desde el archivo fuente, usando el cache columnar si está vigente.
+        """
+
+        signature = self._source_signature()
+        df = scan_projected(self.file_path, ["date", "username", "mentioned", "emojis"]).collect()
+
+        # Orden por fecha, conservando el orden del archivo dentro de cada día
+        df = (df.with_row_index("source_row")
+                .sort(["date", "source_row"])
+                .with_row_index("row"))
+
+        # Listas de emojis y menciones "abiertas" a una fila por elemento, con la fila del tweet
+        emojis = _explode(df, "emojis", "emoji")
+        mentions = _explode(df, "mentioned", "mentioned")
+        tweets = df.select("row", "date", pl.col("username").cast(pl.Categorical))
+
+        # Índice por username: filas de tweets agrupadas por username y rango de cada username
+        by_user = df.select("row", "username").sort(["username", "row"])
+        user_index = {}
+        start = 0
+        for username, count in (by_user.group_by("username", maintain_order=True)
+                                       .agg(pl.len().alias("count")).iter_rows()):
+            user_index[username] = (start, start + count)
+            start += count
+
+        # Reemplazo de todas las estructuras a la vez (una asignación de referencia)
+        self.snapshot = _Snapshot(tweets=tweets, days=tweets.get_column("date").to_physical(), emojis=emojis,
+                                  mentions=mentions, user_rows=by_user.get_column("row"), user_index=user_index,
+                                  signature=signature)
+
+    @staticmethod
+    def _select(frame: pl.DataFrame, start: int, end: int, rows: Optional[pl.Series]) -> pl.DataFrame:
+        """
+        Filas de un frame ordenado por "row" que pertenecen al rango [start, end) y, si se indica, a rows.
+        """
+
+        row_column = frame.get_column("row")
+        first = row_column.search_sorted(start, side="left")
+        last = row_column.search_sorted(end, side="left")
+        frame = frame.slice(first, last - first)
+        if rows is not None:
+            frame = frame.filter(pl.col("row").is_in(rows))
+        return frame
+
+    def q1(self, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+           username: Optional[str] = None) -> List[Tuple[date, str]]:
+        """
+        Top n fechas con más tweets y el usuario con más tweets en cada una. Los empates se resuelven como en
+        q1_time: la fecha más antigua primero y el menor username en orden alfabético.
+        """
+
+        check_n(n)
+        snapshot = self.snapshot
+        start, end = snapshot.date_range(start_date, end_date)
+        rows = None if username is None else snapshot.rows_of(username, start, end)
+        tweets = self._select(snapshot.tweets, start, end, rows)
+
+        # Días con más tweets
+        days = (tweets.group_by("date").agg(pl.len().alias("count"))
+                      .sort(["count", "date"], descending=[True, False]).head(n))
+        # Usuario con más tweets en cada uno de esos días
+        users = (tweets.filter(pl.col("date").is_in(days.get_column("date")))
+                       .group_by("date", "username").agg(pl.len().alias("count"))
+                       .with_columns(pl.col("username").cast(pl.Utf8))
+                       .sort(["count", "username"], descending=[True, False])
+                       .group_by("date", maintain_order=True).first())
+
+        return days.join(users.select("date", "username"), on="date", how="left").select("date", "username").rows()
+
+    def _top_items(self, frame_name: str, column: str, n: int, start_date: Optional[date],
+                   end_date: Optional[date], username: Optional[str]) -> List[Tuple[str, int]]:
+        """
+        Top n valores de una columna de emojis o menciones dentro del filtro de fechas y username.
+        Los empates se resuelven como Counter.most_common en q2_memory y q3_memory: primero el valor que
+        aparece antes en el archivo.
+        """
+
+        check_n(n)
+        snapshot = self.snapshot
+        start, end = snapshot.date_range(start_date, end_date)
+        rows = None if username is None else snapshot.rows_of(username, start, end)
+        return (self._select(getattr(snapshot, frame_name), start, end, rows)
+                    .group_by(column).agg(pl.len().alias("count"), pl.col("order").min())
+                    .sort(["count", "order"], descending=[True, False])
+                    .head(n)
+                    .select(pl.col(column).cast(pl.Utf8), "count").rows())
+
+    def q2(self, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+           username: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Top n emojis más usados con su conteo (en tweets del username si se indica).
+        """
+
+        return self._top_items("emojis", "emoji", n, start_date, end_date, username)
+
+    def q3(self, n: int = 10, start_date: Optional[date] = None, end_date: Optional[date] = None,
+           username: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Top n usernames más mencionados con su conteo (en tweets del username si se indica).
+        """
+
+        return self._top_items("mentions", "mentioned", n, start_date, end_date, username)
+
+
+def parse_query(query: str) -> Dict[str, object]:
+    """
+    Valida los parámetros de una consulta: n, start_date, end_date (YYYY-MM-DD) y username.
+
+    Parameters
+    ----------
+    query : str
+        Query string de la URL, ej. "n=5&start_date=2021-02-20&username=LATAM321".
+
+    Returns
+    -------
+    Dict[str, object]
+        Argumentos para TweetStore.q1, q2 y q3.
+    """
+
+    params = {key: values[-1] for key, values in parse_qs(query, keep_blank_values=True).items()}
+    unknown = set(params) - {"n", "start_date", "end_date", "username"}
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+
+    kwargs = {}
+    if "n" in params:
+        kwargs["n"] = check_n(int(params["n"]))
+        if kwargs["n"] > MAX_N:
+            raise ValueError(f"n debe estar entre 1 y {MAX_N}")
+    for key in ("start_date", "end_date"):
+        if key in params:
+            kwargs[key] = date.fromisoformat(params[key])
+    if "username" in params:
+        kwargs["username"] = params["username"]
+    return kwargs
+
+
+class QueryServer:
+    """
+    Servidor HTTP (asyncio) que responde q1, q2 y q3 desde un TweetStore en memoria.
+
+    Rutas (GET): /q1, /q2, /q3 con parámetros n, start_date, end_date y username, y /health.
+    Las respuestas son JSON: {"result": [...], "elapsed_ms": ...}.
+    """
+
+    def __init__(self, file_path: str):
+        self.store = TweetStore(file_path)
+        self._reload_lock = asyncio.Lock()
+
+    async def _fresh_store(self) -> TweetStore:
+        """
+        Recarga el dataset si el archivo fuente cambió. Solo una recarga a la vez, fuera del event loop.
+        """
+
+        if self.store.is_stale():
+            async with self._reload_lock:
+                if self.store.is_stale():
+                    await asyncio.to_thread(self.store.load)
+        return self.store
+
+    async def handle_request(self, method: str, target: str) -> Tuple[int, dict]:
+        """
+        Resuelve una petición y entrega el código de estado HTTP y el cuerpo JSON.
+        """
+
+        if method != "GET":
+            return 405, {"error": "Solo se acepta GET"}
+        url = urlsplit(target)
+        if url.path not in ("/q1", "/q2", "/q3", "/health"):
+            return 404, {"error": f"Ruta desconocida: {url.path}"}
+        store = await self._fresh_store()
+        if url.path == "/health":
+            return 200, {"status": "ok", "tweets": len(store.snapshot.tweets)}
+
+        try:
+            kwargs = parse_query(url.query)
+        except ValueError as error:
+            return 400, {"error": str(error)}
+
+        start = time.perf_counter()
+        result = await asyncio.to_thread(getattr(store, url.path[1:]), **kwargs)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result = [[value.isoformat() if isinstance(value, date) else value for value in row] for row in result]
+        return 200, {"result": result, "elapsed_ms": round(elapsed_ms, 3)}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Atiende una conexión HTTP/1.1 (una petición por conexión).
+        """
+
+        try:
+            request_line = await reader.readline()
+            # Se descartan los headers (las peticiones GET no tienen cuerpo)
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                status, body = 400, {"error": "Petición inválida"}
+            else:
+                status, body = await self.handle_request(parts[0], parts[1])
+        except Exception as error:
+            status, body = 500, {"error": repr(error)}
+
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Servidor de consultas q1, q2 y q3 con el dataset en memoria.")
+    parser.add_argument("file_path", help="Ruta del archivo JSON con tweets")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    server = QueryServer(args.file_path)
+    print(f"{len(server.store.snapshot.tweets)} tweets cargados, escuchando en http://{args.host}:{args.port}")
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+from typing import Callable, Hashable, Iterable, List, NamedTuple, Tuple
+from collections import Counter
+import heapq
+
+
+class ApproximateTop(NamedTuple):
+    """
+    Resultado de approximate_top_k.
+
+    Attributes
+    ----------
+    top : List[Tuple[Hashable, int, int]]
+        Tuplas (elemento, conteo, error máximo) en orden descendente según conteo. El conteo real de cada
+        elemento está en [conteo - error, conteo] (error 0 si el conteo es exacto).
+    guaranteed : bool
+        True si top es el top n real: ningún elemento fuera de top puede tener más apariciones que el último
+        de top, y todos los conteos son exactos.
+    bound : int
+        Cota superior del conteo de cualquier elemento no monitoreado por el sketch (0 si se monitorearon todos).
+    """
+
+    top: List[Tuple[Hashable, int, int]]
+    guaranteed: bool
+    bound: int
+
+
+class SpaceSaving:
+    """
+    Sketch Space-Saving para encontrar los elementos más frecuentes de un flujo con memoria acotada.
+
+    Mantiene como máximo `capacity` contadores. Cada contador guarda una cota superior del conteo real (count)
+    y su error máximo (error), por lo que el conteo real está en [count - error, count].
+    Todo elemento con conteo real mayor a total / capacity está garantizado dentro de los contadores.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        # Cantidad máxima de contadores (presupuesto de memoria)
+        self.capacity = capacity
+        # Diccionario de elemento monitoreado a [count, error]
+        self.counters = {}
+        # Heap de (count, elemento) para encontrar el contador mínimo; puede tener entradas obsoletas
+        self._heap = []
+        # Total de elementos procesados
+        self.total = 0
+
+    def update(self, item: Hashable):
+        self.total += 1
+        counter = self.counters.get(item)
+        if counter is not None:
+            # Elemento ya monitoreado: se incrementa su contador
+            counter[0] += 1
+        elif len(self.counters) < self.capacity:
+            # Queda espacio: se agrega un contador nuevo sin error
+            counter = self.counters[item] = [1, 0]
+        else:
+            # Sin espacio: se reemplaza el contador mínimo, heredando su conteo como error
+            min_count, min_item = self._pop_min()
+            del self.counters[min_item]
+            counter = self.counters[item] = [min_count + 1, min_count]
+        heapq.heappush(self._heap, (counter[0], item))
+        # Reconstrucción del heap cuando acumula demasiadas entradas obsoletas
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, (count, _) in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, Hashable]:
+        # Se descartan entradas obsoletas (cuyo conteo ya no corresponde al contador actual)
+        while True:
+            count, item = heapq.heappop(self._heap)
+            counter = self.counters.get(item)
+            if counter is not None and counter[0] == count:
+                return count, item
+
+    def update_many(self, items: Iterable[Hashable]):
+        for item in items:
+            self.update(item)
+
+    @property
+    def min_count(self) -> int:
+        """
+        Cota superior del conteo de cualquier elemento no monitoreado.
+        """
+
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def top(self, n: int = 10) -> List[Tuple[Hashable, int, int]]:
+        """
+        Entrega los n elementos con mayor conteo estimado.
+
+        Returns
+        -------
+        List[Tuple[Hashable, int, int]]
+            Lista de tuplas (elemento, conteo estimado, error máximo), en orden descendente según conteo.
+        """
+
+        ranked = sorted(self.counters.items(), key=lambda entry: entry[1][0], reverse=True)[:n]
+        return [(item, count, error) for item, (count, error) in ranked]
+
+    def candidates(self, n: int = 10) -> List[Hashable]:
+        """
+        Elementos que pueden pertenecer al top n real: aquellos cuya cota superior es al menos
+        la n-ésima mayor cota inferior.
+        """
+
+        lower_bounds = sorted((count - error for count, error in self.counters.values()), reverse=True)
+        threshold = lower_bounds[n - 1] if len(lower_bounds) >= n else 0
+        return [item for item, (count, _) in self.counters.items() if count >= threshold]
+
+
+def approximate_top_k(read_stream: Callable[[], Iterable[Iterable[Hashable]]], n: int = 10,
+                      capacity: int = 1000, verify: bool = True) -> ApproximateTop:
+    """
+    Top n de elementos más frecuentes de un flujo con memoria acotada por `capacity` contadores.
+
+    Parameters
+    ----------
+    read_stream : Callable[[], Iterable[Iterable[Hashable]]]
+        Función que entrega un iterable nuevo con los elementos de cada registro (ej. emojis de cada tweet).
+        Se llama una vez por pasada.
+    n : int
+        Cantidad de elementos en el top.
+    capacity : int
+        Cantidad máxima de contadores del sketch (al menos n).
+    verify : bool
+        Si es True se hace una segunda pasada contando exactamente solo los candidatos del sketch,
+        entregando conteos exactos (error 0). Si es False se entregan los conteos estimados del sketch
+        (cotas superiores) con su error máximo (ver SpaceSaving.top).
+
+    Returns
+    -------
+    ApproximateTop
+        Top n con el error máximo de cada conteo, y si el resultado está garantizado como el top n real
+        (si no, aumentar capacity).
+    """
+
+    if capacity < n:
+        raise ValueError(f"capacity debe ser mayor o igual a n ({n}), no {capacity}")
+
+    # Primera pasada: sketch Space-Saving
+    sketch = SpaceSaving(capacity)
+    for items in read_stream():
+        sketch.update_many(items)
+
+    # Cualquier elemento fuera de los contadores tiene conteo real a lo más min_count
+    bound = sketch.min_count
+
+    if not verify:
+        top = sketch.top(n)
+        # Los contadores fuera del top tienen conteos estimados menores o iguales al último del top, por lo
+        # que el resultado es exacto si no hay error en el top y el último conteo es al menos la cota
+        guaranteed = all(error == 0 for _, _, error in top) and (bound == 0 or top[-1][1] >= bound)
+        return ApproximateTop(top, guaranteed, bound)
+
+    # Segunda pasada: conteo exacto solo de los candidatos (a lo más `capacity` contadores)
+    candidates = Counter({item: 0 for item in sketch.candidates(n)})
+    for items in read_stream():
+        for item in items:
+            if item in candidates:
+                candidates[item] += 1
+
+    out = candidates.most_common(n)
+
+    # Los conteos verificados son exactos. El top es el real si el n-ésimo conteo es al menos la cota
+    guaranteed = bound == 0 or (len(out) == n and out[-1][1] >= bound)
+    return ApproximateTop([(item, item_count, 0) for item, item_count in out], guaranteed, bound)
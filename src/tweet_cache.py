@@ -0,0 +1,221 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
+from datetime import date
+from functools import lru_cache
+import json
+import os
+from tweet_schema import SCHEMA_VERSION, scan_tweets
+from window import date_window
+from compression import file_fingerprint
+
+# Versión del formato del cache. Se debe incrementar al cambiar PROJECTED_COLUMNS (invalida caches anteriores).
+CACHE_VERSION = 3
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+@lru_cache(maxsize=None)
+def _projected_columns() -> Dict[str, "pl.Expr"]:
+    # Columnas proyectadas del cache y cómo se obtienen desde el JSON
+    import polars as pl
+    from emoji_regex import polars_emojis
+
+    return {
+        # Día del tweet como Date de Polars, desde el prefijo "YYYY-MM-DD"
+        "date": pl.col("date").str.slice(0, 10).str.to_date("%Y-%m-%d"),
+        # Hora del tweet (inicio de la hora) como Datetime de Polars, desde el prefijo "YYYY-MM-DDTHH:MM"
+        "hour": pl.col("date").str.slice(0, 16).str.to_datetime("%Y-%m-%dT%H:%M").dt.truncate("1h"),
+        # Username del autor (dentro de "user")
+        "username": pl.col("user").struct.field("username"),
+        # Texto del tweet
+        "content": pl.col("content"),
+        # Lista de usernames mencionados (nulo si no hay menciones)
+        "mentioned": pl.col("mentionedUsers").list.eval(pl.element().struct.field("username")),
+        # Lista de emojis del texto, con la expresión regular de emojis (y emoji.emoji_list en secuencias ZWJ
+        # que no están en la base de datos de emoji)
+        "emojis": polars_emojis(pl.col("content")),
+    }
+
+
+def __getattr__(name: str):
+    # PROJECTED_COLUMNS se construye al usarlo por primera vez, para que importar el módulo (ej. para fresh_cache
+    # desde las variantes pandas) no importe Polars ni construya la expresión regular de emojis
+    if name == "PROJECTED_COLUMNS":
+        return _projected_columns()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Columnas del JSON necesarias para cada columna proyectada
+_SOURCE_COLUMNS = {
+    "date": "date",
+    "hour": "date",
+    "username": "user",
+    "content": "content",
+    "mentioned": "mentionedUsers",
+    "emojis": "content",
+}
+
+
+def cache_paths(file_path: str) -> Tuple[str, str]:
+    """
+    Rutas del cache columnar de un archivo: el archivo parquet y su metadata (junto al archivo fuente).
+    """
+
+    return file_path + ".cache.parquet", file_path + ".cache.json"
+
+
+def source_key(file_path: str) -> Dict[str, object]:
+    """
+    Calcula la llave que identifica el contenido del archivo fuente.
+
+    Se usa la huella del archivo (ver compression.file_fingerprint) junto a la versión del esquema,
+    del cache y de la librería emoji, que afectan las columnas guardadas.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+
+    Returns
+    -------
+    Dict[str, object]
+        Diccionario con los datos que identifican al archivo fuente.
+    """
+
+    import emoji
+
+    return {
+        **file_fingerprint(file_path),
+        "schema_version": SCHEMA_VERSION,
+        "cache_version": CACHE_VERSION,
+        "emoji_version": emoji.__version__,
+    }
+
+
+def build_cache(file_path: str) -> str:
+    """
+    Convierte el archivo JSON de tweets a un cache columnar (parquet) con las columnas proyectadas:
+    date, hour, username, content, mentioned y emojis.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+
+    Returns
+    -------
+    str
+        Ruta del archivo parquet generado.
+    """
+
+    parquet_path, meta_path = cache_paths(file_path)
+    # La llave se calcula antes de leer, si el archivo cambia durante la conversión el cache queda obsoleto
+    key = source_key(file_path)
+
+    # Lectura del JSON con esquema proyectado y cálculo de columnas derivadas
+    df_tweets = scan_tweets(file_path, sorted(set(_SOURCE_COLUMNS.values()))).select(**_projected_columns()).collect()
+
+    # Escritura en archivos temporales y reemplazo atómico, para no dejar un cache a medio escribir
+    df_tweets.write_parquet(parquet_path + ".tmp")
+    os.replace(parquet_path + ".tmp", parquet_path)
+    with open(meta_path + ".tmp", "w") as file:
+        json.dump(key, file)
+    os.replace(meta_path + ".tmp", meta_path)
+
+    return parquet_path
+
+
+def fresh_cache(file_path: str) -> Optional[str]:
+    """
+    Entrega la ruta del cache columnar del archivo si existe y corresponde al contenido actual del archivo.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+
+    Returns
+    -------
+    Optional[str]
+        Ruta del archivo parquet, o None si no hay cache o está obsoleto.
+    """
+
+    parquet_path, meta_path = cache_paths(file_path)
+    if not (os.path.exists(parquet_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as file:
+            key = json.load(file)
+    except ValueError:
+        return None
+    if key != source_key(file_path):
+        return None
+    return parquet_path
+
+
+def parquet_filters(start_date: Optional[date] = None, end_date: Optional[date] = None) -> Optional[List[Tuple[str, str, date]]]:
+    """
+    Filtros de la ventana de fechas para leer el cache parquet con pandas (pd.read_parquet(filters=...)),
+    con los que pyarrow salta los row groups fuera de la ventana. None si la ventana no tiene extremos.
+    """
+
+    start_date, end_date = date_window(start_date, end_date)
+    filters = []
+    if start_date is not None:
+        filters.append(("date", ">=", start_date))
+    if end_date is not None:
+        filters.append(("date", "<=", end_date))
+    return filters or None
+
+
+def scan_projected(file_path: str, columns: List[str], start_date: Optional[date] = None,
+                   end_date: Optional[date] = None, **kwargs) -> "pl.LazyFrame":
+    """
+    Crea LazyFrame con columnas proyectadas de los tweets, leyendo desde el cache columnar si está vigente
+    o desde el JSON en caso contrario.
+
+    El filtro de fechas se aplica directamente sobre el scan, por lo que Polars lo empuja a la lectura
+    (en el cache parquet se saltan los row groups fuera de la ventana según sus estadísticas).
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+    columns : List[str]
+        Columnas proyectadas a leer, deben existir en PROJECTED_COLUMNS.
+    start_date : datetime.date, optional
+        Si se indica, solo se leen tweets desde este día (incluido).
+    end_date : datetime.date, optional
+        Si se indica, solo se leen tweets hasta este día (incluido).
+    **kwargs
+        Argumentos adicionales para pl.scan_ndjson (ej. low_memory) cuando se lee el JSON.
+
+    Returns
+    -------
+    pl.LazyFrame
+        LazyFrame con solo las columnas solicitadas.
+    """
+
+    import polars as pl
+
+    # Filtro de la ventana de fechas sobre la columna "date"
+    start_date, end_date = date_window(start_date, end_date)
+    predicate = None
+    if start_date is not None:
+        predicate = pl.col("date") >= start_date
+    if end_date is not None:
+        predicate = pl.col("date") <= end_date if predicate is None else predicate & (pl.col("date") <= end_date)
+    # "date" se lee aunque no se haya solicitado si se necesita para el filtro
+    scan_columns = list(columns) if predicate is None or "date" in columns else list(columns) + ["date"]
+
+    parquet_path = fresh_cache(file_path)
+    if parquet_path is not None:
+        lf_tweets = pl.scan_parquet(parquet_path).select(scan_columns)
+    else:
+        source_columns = sorted({_SOURCE_COLUMNS[column] for column in scan_columns})
+        lf_tweets = scan_tweets(file_path, source_columns, **kwargs).select(
+            **{column: _projected_columns()[column] for column in scan_columns})
+
+    if predicate is None:
+        return lf_tweets
+    return lf_tweets.filter(predicate).select(columns)
@@ -0,0 +1,178 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Iterable
+from functools import lru_cache
+import io
+import json
+import re
+from compression import open_input, compression_of, iter_chunks
+
+# Versión del esquema. Se debe incrementar al cambiar columnas o tipos de TWEET_SCHEMA.
+SCHEMA_VERSION = 1
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+@lru_cache(maxsize=None)
+def _tweet_schema() -> Dict[str, "pl.DataType"]:
+    # Esquema proyectado de los tweets: solo columnas (y campos dentro de structs) usadas por las funciones q*.
+    # Al entregar el esquema a scan_ndjson, Polars no infiere tipos ni materializa el resto del tweet
+    # (quotedTweet, media, datos completos de user, etc.).
+    import polars as pl
+
+    return {
+        "date": pl.Utf8,
+        "content": pl.Utf8,
+        "user": pl.Struct({"username": pl.Utf8}),
+        "mentionedUsers": pl.List(pl.Struct({"username": pl.Utf8})),
+    }
+
+
+def __getattr__(name: str):
+    # TWEET_SCHEMA se construye al usarlo por primera vez, para que importar el módulo no importe Polars
+    if name == "TWEET_SCHEMA":
+        return _tweet_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Formato esperado de "date", ej: "2021-02-24T09:23:35+00:00"
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T")
+
+
+def tweet_schema(columns: Iterable[str]) -> Dict[str, "pl.DataType"]:
+    """
+    Entrega el esquema proyectado para las columnas solicitadas.
+
+    Parameters
+    ----------
+    columns : Iterable[str]
+        Columnas a leer, deben existir en TWEET_SCHEMA.
+
+    Returns
+    -------
+    Dict[str, pl.DataType]
+        Esquema con solo las columnas solicitadas.
+    """
+
+    schema = _tweet_schema()
+    return {column: schema[column] for column in columns}
+
+
+def scan_tweets(file_path: str, columns: Iterable[str], **kwargs) -> "pl.LazyFrame":
+    """
+    Crea LazyFrame para leer el JSON declarando solo las columnas necesarias.
+
+    Los archivos comprimidos (.gz, .bz2, .zst) se descomprimen en streaming por bloques, leyendo cada bloque
+    con el esquema proyectado, por lo que en memoria solo quedan las columnas solicitadas.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON (puede estar comprimido en .gz, .bz2 o .zst).
+    columns : Iterable[str]
+        Columnas a leer, deben existir en TWEET_SCHEMA.
+    **kwargs
+        Argumentos adicionales para pl.scan_ndjson (ej. low_memory), solo para archivos sin comprimir.
+
+    Returns
+    -------
+    pl.LazyFrame
+        LazyFrame con solo las columnas solicitadas.
+    """
+
+    import polars as pl
+
+    schema = tweet_schema(columns)
+
+    if compression_of(file_path) is not None:
+        # Lectura de cada bloque descomprimido con el esquema proyectado
+        frames = [pl.read_ndjson(io.BytesIO(chunk), schema=schema) for chunk in iter_chunks(file_path)]
+        if not frames:
+            return pl.LazyFrame(schema=schema)
+        return pl.concat(frames).lazy()
+
+    return pl.scan_ndjson(file_path, schema=schema, **kwargs)
+
+
+def _check_username(value, field: str) -> Optional[str]:
+    """
+    Valida que un valor sea un user (diccionario) con "username" de tipo str.
+    """
+
+    if not isinstance(value, dict):
+        return f'"{field}" no es un objeto'
+    if not isinstance(value.get("username"), str):
+        return f'"{field}.username" no es str'
+    return None
+
+
+def _check_column(tweet: dict, column: str) -> Optional[str]:
+    """
+    Valida una columna de un tweet contra TWEET_SCHEMA. Devuelve None si es válida o el motivo del error.
+    """
+
+    value = tweet.get(column)
+    if column == "date":
+        if not isinstance(value, str) or not _DATE_PATTERN.match(value):
+            return '"date" no tiene formato "YYYY-MM-DDT..."'
+    elif column == "content":
+        if not isinstance(value, str):
+            return '"content" no es str'
+    elif column == "user":
+        return _check_username(value, "user")
+    elif column == "mentionedUsers":
+        # Tweets sin menciones tienen valor null
+        if value is None:
+            return None
+        if not isinstance(value, list):
+            return '"mentionedUsers" no es una lista'
+        for user in value:
+            error = _check_username(user, "mentionedUsers[]")
+            if error is not None:
+                return error
+    return None
+
+
+def validate_file(file_path: str, columns: Optional[Iterable[str]] = None,
+                  max_errors: Optional[int] = None) -> List[Tuple[int, str]]:
+    """
+    Modo de validación: revisa linea a linea que los tweets calcen con el esquema proyectado.
+
+    Parameters
+    ----------
+    file_path : str
+        Ruta del archivo JSON.
+    columns : Iterable[str], optional
+        Columnas a validar. Por defecto todas las de TWEET_SCHEMA.
+    max_errors : int, optional
+        Cantidad máxima de errores a reportar. Por defecto se reportan todos.
+
+    Returns
+    -------
+    List[Tuple[int, str]]
+        Lista de tuplas con el número de linea (desde 1) y el motivo por el que no calza con el esquema.
+    """
+
+    columns = list(_tweet_schema() if columns is None else columns)
+    errors = []
+
+    with open_input(file_path) as file:
+        for line_number, line in enumerate(file, start=1):
+            # Lectura del tweet
+            try:
+                tweet = json.loads(line)
+            except ValueError as error:
+                errors.append((line_number, f"JSON inválido: {error}"))
+            else:
+                if not isinstance(tweet, dict):
+                    errors.append((line_number, "la linea no es un objeto JSON"))
+                else:
+                    # Se reporta el primer error encontrado en la linea
+                    for column in columns:
+                        error = _check_column(tweet, column)
+                        if error is not None:
+                            errors.append((line_number, error))
+                            break
+            if max_errors is not None and len(errors) >= max_errors:
+                break
+
+    return errors
@@ -0,0 +1,104 @@
+from typing import Optional, Tuple, Union
+from datetime import date, datetime, timedelta
+import numbers
+
+# Granularidades de agrupación del tiempo para q1
+GRANULARITIES = ("hour", "day", "week")
+
+# Largo del prefijo de "date" necesario para cada granularidad: "YYYY-MM-DDTHH" o "YYYY-MM-DD"
+PREFIX_LENGTHS = {"hour": 13, "day": 10, "week": 10}
+
+
+def check_granularity(granularity: str) -> str:
+    """
+    Valida la granularidad de agrupación del tiempo.
+    """
+
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity debe ser uno de {GRANULARITIES}, no {granularity!r}")
+    return granularity
+
+
+def check_n(n: int) -> int:
+    """
+    Valida la cantidad de elementos de un top (entero mayor o igual a 1).
+    """
+
+    if isinstance(n, bool) or not isinstance(n, numbers.Integral):
+        raise TypeError(f"n debe ser un entero, no {type(n).__name__}")
+    if n < 1:
+        raise ValueError(f"n debe ser mayor o igual a 1, no {n}")
+    return int(n)
+
+
+def _to_date(value: Union[date, str, None], name: str) -> Optional[date]:
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    raise TypeError(f"{name} debe ser datetime.date o str 'YYYY-MM-DD'")
+
+
+def date_window(start_date: Union[date, str, None] = None,
+                end_date: Union[date, str, None] = None) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Valida y normaliza una ventana de fechas (ambos extremos incluidos, cualquiera puede ser None).
+
+    Parameters
+    ----------
+    start_date : datetime.date o str, optional
+        Primer día de la ventana. Se aceptan strings "YYYY-MM-DD".
+    end_date : datetime.date o str, optional
+        Último día de la ventana. Se aceptan strings "YYYY-MM-DD".
+
+    Returns
+    -------
+    Tuple[Optional[datetime.date], Optional[datetime.date]]
+        Extremos de la ventana como datetime.date.
+    """
+
+    start_date = _to_date(start_date, "start_date")
+    end_date = _to_date(end_date, "end_date")
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise ValueError("start_date no puede ser posterior a end_date")
+    return start_date, end_date
+
+
+def prefix_window(start_date: Optional[date], end_date: Optional[date]) -> Optional[Tuple[str, str]]:
+    """
+    Ventana de fechas como strings "YYYY-MM-DD", comparables directamente con el prefijo de "date" de cada
+    linea (el orden lexicográfico coincide con el cronológico). None si la ventana no tiene extremos.
+    """
+
+    if start_date is None and end_date is None:
+        return None
+    # "" es menor y "~" mayor que cualquier fecha "YYYY-MM-DD"
+    return ("" if start_date is None else start_date.isoformat(),
+            "~" if end_date is None else end_date.isoformat())
+
+
+def bucket_from_prefix(prefix: str, granularity: str) -> Union[date, datetime]:
+    """
+    Convierte el prefijo de "date" de un tweet a su intervalo de tiempo según la granularidad.
+
+    Parameters
+    ----------
+    prefix : str
+        "YYYY-MM-DDTHH" para granularidad "hour", "YYYY-MM-DD" para "day" y "week".
+    granularity : str
+        "hour", "day" o "week".
+
+    Returns
+    -------
+    datetime.date o datetime.datetime
+        Inicio de la hora (datetime), el día (date) o el lunes de la semana (date).
+    """
+
+    if granularity == "hour":
+        return datetime.strptime(prefix, "%Y-%m-%dT%H")
+    day = datetime.strptime(prefix, "%Y-%m-%d").date()
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Los módulos del proyecto están en src y se importan por nombre (ej. "import emoji_regex"), igual que al
+# ejecutarlos desde esa carpeta
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
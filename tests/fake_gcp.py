@@ -0,0 +1,203 @@
+"""
+Reemplazos en memoria de los clientes de Cloud Storage y BigQuery usados por gcp.py, con la misma interfaz
+(solo los métodos que usa gcp.py), para probar la carga y las queries sin Google Cloud.
+"""
+from typing import Callable, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+import threading
+import time
+
+
+class FakeBlob:
+    """
+    Objeto de un FakeBucket. upload_from_filename guarda el contenido del archivo en el bucket.
+    """
+
+    def __init__(self, bucket: "FakeBucket", name: str, chunk_size: Optional[int] = None):
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = chunk_size
+
+    def upload_from_filename(self, filename: str, content_type: Optional[str] = None, retry=None):
+        self.bucket._upload(self, filename)
+
+
+class FakeBucket:
+    """
+    Bucket en memoria que registra las subidas en curso (para verificar la concurrencia).
+
+    Parameters
+    ----------
+    name : str
+        Nombre del bucket.
+    upload_delay : float
+        Segundos que tarda cada subida.
+    fail : Callable[[str], bool], optional
+        Función que indica si la subida de un objeto (según su nombre) falla con ConnectionError.
+    on_upload : Callable[[str], None], optional
+        Función llamada con la ruta local de cada archivo al comenzar su subida.
+    """
+
+    def __init__(self, name: str, upload_delay: float = 0.0, fail: Optional[Callable[[str], bool]] = None,
+                 on_upload: Optional[Callable[[str], None]] = None):
+        self.name = name
+        self.upload_delay = upload_delay
+        self.fail = fail
+        self.on_upload = on_upload
+        # Contenido de los objetos subidos: nombre -> bytes
+        self.objects: Dict[str, bytes] = {}
+        # Nombres de los objetos cuya subida comenzó, en orden
+        self.started: List[str] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def blob(self, name: str, chunk_size: Optional[int] = None) -> FakeBlob:
+        return FakeBlob(self, name, chunk_size)
+
+    def _upload(self, blob: FakeBlob, filename: str):
+        with self._lock:
+            self.started.append(blob.name)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.on_upload is not None:
+                self.on_upload(filename)
+            time.sleep(self.upload_delay)
+            if self.fail is not None and self.fail(blob.name):
+                raise ConnectionError(f"subida fallida: {blob.name}")
+            with open(filename, "rb") as file:
+                data = file.read()
+            with self._lock:
+                self.objects[blob.name] = data
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeStorageClient:
+    """
+    Cliente de Cloud Storage en memoria. Los buckets se crean al pedirlos con las opciones del cliente.
+    """
+
+    def __init__(self, **bucket_options):
+        self.bucket_options = bucket_options
+        self.buckets: Dict[str, FakeBucket] = {}
+
+    def bucket(self, name: str) -> FakeBucket:
+        if name not in self.buckets:
+            self.buckets[name] = FakeBucket(name, **self.bucket_options)
+        return self.buckets[name]
+
+
+class FakeLoadJob:
+    """
+    Load job terminado, con la cantidad de filas cargadas.
+    """
+
+    def __init__(self, uris: List[str], table_id: str, job_config, output_rows: int):
+        self.uris = uris
+        self.table_id = table_id
+        self.job_config = job_config
+        self.output_rows = output_rows
+
+    def result(self) -> "FakeLoadJob":
+        return self
+
+
+class FakeField:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeTable:
+    """
+    Metadatos de una tabla: fecha de última modificación y nombres de sus columnas.
+    """
+
+    def __init__(self, table_id: str, modified: datetime, columns: List[str]):
+        self.table_id = table_id
+        self.modified = modified
+        self.schema = [FakeField(name) for name in columns]
+
+
+class FakeQueryJob:
+    """
+    Query terminada: result entrega las filas (diccionarios, con values() como las filas de BigQuery).
+    """
+
+    def __init__(self, rows: List[dict]):
+        self.rows = rows
+
+    def result(self) -> List[dict]:
+        return self.rows
+
+
+class FakeBigQueryClient:
+    """
+    Cliente de BigQuery en memoria.
+
+    load_table_from_uri lee los objetos JSON (comprimidos con gzip o no) de los buckets de storage_client
+    y guarda sus filas en tables. query no ejecuta SQL: registra la query con sus parámetros en queries
+    y entrega las filas de query_handler(query, parámetros) (por defecto ninguna).
+
+    Parameters
+    ----------
+    storage_client : FakeStorageClient, optional
+        Cliente con los buckets leídos por load_table_from_uri.
+    query_handler : Callable[[str, dict], List[dict]], optional
+        Función que entrega las filas de una query según su texto y sus parámetros (nombre -> valor).
+    """
+
+    def __init__(self, storage_client: Optional[FakeStorageClient] = None,
+                 query_handler: Optional[Callable[[str, dict], List[dict]]] = None):
+        self.storage_client = storage_client
+        self.query_handler = query_handler
+        # Filas de cada tabla: "proyecto.dataset.tabla" -> lista de diccionarios
+        self.tables: Dict[str, List[dict]] = {}
+        # Metadatos de cada tabla
+        self.metadata: Dict[str, FakeTable] = {}
+        self.load_jobs: List[FakeLoadJob] = []
+        # Queries ejecutadas: (query, job_config)
+        self.queries: List[tuple] = []
+
+    def create_table(self, table_id: str, columns: List[str], rows: Optional[List[dict]] = None):
+        """
+        Crea (o reemplaza) una tabla con las columnas indicadas.
+        """
+
+        self.tables[table_id] = list(rows or [])
+        self.metadata[table_id] = FakeTable(table_id, datetime(2021, 1, 1, tzinfo=timezone.utc), columns)
+
+    def touch(self, table_id: str):
+        """
+        Marca una tabla como modificada (como al cargar o insertar filas).
+        """
+
+        self.metadata[table_id].modified += timedelta(seconds=1)
+
+    def get_table(self, table_id: str) -> FakeTable:
+        return self.metadata[table_id]
+
+    def query(self, query: str, job_config=None) -> FakeQueryJob:
+        self.queries.append((query, job_config))
+        parameters = {parameter.name: parameter.value for parameter in getattr(job_config, "query_parameters", [])}
+        return FakeQueryJob(self.query_handler(query, parameters) if self.query_handler is not None else [])
+
+    def _read_object(self, uri: str) -> bytes:
+        bucket_name, _, name = uri[len("gs://"):].partition("/")
+        data = self.storage_client.buckets[bucket_name].objects[name]
+        return gzip.decompress(data) if data[:2] == b"\x1f\x8b" else data
+
+    def load_table_from_uri(self, uris: List[str], table_id: str, job_config=None) -> FakeLoadJob:
+        rows = [json.loads(line) for uri in uris for line in self._read_object(uri).splitlines() if line.strip()]
+        if job_config is None or job_config.write_disposition != "WRITE_APPEND" or table_id not in self.tables:
+            columns = [field.name for field in getattr(job_config, "schema", None) or []]
+            self.create_table(table_id, columns)
+        self.tables[table_id].extend(rows)
+        self.touch(table_id)
+        job = FakeLoadJob(list(uris), table_id, job_config, len(rows))
+        self.load_jobs.append(job)
+        return job
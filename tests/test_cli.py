@@ -0,0 +1,81 @@
+from datetime import date
+import gzip
+import json
+import os
+
+import cli
+from tweet_cache import fresh_cache
+from test_memory_variants import tweet, write_tweets
+
+
+def test_cache_command_builds_fresh_cache(tmp_path, capsys):
+    tweets = [tweet("01", "ana", ["bob"]), tweet("01", "bob"), tweet("02", "ana", ["bob", "carla"])]
+    file_path = write_tweets(tmp_path / "tweets.json", tweets)
+    assert fresh_cache(file_path) is None
+
+    assert cli.main(["cache", file_path]) == 0
+    assert capsys.readouterr().out.split() == [fresh_cache(file_path), file_path + ".dateindex.json"]
+
+    # El modo time lee desde el cache y entrega lo mismo que el modo memory
+    for question in cli.QUESTIONS:
+        outputs = []
+        for mode in ("time", "memory"):
+            assert cli.main(["run", question, "--mode", mode, "--input", file_path]) == 0
+            outputs.append(json.loads(capsys.readouterr().out))
+        assert outputs[0] == outputs[1]
+
+
+def test_cache_command_reports_missing_file(tmp_path, capsys):
+    assert cli.main(["cache", str(tmp_path / "missing.json")]) == 1
+    assert capsys.readouterr().err.startswith("error:")
+
+
+def test_cache_command_builds_date_index(tmp_path, capsys, monkeypatch):
+    import date_index
+    from q2_memory import q2_memory
+    from q3_memory import q3_memory
+
+    # Tweets ordenados por día, 3 por día, con contenido y menciones distintas por día
+    tweets = []
+    for day in ("01", "02", "03", "04", "05"):
+        for index in range(3):
+            value = tweet(day, "ana", [f"user{day}", f"user{index}"])
+            value["content"] = "hola 😀" if day in ("02", "03") else "hola 👍"
+            tweets.append(value)
+    file_path = write_tweets(tmp_path / "tweets.json", tweets)
+    window = {"start_date": date(2021, 2, 2), "end_date": date(2021, 2, 3)}
+    expected = (q2_memory(file_path, **window), q3_memory(file_path, **window))
+
+    assert cli.main(["cache", file_path, "--parts", "index", "--hours"]) == 0
+    assert capsys.readouterr().out.split() == [date_index.index_path(file_path)]
+    index = date_index.load_date_index(file_path)
+    assert index is not None and "hours" in index
+
+    # Lineas leídas por las variantes memory desde el índice
+    read = []
+    iter_mapped_lines = date_index.iter_mapped_lines
+
+    def recording(path, ranges=None):
+        for offset, line in iter_mapped_lines(path, ranges):
+            read.append((offset, offset + len(line)))
+            yield offset, line
+
+    monkeypatch.setattr(date_index, "iter_mapped_lines", recording)
+    assert (q2_memory(file_path, **window), q3_memory(file_path, **window)) == expected
+
+    # Solo se leen los rangos indexados de los días de la ventana (dos veces, una por variante)
+    ranges = date_index.window_ranges(index, **window)
+    assert ranges == [(index["days"]["2021-02-02"]["ranges"][0][0], index["days"]["2021-02-03"]["ranges"][-1][1])]
+    assert len(read) == 2 * 6
+    assert all(any(start <= line_start and line_end <= end for start, end in ranges) for line_start, line_end in read)
+    assert sum(end - start for start, end in read) < os.path.getsize(file_path)
+
+
+def test_cache_command_skips_index_of_compressed_files(tmp_path, capsys):
+    file_path = write_tweets(tmp_path / "tweets.json", [tweet("01", "ana")])
+    with open(file_path, "rb") as source, gzip.open(file_path + ".gz", "wb") as target:
+        target.write(source.read())
+
+    assert cli.main(["cache", file_path + ".gz"]) == 0
+    assert capsys.readouterr().out.split() == [file_path + ".gz.cache.parquet"]
+    assert cli.main(["cache", file_path + ".gz", "--parts", "index"]) == 1
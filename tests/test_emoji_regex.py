@@ -0,0 +1,69 @@
+import random
+import pytest
+
+emoji = pytest.importorskip("emoji")
+pl = pytest.importorskip("polars")
+
+from emoji_regex import EmojiCache, list_emojis, polars_emojis
+
+ZWJ = "‍"
+EMOJIS = list(emoji.EMOJI_DATA)
+
+
+def extract(texts):
+    """
+    Emojis de cada texto con polars_emojis.
+    """
+
+    df = pl.DataFrame({"content": texts}, schema={"content": pl.Utf8})
+    return df.select(polars_emojis(pl.col("content")).alias("emojis"))["emojis"].to_list()
+
+
+def assert_parity(texts):
+    expected = [list_emojis(text) for text in texts]
+    for text, got, want in zip(texts, extract(texts), expected):
+        assert got == want, [hex(ord(char)) for char in text]
+
+
+def test_every_emoji_alone():
+    # Cada emoji de la base de datos, solo y rodeado de texto
+    assert_parity(EMOJIS)
+    assert_parity([f"a {item}b" for item in EMOJIS])
+
+
+def test_every_emoji_in_zwj_chains():
+    # Secuencias unidas por ZWJ que no existen en la base de datos, y emojis seguidos de un ZWJ suelto
+    assert_parity([item + ZWJ + EMOJIS[(position * 7 + 1) % len(EMOJIS)] for position, item in enumerate(EMOJIS)])
+    assert_parity([item + ZWJ + "x" for item in EMOJIS])
+
+
+def test_truncated_emojis():
+    # Prefijos de secuencias de la base de datos (secuencias ZWJ y banderas de subdivisiones incompletas)
+    assert_parity([item[:cut] + " " for item in EMOJIS if len(item) > 2 for cut in range(1, len(item))])
+
+
+def test_random_texts():
+    rng = random.Random(0)
+    fillers = ["a", " ", ZWJ, "️", "︎", "⃣", "#", "ñ", "🏻", "\U000e007f", "\U000e0067"]
+    texts = []
+    for _ in range(20000):
+        parts = []
+        for item in rng.choices(EMOJIS, k=rng.randint(1, 5)):
+            if rng.random() < 0.3:
+                item = item[:rng.randint(1, len(item))]
+            parts.append(item + rng.choice(fillers + [""] * 5))
+        texts.append("".join(parts))
+    assert_parity(texts)
+
+
+def test_null_and_ascii_texts():
+    assert extract([None, "", "sin emojis"]) == [None, [], []]
+
+
+def test_emoji_cache_uses_emoji_library():
+    cache = EmojiCache()
+    assert cache.extract is list_emojis
+    assert cache("hola 👨‍🌾 🚜") == ["👨‍🌾", "🚜"]
+    assert cache("hola 👨‍🌾 🚜") == ["👨‍🌾", "🚜"]
+    assert cache("ascii") == []
+    assert cache.stats() == {"hits": 1, "misses": 1, "ascii": 1, "size": 1}
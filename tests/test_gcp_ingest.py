@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+import json
+import os
+import pytest
+
+pytest.importorskip("google.cloud.storage")
+pytest.importorskip("google.cloud.bigquery")
+
+import gcp
+from benchmark import generate_tweets
+from fake_gcp import FakeBigQueryClient, FakeBucket, FakeStorageClient
+
+
+def write_chunk(directory, index: int) -> str:
+    """
+    Escribe un chunk pequeño y entrega su ruta.
+    """
+
+    path = os.path.join(directory, f"part-{index:05d}.json.gz")
+    with gzip.open(path, "wb") as file:
+        file.write(json.dumps({"index": index}).encode() + b"\n")
+    return path
+
+
+def write_chunks(directory, count: int):
+    return [write_chunk(directory, index) for index in range(count)]
+
+
+def test_upload_concurrency_is_bounded(tmp_path):
+    bucket = FakeBucket("bucket", upload_delay=0.02)
+    paths = write_chunks(tmp_path, 20)
+    uris = asyncio.run(gcp.upload_chunks(bucket, paths, "prefix", max_concurrency=3))
+
+    assert uris == [f"gs://bucket/prefix/{os.path.basename(path)}" for path in paths]
+    assert sorted(bucket.objects) == [f"prefix/{os.path.basename(path)}" for path in paths]
+    # Hubo subidas en paralelo, pero nunca más de max_concurrency
+    assert 1 < bucket.max_active <= 3
+
+
+def test_upload_removes_chunks_and_bounds_disk(tmp_path):
+    # Chunks en disco al comenzar cada subida (generados bajo demanda por un generador)
+    on_disk = []
+    bucket = FakeBucket("bucket", upload_delay=0.01, on_upload=lambda path: on_disk.append(len(os.listdir(tmp_path))))
+
+    def chunks():
+        for index in range(12):
+            yield write_chunk(tmp_path, index)
+
+    uris = asyncio.run(gcp.upload_chunks(bucket, chunks(), "prefix", max_concurrency=2, remove=True))
+
+    assert len(uris) == 12
+    assert os.listdir(tmp_path) == []
+    assert max(on_disk) <= 2 + 1
+
+
+def test_upload_failure_cancels_remaining(tmp_path):
+    bucket = FakeBucket("bucket", upload_delay=0.01, fail=lambda name: name.endswith("part-00002.json.gz"))
+    generated = []
+
+    def chunks():
+        for path in write_chunks(tmp_path, 50):
+            generated.append(path)
+            yield path
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(gcp.upload_chunks(bucket, chunks(), "prefix", max_concurrency=2))
+
+    # No se siguen generando ni subiendo chunks después de la falla
+    assert len(generated) < 10
+    assert len(bucket.started) < 10
+    assert "prefix/part-00002.json.gz" not in bucket.objects
+
+
+def test_load_chunks_batches_uris(monkeypatch):
+    storage_client = FakeStorageClient()
+    bucket = storage_client.bucket("bucket")
+    uris = []
+    for index in range(7):
+        bucket.objects[f"prefix/part-{index:05d}.json"] = json.dumps({"index": index}).encode() + b"\n"
+        uris.append(f"gs://bucket/prefix/part-{index:05d}.json")
+    client = FakeBigQueryClient(storage_client)
+    client.tables["p.d.t"] = [{"index": -1}]
+    monkeypatch.setattr(gcp, "MAX_LOAD_URIS", 3)
+
+    assert gcp.load_chunks(client, uris, "p.d.t") == 7
+
+    assert [len(job.uris) for job in client.load_jobs] == [3, 3, 1]
+    # El primer lote reemplaza la tabla y los siguientes se agregan
+    assert [job.job_config.write_disposition for job in client.load_jobs] == \
+        ["WRITE_TRUNCATE", "WRITE_APPEND", "WRITE_APPEND"]
+    assert [row["index"] for row in client.tables["p.d.t"]] == list(range(7))
+    assert client.load_jobs[0].job_config.schema == gcp.LOAD_SCHEMA
+
+
+def test_ingest_to_bigquery(tmp_path):
+    file_path = str(tmp_path / "tweets.json")
+    n_tweets = generate_tweets(file_path, 0.5)
+    storage_client = FakeStorageClient(upload_delay=0.01)
+    bigquery_client = FakeBigQueryClient(storage_client)
+
+    rows = gcp.ingest_to_bigquery(file_path, "bucket", "p.d.t", storage_client, bigquery_client, prefix="run",
+                                  chunk_size=16 << 10, max_concurrency=3, work_dir=str(tmp_path))
+
+    assert rows == n_tweets
+    bucket = storage_client.buckets["bucket"]
+    assert len(bucket.objects) > 3
+    assert bucket.max_active <= 3
+    # Los chunks temporales se borran
+    assert sorted(os.listdir(tmp_path)) == ["tweets.json"]
+    # Filas con las columnas proyectadas, en el orden del archivo
+    with open(file_path, "rb") as file:
+        expected = [json.loads(gcp.project_tweet(line)) for line in file]
+    assert bigquery_client.tables["p.d.t"] == expected
+
+
+def test_ingest_empty_file(tmp_path):
+    file_path = tmp_path / "empty.json"
+    file_path.write_bytes(b"")
+    storage_client = FakeStorageClient()
+    with pytest.raises(ValueError):
+        gcp.ingest_to_bigquery(str(file_path), "bucket", "p.d.t", storage_client, FakeBigQueryClient(storage_client))
@@ -0,0 +1,161 @@
+from collections import Counter
+from datetime import date
+import pytest
+
+pytest.importorskip("google.cloud.bigquery")
+
+import gcp
+from benchmark import generate_tweets
+from fake_gcp import FakeBigQueryClient, FakeStorageClient
+from q2_memory import q2_memory
+
+TABLE = ("my-project", "tweets", "farmers")
+TABLE_ID = "my-project.tweets.farmers"
+COLUMNS = ["date", "content", "user", "mentionedUsers", "emojis"]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    gcp.clear_result_cache()
+    yield
+    gcp.clear_result_cache()
+
+
+def make_client(rows=(("user_1", 3),)) -> FakeBigQueryClient:
+    client = FakeBigQueryClient(query_handler=lambda query, parameters: [{"item": item, "count": count}
+                                                                         for item, count in rows])
+    client.create_table(TABLE_ID, COLUMNS)
+    return client
+
+
+def bound_parameters(client: FakeBigQueryClient):
+    """
+    Parámetros de la última query: nombre -> (tipo, valor).
+    """
+
+    job_config = client.queries[-1][1]
+    return {parameter.name: (parameter.type_, parameter.value) for parameter in job_config.query_parameters}
+
+
+@pytest.mark.parametrize("function", [gcp.q1_bigquery, gcp.q2_bigquery, gcp.q3_bigquery])
+def test_parameters_are_bound(function):
+    client = make_client()
+    function(None, *TABLE, n=5, start_date=date(2021, 2, 10), end_date=date(2021, 2, 20), client=client)
+
+    query, _ = client.queries[-1]
+    assert bound_parameters(client) == {"n": ("INT64", 5), "start_date": ("DATE", date(2021, 2, 10)),
+                                        "end_date": ("DATE", date(2021, 2, 20))}
+    # Los valores no se interpolan en el texto de la query
+    assert "@n" in query and "@start_date" in query and "@end_date" in query
+    assert "2021-02-10" not in query
+    assert f"`{TABLE_ID}`" in query
+
+
+def test_window_defaults_to_null_parameters():
+    client = make_client()
+    gcp.q3_bigquery(None, *TABLE, client=client)
+    assert bound_parameters(client) == {"n": ("INT64", 10), "start_date": ("DATE", None), "end_date": ("DATE", None)}
+
+
+def test_invalid_n_and_window():
+    client = make_client()
+    with pytest.raises(ValueError):
+        gcp.q3_bigquery(None, *TABLE, n=0, client=client)
+    with pytest.raises(ValueError):
+        gcp.q3_bigquery(None, *TABLE, start_date=date(2021, 3, 1), end_date=date(2021, 2, 1), client=client)
+    assert client.queries == []
+
+
+@pytest.mark.parametrize("project_id, dataset_id, table_name", [
+    ("my-project", "tweets", "farmers"),
+    ("example.com:my-project", "tweets_2021", "Farmers_Protest"),
+])
+def test_table_reference_valid(project_id, dataset_id, table_name):
+    assert gcp.table_reference(project_id, dataset_id, table_name) == f"{project_id}.{dataset_id}.{table_name}"
+
+
+@pytest.mark.parametrize("project_id, dataset_id, table_name", [
+    ("My-Project", "tweets", "farmers"),
+    ("abc", "tweets", "farmers"),
+    ("my-project", "tweets`; DROP TABLE x; --", "farmers"),
+    ("my-project", "tweets", "farmers` WHERE true OR `"),
+    ("my-project", "tweets.other", "farmers"),
+    ("my-project", "", "farmers"),
+    ("my-project", "tweets", "far mers"),
+])
+def test_table_reference_invalid(project_id, dataset_id, table_name):
+    with pytest.raises(ValueError):
+        gcp.table_reference(project_id, dataset_id, table_name)
+    # Las funciones q* validan antes de ejecutar cualquier query
+    client = make_client()
+    with pytest.raises(ValueError):
+        gcp.q1_bigquery(None, project_id, dataset_id, table_name, client=client)
+    assert client.queries == []
+
+
+def test_cache_until_table_is_modified():
+    client = make_client()
+    first = gcp.q3_bigquery(None, *TABLE, client=client)
+    assert first == [("user_1", 3)]
+    assert gcp.q3_bigquery(None, *TABLE, client=client) == first
+    assert len(client.queries) == 1
+
+    # Otros parámetros u otra query no usan el resultado guardado
+    gcp.q3_bigquery(None, *TABLE, n=3, client=client)
+    gcp.q1_bigquery(None, *TABLE, client=client)
+    assert len(client.queries) == 3
+
+    # La tabla cambió: se vuelve a ejecutar la query
+    client.touch(TABLE_ID)
+    gcp.q3_bigquery(None, *TABLE, client=client)
+    assert len(client.queries) == 4
+    gcp.q3_bigquery(None, *TABLE, client=client)
+    assert len(client.queries) == 4
+
+    # Sin cache, o después de descartarlo, siempre se ejecuta
+    gcp.q3_bigquery(None, *TABLE, client=client, use_cache=False)
+    gcp.clear_result_cache()
+    gcp.q3_bigquery(None, *TABLE, client=client)
+    assert len(client.queries) == 6
+
+
+def test_cached_rows_are_not_shared():
+    client = make_client()
+    gcp.q3_bigquery(None, *TABLE, client=client).append(("other", 1))
+    assert gcp.q3_bigquery(None, *TABLE, client=client) == [("user_1", 3)]
+
+
+def test_cache_size_is_bounded(monkeypatch):
+    monkeypatch.setattr(gcp, "RESULT_CACHE_SIZE", 2)
+    client = make_client()
+    for n in (1, 2, 3, 1):
+        gcp.q3_bigquery(None, *TABLE, n=n, client=client)
+    # n=1 se descartó al guardar n=3
+    assert len(client.queries) == 4
+
+
+def test_q2_requires_emojis_column():
+    client = FakeBigQueryClient()
+    client.create_table(TABLE_ID, ["date", "content", "user", "mentionedUsers"])
+    with pytest.raises(ValueError):
+        gcp.q2_bigquery(None, *TABLE, client=client)
+    assert client.queries == []
+
+
+def test_q2_counts_emojis_loaded_by_ingest(tmp_path):
+    file_path = str(tmp_path / "tweets.json")
+    generate_tweets(file_path, 0.5)
+    storage_client = FakeStorageClient()
+    client = FakeBigQueryClient(storage_client)
+    gcp.ingest_to_bigquery(file_path, "bucket", TABLE_ID, storage_client, client, prefix="run", chunk_size=32 << 10)
+
+    # Resultado de la query de q2_bigquery (UNNEST de emojis, conteo y orden) sobre las filas cargadas
+    def q2_query(query, parameters):
+        assert "UNNEST(emojis)" in query
+        counts = Counter(emoji for row in client.tables[TABLE_ID] for emoji in row["emojis"])
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:parameters["n"]]
+        return [{"emoji": emoji, "count": count} for emoji, count in ranked]
+
+    client.query_handler = q2_query
+    result = gcp.q2_bigquery(None, *TABLE, client=client)
+    assert Counter(dict(result)) == Counter(dict(q2_memory(file_path)))
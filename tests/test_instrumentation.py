@@ -0,0 +1,30 @@
+import logging
+
+import instrumentation
+from instrumentation import MAX_RUNS, RUNS, profiled, profiling, prometheus_text
+
+
+@profiled
+def first():
+    return 1
+
+
+@profiled
+def second():
+    return 2
+
+
+def test_runs_are_bounded(caplog):
+    with caplog.at_level(logging.CRITICAL, logger="tweets.profile"), profiling() as runs:
+        first()
+        for _ in range(MAX_RUNS + 10):
+            second()
+
+    assert runs is RUNS
+    assert len(runs) == MAX_RUNS
+    assert all(run["function"] == "second" for run in runs)
+    # La última ejecución de cada función se sigue exportando aunque ya no esté en RUNS
+    text = prometheus_text()
+    assert 'tweets_function_seconds{function="first"}' in text
+    assert 'tweets_function_seconds{function="second"}' in text
+    assert set(instrumentation._LATEST) >= {"first", "second"}
@@ -0,0 +1,81 @@
+import gzip
+import json
+import pytest
+
+from line_reader import MappedFile, iter_mapped_lines, iter_offset_lines
+from projection import project_content, project_date, project_mentioned_raw, project_mentioned_usernames
+
+
+def write_lines(path, lines) -> str:
+    with open(path, "wb") as file:
+        file.write(b"".join(lines))
+    return str(path)
+
+
+def mapped(file_path: str, **kwargs) -> list:
+    # Las lineas se copian a bytes porque cada memoryview es válida solo hasta pedir la siguiente
+    with MappedFile(file_path, **kwargs) as mapped_file:
+        return [(offset, bytes(line)) for offset, line in mapped_file.iter_lines()]
+
+
+def test_mapped_lines_match_buffered_lines(tmp_path):
+    # Lineas más largas que la ventana (cruzan varias ventanas) y sin salto de linea al final
+    lines = [b"a" * size + b"\n" for size in (10, 5000, 3, 20000, 1, 9000)] + [b"fin"]
+    file_path = write_lines(tmp_path / "tweets.json", lines)
+
+    expected = list(iter_offset_lines(file_path))
+    assert [line for _, line in expected] == lines
+    assert mapped(file_path, window_size=4096) == expected
+    assert [(offset, bytes(line)) for offset, line in iter_mapped_lines(file_path)] == expected
+
+
+def test_mapped_lines_ranges(tmp_path):
+    lines = [b"%d\n" % number * (number % 7) for number in range(3000)]
+    file_path = write_lines(tmp_path / "tweets.json", lines)
+
+    expected = list(iter_offset_lines(file_path))
+    ranges = [(expected[10][0], expected[500][0]), (expected[2000][0], expected[-1][0] + len(expected[-1][1]))]
+    result = [(offset, bytes(line)) for offset, line in iter_mapped_lines(file_path, ranges)]
+    assert result == expected[10:500] + expected[2000:]
+
+
+def test_mapped_lines_empty_and_compressed(tmp_path):
+    assert list(iter_mapped_lines(write_lines(tmp_path / "empty.json", []))) == []
+
+    # Los archivos comprimidos se leen con lecturas buferizadas
+    with gzip.open(tmp_path / "tweets.json.gz", "wb") as file:
+        file.write(b"uno\ndos\n")
+    assert list(iter_mapped_lines(str(tmp_path / "tweets.json.gz"))) == [(0, b"uno\n"), (4, b"dos\n")]
+
+
+def test_line_at_releases_previous_line(tmp_path):
+    lines = [b"x" * size + b"\n" for size in (100, 7000, 50, 12000)]
+    file_path = write_lines(tmp_path / "tweets.json", lines)
+    offsets = [offset for offset, _ in iter_offset_lines(file_path)]
+
+    with MappedFile(file_path, window_size=4096) as mapped_file:
+        previous = None
+        for offset, line in zip(offsets, lines):
+            current = mapped_file.line_at(offset)
+            assert bytes(current) == line
+            if previous is not None:
+                # La linea anterior queda liberada al pedir la siguiente
+                with pytest.raises(ValueError):
+                    bytes(previous)
+            previous = current
+
+
+def test_projections_accept_memoryview():
+    tweet = {
+        "date": "2021-02-24T09:23:35+00:00",
+        "content": "hola \"mundo\" 😀",
+        "user": {"username": "josé"},
+        "quotedTweet": {"mentionedUsers": [{"username": "citado"}]},
+        "mentionedUsers": [{"username": "ana"}, {"username": "b\\\"c"}],
+    }
+    line = json.dumps(tweet).encode("utf-8") + b"\n"
+    view = memoryview(line)
+
+    for project in (project_date, project_content, project_mentioned_raw, project_mentioned_usernames):
+        assert project(view) == project(line)
+    assert project_mentioned_usernames(view) == ["ana", "b\\\"c"]
@@ -0,0 +1,96 @@
+from collections import Counter
+from datetime import date
+import json
+
+from q1_memory import q1_memory
+from q3_memory import q3_memory
+
+
+def tweet(day: str, username: str, mentioned=None) -> dict:
+    return {
+        "url": "https://twitter.com/x/status/1",
+        "date": f"2021-02-{day}T10:00:00+00:00",
+        "content": "hola",
+        "user": {"username": username, "id": 1},
+        "quotedTweet": None,
+        "mentionedUsers": [{"username": name, "id": 2} for name in mentioned] if mentioned else None,
+    }
+
+
+def write_tweets(path, tweets) -> str:
+    # Lineas alternadas con y sin secuencias de escape (ensure_ascii), como al juntar archivos de distinto origen
+    with open(path, "w", encoding="utf-8") as file:
+        for index, value in enumerate(tweets):
+            file.write(json.dumps(value, ensure_ascii=index % 2 == 0) + "\n")
+    return str(path)
+
+
+def test_q3_memory_merges_escaped_usernames(tmp_path):
+    mentions = ["josé", "ñandú", "ü", "josé", "ñandú", "ü", "josé", "ana", "ana"]
+    file_path = write_tweets(tmp_path / "tweets.json", [tweet("01", "a", [name]) for name in mentions])
+
+    expected = Counter(mentions).most_common()
+    assert q3_memory(file_path, n=10) == expected
+    assert q3_memory(file_path, n=2) == expected[:2]
+
+
+def test_q3_memory_approximate_merges_escaped_usernames(tmp_path):
+    mentions = ["josé", "josé", "ana", "ñandú", "josé", "ñandú"]
+    file_path = write_tweets(tmp_path / "tweets.json", [tweet("01", "a", [name]) for name in mentions])
+
+    result = q3_memory(file_path, n=2, approximate=True, capacity=3)
+    assert result.top == [("josé", 3, 0), ("ñandú", 2, 0)]
+    assert result.guaranteed
+
+
+def test_q1_memory_merges_escaped_usernames(tmp_path):
+    # "josé" tiene 4 tweets el día 01 (2 escritos con escape y 2 sin escape) y "bob" tiene 3
+    usernames = ["josé", "josé", "bob", "bob", "josé", "josé", "bob"]
+    tweets = [tweet("01", name) for name in usernames] + [tweet("02", "ana")]
+    file_path = write_tweets(tmp_path / "tweets.json", tweets)
+
+    assert [username for _, username in q1_memory(file_path)] == ["josé", "ana"]
+    assert [username for _, username in q1_memory(file_path, granularity="hour")] == ["josé", "ana"]
+
+
+def test_q1_tie_rule_is_shared(tmp_path):
+    from analytics import analytics_pass
+    from parallel import q1_parallel
+    from q1_time import q1_time, q1_time_pandas
+
+    # Días 03 y 01 empatados en 4 tweets (gana el más antiguo) y empates de usernames dentro de cada día
+    # ("zoe" aparece primero, pero gana el menor username en orden alfabético)
+    tweets = ([tweet("03", name) for name in ["zoe", "zoe", "bob", "bob"]]
+              + [tweet("01", name) for name in ["zoe", "ana", "ana", "zoe"]]
+              + [tweet("02", name) for name in ["carl", "bea", "carl"]])
+    file_path = write_tweets(tmp_path / "tweets.json", tweets)
+
+    expected = [(date(2021, 2, 1), "ana"), (date(2021, 2, 3), "bob"), (date(2021, 2, 2), "carl")]
+    assert q1_memory(file_path) == expected
+    assert q1_time(file_path) == expected
+    assert q1_time_pandas(file_path) == expected
+    assert analytics_pass(file_path)["q1"] == expected
+    assert q1_parallel(file_path, n_workers=2) == expected
+
+
+def test_parallel_variants_match_memory_variants(tmp_path):
+    import gzip
+    from parallel import q1_parallel, q2_parallel, q3_parallel
+    from q2_memory import q2_memory
+
+    tweets = []
+    for index in range(60):
+        value = tweet(f"{index % 5 + 1:02d}", f"user{index % 7}", [f"user{index % 3}", f"user{index % 4}"])
+        value["content"] = "hola " + "😀" * (index % 3) + "👍" * (index % 5 == 0)
+        tweets.append(value)
+    file_path = write_tweets(tmp_path / "tweets.json", tweets)
+    with open(file_path, "rb") as source, gzip.open(file_path + ".gz", "wb") as target:
+        target.write(source.read())
+
+    pairs = [(q1_parallel, q1_memory), (q2_parallel, q2_memory), (q3_parallel, q3_memory)]
+    for kwargs in ({}, {"n": 2}, {"n": 3, "start_date": date(2021, 2, 2), "end_date": date(2021, 2, 4)},
+                   {"end_date": date(2021, 2, 1)}):
+        for parallel_function, memory_function in pairs:
+            expected = memory_function(file_path, **kwargs)
+            assert parallel_function(file_path, **kwargs, n_workers=2) == expected
+            assert parallel_function(file_path + ".gz", **kwargs, n_workers=2) == expected
@@ -0,0 +1,121 @@
+import json
+import pytest
+
+import projection
+from projection import (canonical_username, decode_counts, decode_username, project_content, project_date,
+                        project_hour, project_mentioned_raw, project_mentioned_usernames, project_username,
+                        project_username_raw)
+
+
+def tweet(username="autor", content="hola", mentioned=None, quoted=None, user=None) -> dict:
+    # Orden de keys del archivo de tweets (ver projection.py)
+    return {
+        "url": "https://twitter.com/x/status/1",
+        "date": "2021-02-24T09:23:35+00:00",
+        "content": content,
+        "user": {"username": username, "id": 1} if user is None else user,
+        "quotedTweet": quoted,
+        "mentionedUsers": mentioned,
+        "coordinates": {"longitude": 1.0},
+    }
+
+
+def reference(value: dict) -> dict:
+    # Resultado esperado de cada proyección según el tweet completo leído con json.loads
+    return {
+        "date": value["date"][:10],
+        "hour": value["date"][:13],
+        "username": (value.get("user") or {}).get("username", ""),
+        "content": value.get("content") or "",
+        "mentioned": [user["username"] for user in value.get("mentionedUsers") or []],
+    }
+
+
+def projected(line) -> dict:
+    return {
+        "date": project_date(line),
+        "hour": project_hour(line),
+        "username": project_username(line),
+        "content": project_content(line),
+        "mentioned": project_mentioned_usernames(line),
+    }
+
+
+def raw_projected(line) -> dict:
+    return {
+        "username": decode_username(project_username_raw(line)),
+        "mentioned": [decode_username(username) for username in project_mentioned_raw(line)],
+    }
+
+
+CASES = {
+    "simple": tweet(mentioned=[{"username": "ana", "id": 2}]),
+    # "username" no es la primera key de "user": no debe calzar con el "user" de "quotedTweet"
+    "user_key_order": tweet(user={"id": 1, "displayname": "A", "username": "autor"},
+                            quoted={"user": {"username": "citado"}, "mentionedUsers": [{"username": "otro"}]}),
+    "user_null": dict(tweet(quoted={"user": {"username": "citado"}}), user=None),
+    "mentioned_key_order": tweet(mentioned=[{"id": 2, "displayname": "Ana", "username": "ana"},
+                                            {"username": "bob", "id": 3}]),
+    "escapes": tweet(username='a"b\\c', content='dijo "hola" \\ \n',
+                     mentioned=[{"username": 'x"y'}, {"username": "z\\"}, {"username": "\\\"\\"}]),
+    "unicode": tweet(username="josé", content="ñandú 😀  ",
+                     mentioned=[{"username": "ü"}, {"username": "😀user"}, {"username": "\U0001F1E8\U0001F1F1"}]),
+    "mentioned_null": tweet(mentioned=None, quoted={"mentionedUsers": [{"username": "citado"}]}),
+    "mentioned_empty": tweet(mentioned=[], quoted={"mentionedUsers": [{"username": "citado"}]}),
+    "quoted_mentions": tweet(mentioned=[{"username": "ana"}],
+                             quoted={"user": {"username": "citado"}, "mentionedUsers": [{"username": "otro"}]}),
+}
+
+
+def lines(value: dict):
+    # Cada tweet con y sin secuencias de escape \uXXXX (surrogate pairs para caracteres fuera del BMP)
+    for ensure_ascii in (True, False):
+        yield json.dumps(value, ensure_ascii=ensure_ascii).encode("utf-8") + b"\n"
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_projections_match_json_loads(name):
+    value = CASES[name]
+    expected = reference(value)
+    for line in lines(value):
+        assert json.loads(line) == value
+        for view in (line, memoryview(line)):
+            assert projected(view) == expected
+            assert raw_projected(view) == {key: expected[key] for key in ("username", "mentioned")}
+
+
+def test_escaped_unicode_is_in_ascii_lines():
+    # Las lineas con ensure_ascii escapan los caracteres no ASCII, incluidos los surrogate pairs
+    escaped, plain = lines(CASES["unicode"])
+    assert b"\\ud83d\\ude00user" in escaped
+    assert "😀user".encode("utf-8") in plain
+    assert project_mentioned_raw(escaped)[1] == b"\\ud83d\\ude00user"
+    assert canonical_username(project_mentioned_raw(escaped)[1]) == project_mentioned_raw(plain)[1]
+    assert decode_counts({b"jos\\u00e9": 2, "josé".encode("utf-8"): 1}) == {"josé": 3}
+
+
+FALLBACK_CASES = {
+    # Espacios antes de ":" (ningún patrón calza)
+    "spacing": (tweet(mentioned=[{"username": "ana"}]), {"separators": (", ", " : ")}),
+    # Sin key "mentionedUsers"
+    "no_mentioned_key": ({key: value for key, value in tweet().items() if key != "mentionedUsers"}, {}),
+    # "user" sin "username" como primera key y sin "quotedTweet"
+    "user_key_order": (tweet(user={"id": 1, "username": "autor"}), {}),
+}
+
+
+@pytest.mark.parametrize("name", FALLBACK_CASES)
+def test_fallback_lines_match_json_loads(name, monkeypatch):
+    value, options = FALLBACK_CASES[name]
+    line = json.dumps(value, **options).encode("utf-8")
+    expected = reference(value)
+
+    # Lecturas completas del tweet hechas por las proyecciones
+    loads = json.loads
+    calls = []
+    monkeypatch.setattr(projection.json, "loads", lambda data: calls.append(data) or loads(data))
+
+    for view in (line, memoryview(line)):
+        assert projected(view) == expected
+        assert raw_projected(view) == {key: expected[key] for key in ("username", "mentioned")}
+    assert line in calls
@@ -0,0 +1,75 @@
+from collections import Counter
+import pytest
+
+from sketch import SpaceSaving, approximate_top_k
+from q2_memory import q2_memory
+from q3_memory import q3_memory
+from test_memory_variants import tweet, write_tweets
+
+
+def stream(records):
+    return lambda: iter(records)
+
+
+def test_space_saving_bounds_contain_real_counts():
+    items = [index % 13 for index in range(200)] + [index % 5 for index in range(100)] + list(range(100, 150))
+    real = Counter(items)
+    sketch = SpaceSaving(capacity=8)
+    sketch.update_many(items)
+
+    for item, count, error in sketch.top(8):
+        assert count - error <= real[item] <= count
+    # Ningún elemento fuera de los contadores supera la cota
+    assert all(real[item] <= sketch.min_count for item in real if item not in sketch.counters)
+
+
+def test_approximate_top_k_exact_when_all_items_fit():
+    records = [["a", "b"], ["a"], ["c", "a", "b"]]
+    for verify in (True, False):
+        result = approximate_top_k(stream(records), n=2, capacity=10, verify=verify)
+        assert result.top == [("a", 3, 0), ("b", 2, 0)]
+        assert result.guaranteed
+        assert result.bound == 0
+
+
+def test_approximate_top_k_reports_errors_without_verify():
+    # Flujo sin elementos frecuentes: con pocos contadores los conteos estimados tienen error
+    records = [[item] for item in range(50)] + [[0]]
+    result = approximate_top_k(stream(records), n=2, capacity=3, verify=False)
+
+    assert not result.guaranteed
+    assert result.bound > 0
+    assert any(error > 0 for _, _, error in result.top)
+    real = Counter(item for record in records for item in record)
+    for item, count, error in result.top:
+        assert count - error <= real[item] <= count
+
+
+def test_approximate_top_k_verified_but_not_guaranteed():
+    records = [[item] for item in range(50)] + [[0]]
+    result = approximate_top_k(stream(records), n=2, capacity=3)
+
+    # Conteos verificados (exactos), pero elementos no monitoreados pueden superar al último del top
+    assert all(error == 0 for _, _, error in result.top)
+    assert not result.guaranteed
+
+
+def test_approximate_top_k_requires_capacity_of_at_least_n():
+    with pytest.raises(ValueError, match="capacity"):
+        approximate_top_k(stream([["a"]]), n=5, capacity=4)
+
+
+def test_memory_variants_pass_verify_and_capacity(tmp_path):
+    tweets = [tweet("01", "a", ["ana", "bob"]), tweet("01", "a", ["ana"]), tweet("02", "a", ["carla"])]
+    tweets[0]["content"] = "hola 😀😀 👍"
+    file_path = write_tweets(tmp_path / "tweets.json", tweets)
+
+    result = q3_memory(file_path, n=2, approximate=True, capacity=2, verify=False)
+    assert result.top[0] == ("ana", 2, 0)
+    assert not result.guaranteed
+
+    assert q2_memory(file_path, n=2, approximate=True, capacity=5, verify=False).top == [("😀", 2, 0), ("👍", 1, 0)]
+    with pytest.raises(ValueError):
+        q2_memory(file_path, n=3, approximate=True, capacity=2)
+    with pytest.raises(ValueError):
+        q3_memory(file_path, n=3, approximate=True, capacity=2)
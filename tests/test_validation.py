@@ -0,0 +1,48 @@
+import pytest
+
+import cli
+from analytics import analytics_pass
+from parallel import q1_parallel, q2_parallel, q3_parallel
+from q1_memory import q1_memory
+from q1_time import q1_time, q1_time_pandas
+from q2_memory import q2_memory
+from q2_time import q2_time, q2_time_pandas
+from q3_memory import q3_memory
+from q3_time import q3_time, q3_time_pandas
+from window import check_n
+
+FUNCTIONS = [q1_time, q1_time_pandas, q1_memory, q2_time, q2_time_pandas, q2_memory, q3_time, q3_time_pandas,
+             q3_memory, analytics_pass, q1_parallel, q2_parallel, q3_parallel]
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    path = tmp_path / "tweets.json"
+    path.write_text('{"date": "2021-02-01T10:00:00+00:00", "content": "hola", "user": {"username": "ana"}, '
+                    '"mentionedUsers": null}\n', encoding="utf-8")
+    return str(path)
+
+
+def test_check_n():
+    assert check_n(1) == 1
+    for value in (0, -1):
+        with pytest.raises(ValueError):
+            check_n(value)
+    for value in (1.5, "3", True, None):
+        with pytest.raises(TypeError):
+            check_n(value)
+
+
+@pytest.mark.parametrize("function", FUNCTIONS, ids=lambda function: function.__name__)
+@pytest.mark.parametrize("n", [0, -1])
+def test_functions_reject_invalid_n(function, n, file_path):
+    with pytest.raises(ValueError):
+        function(file_path, n=n)
+
+
+def test_cli_rejects_invalid_n(file_path, capsys):
+    for value in ("0", "-1", "x"):
+        with pytest.raises(SystemExit) as error:
+            cli.main(["run", "q3", "--input", file_path, "--n", value])
+        assert error.value.code == 2
+    assert cli.main(["run", "q1", "--input", file_path, "--n", "1"]) == 0